@@ -0,0 +1,85 @@
+"""Compare repeated node lookups with literal ids against the parameterized statement.
+
+Needs a running neo4j with train switches, see GraphDbApi.
+"""
+import sys
+import time
+from typing import Callable, List
+
+from neo4j.exceptions import ClientError
+
+from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
+from ebl_coords.graph_db.data_elements.switch_item_enum import SwitchItem
+from ebl_coords.graph_db.graph_db_api import GraphDbApi
+from ebl_coords.graph_db.query_generator import get_double_nodes
+
+ROUNDS = 5
+
+
+def get_double_nodes_literal(graph_db: GraphDbApi, guid: str) -> None:
+    """Look up a double node with the id embedded in the query text, as before.
+
+    Args:
+        graph_db (GraphDbApi): api
+        guid (str): node_id
+    """
+    double_vertex = EdgeRelation.DOUBLE_VERTEX.name
+    weiche = SwitchItem.WEICHE.name
+    vals = "n1.name, n1.bhf, n1.ecos_id, n1.x, n1.y, n1.z"
+    graph_db.run_query(
+        f"""
+    MATCH(n1:{weiche}{{node_id:'{guid}'}})-[:{double_vertex}]->(n2:{weiche}) RETURN {vals};
+    """
+    )
+
+
+def get_double_nodes_parameterized(graph_db: GraphDbApi, guid: str) -> None:
+    """Look up a double node with the named statement.
+
+    Args:
+        graph_db (GraphDbApi): api
+        guid (str): node_id
+    """
+    graph_db.run_query(*get_double_nodes(guid))
+
+
+def clear_query_caches(graph_db: GraphDbApi) -> None:
+    """Clear the plan cache, needs admin rights.
+
+    Args:
+        graph_db (GraphDbApi): api
+    """
+    try:
+        graph_db.run_query("CALL db.clearQueryCaches()")
+    except ClientError as err:
+        print(f"plan cache not cleared: {err.message}")
+
+
+def main() -> None:
+    """Run the benchmark, the number of rounds is optionally given as first argument."""
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else ROUNDS
+    graph_db = GraphDbApi()
+    guids: List[str] = graph_db.run_query(
+        f"MATCH (n:{SwitchItem.WEICHE.name}) RETURN n.node_id AS node_id"
+    ).get("node_id", [])
+    if len(guids) == 0:
+        print("no train switches in the database")
+        return
+
+    strategies: List[Callable[[GraphDbApi, str], None]] = [
+        get_double_nodes_literal,
+        get_double_nodes_parameterized,
+    ]
+    for foo in strategies:
+        clear_query_caches(graph_db)
+        for i in range(rounds):
+            start = time.perf_counter()
+            for guid in guids:
+                foo(graph_db, guid)
+            seconds = (time.perf_counter() - start) / len(guids)
+            name = foo.__name__.rpartition("_")[2]
+            print(f"{name:>15} round {i}: {seconds * 1e6:10.1f} us per query ({len(guids)} ids)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare the guid join of the ecos df against the former loop over all graph nodes."""
+import sys
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ebl_coords.backend.ecos import _join_guid
+
+ECOS_CSV = "./ecos_mock/ecos.csv"
+SIZES = (1000, 4000)
+
+
+def join_loop(df: pd.DataFrame, nodes: pd.DataFrame) -> pd.DataFrame:
+    """Join with one boolean mask per graph node, as before.
+
+    Args:
+        df (pd.DataFrame): ecos df
+        nodes (pd.DataFrame): graph nodes with columns node_id, dcc and bpk
+
+    Returns:
+        pd.DataFrame: ecos df with column guid
+    """
+    db = nodes[::2].copy()
+    db.bpk = '"' + db.bpk + '"'
+    df = df.copy()
+    df.insert(df.shape[1], column="guid", value=np.nan)
+    df.guid = df.guid.astype(object)
+    for _, row in db.iterrows():
+        dcc = int(row.dcc)
+        idx = df.guid.loc[(df["name1"] == row.bpk) & (df["addr"].astype(int) == dcc)].index
+        df.loc[idx, "guid"] = row.node_id
+    return df.dropna()
+
+
+def scale_inventory(size: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Repeat the mock inventory with other bpks, every accessory is a train switch.
+
+    Args:
+        size (int): number of accessories
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: (ecos df, graph nodes)
+    """
+    mock = pd.read_csv(ECOS_CSV)
+    mock = mock.loc[mock.protocol == "DCC"].drop_duplicates("addr").reset_index(drop=True)
+    repeats = -(-size // len(mock))
+    df = pd.concat([mock.assign(name1=f'"B{i}"') for i in range(repeats)], ignore_index=True)
+    df = df.iloc[:size].assign(ip="127.0.0.1", id=np.arange(size) + 20000)
+    guids = [f"n{i}" for i in range(size)]
+    nodes = pd.DataFrame(
+        {
+            "node_id": [f"{guid}_{side}" for guid in guids for side in (0, 1)],
+            "dcc": np.repeat(df.addr.astype(str).to_numpy(), 2),
+            "bpk": np.repeat(df.name1.str.strip('"').to_numpy(), 2),
+        }
+    )
+    return df, nodes
+
+
+def main() -> None:
+    """Run the benchmark, the number of accessories is optionally given as first argument."""
+    sizes = (int(sys.argv[1]),) if len(sys.argv) > 1 else SIZES
+    warnings.simplefilter("ignore")
+    for size in sizes:
+        df, nodes = scale_inventory(size)
+        expected = join_loop(df, nodes)
+        pd.testing.assert_frame_equal(_join_guid(df, nodes), expected, check_dtype=False)
+        for name, foo in (("loop", join_loop), ("merge", _join_guid)):
+            seconds = min(timeit.repeat(lambda: foo(df, nodes), number=1, repeat=3))
+            print(f"{size:>6} accessories {name:>6}: {seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
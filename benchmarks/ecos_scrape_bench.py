@@ -0,0 +1,122 @@
+"""Compare ECoS scrape strategies against local simulated stations."""
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from ebl_coords.backend.constants import ECOS_MOCK_FILE, ECOS_MOCK_PORT
+from ebl_coords.backend.ecos import get_ecos_df_live
+from ebl_coords.backend.ecos_simulator import EcosSimulator
+
+STATIONS = 6
+# simulated round trip time of an ECoS reply
+RTT_MS = 2.0
+
+
+def scrape_round_trips(ip: str, port: int) -> List[Dict[str, str]]:
+    """Get all accessories of one ECoS with one round trip per accessory, as before.
+
+    Args:
+        ip (str): ip of the ECoS
+        port (int): port of the ECoS
+
+    Returns:
+        List[Dict[str, str]]: one dict per accessory
+    """
+    df_dicts = []
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as skt:
+        skt.connect((ip, port))
+        skt.sendall(b"queryObjects(11)\n")
+        buffer = b""
+        while b"<END 0 (OK)>" not in buffer:
+            buffer += skt.recv(1024)
+        for ecos_id in buffer.decode("utf-8").split("\r\n")[1:-2]:
+            skt.sendall(f"get({ecos_id})".encode() + b"\n")
+            d = {}
+            for feature in skt.recv(10_000).decode("utf-8").split("\r\n")[1:-2]:
+                _, _, desc = feature.partition(" ")
+                name, val = desc.split("[")
+                d[name] = val[:-1]
+            d["id"] = ecos_id
+            d["ip"] = ip
+            df_dicts.append(d)
+    return df_dicts
+
+
+def scrape_sequential(config: Dict[str, Any]) -> pd.DataFrame:
+    """Scrape one ECoS after another with one round trip per accessory, as before.
+
+    Args:
+        config (Dict[str, Any]): ecos config
+
+    Returns:
+        pd.DataFrame: ecos df
+    """
+    df_dicts = []
+    for ip in list(config["bpk_ip"].values())[1:]:
+        df_dicts.extend(scrape_round_trips(ip, config["port"]))
+    return pd.DataFrame(df_dicts)
+
+
+def scrape_concurrent(config: Dict[str, Any]) -> pd.DataFrame:
+    """Scrape all ECoS concurrently with one round trip per accessory.
+
+    Args:
+        config (Dict[str, Any]): ecos config
+
+    Returns:
+        pd.DataFrame: ecos df
+    """
+    ips = list(config["bpk_ip"].values())[1:]
+    with ThreadPoolExecutor(max_workers=len(ips)) as executor:
+        stations = executor.map(scrape_round_trips, ips, repeat(config["port"]))
+        return pd.DataFrame([d for df_dicts in stations for d in df_dicts])
+
+
+def main() -> None:
+    """Run the benchmark, the round trip time in ms is optionally given as first argument."""
+    rtt_ms = float(sys.argv[1]) if len(sys.argv) > 1 else RTT_MS
+    inventory = pd.read_csv(ECOS_MOCK_FILE, dtype=str, keep_default_na=False)
+    # the first bpk is skipped by the scraper
+    config: Dict[str, Any] = {"port": ECOS_MOCK_PORT, "bpk_ip": {"SKIPPED": "127.0.0.1"}}
+    simulators = []
+    with TemporaryDirectory() as tmp_dir:
+        for station in range(STATIONS):
+            ip = f"127.0.0.{station + 2}"
+            config["bpk_ip"][f"S{station}"] = ip
+            csv_file = os.path.join(tmp_dir, f"station{station}.csv")
+            inventory.iloc[station::STATIONS].to_csv(csv_file, index=False)
+            simulator = EcosSimulator(
+                csv_file, ip, ECOS_MOCK_PORT, rate_hz=0, latency_s=rtt_ms / 1000
+            )
+            simulator.start()
+            simulators.append(simulator)
+
+    results = {}
+    strategies = (
+        ("sequential", scrape_sequential),
+        ("concurrent", scrape_concurrent),
+        ("pipelined", get_ecos_df_live),
+    )
+    for name, foo in strategies:
+        start = time.perf_counter()
+        results[name] = foo(config)
+        seconds = time.perf_counter() - start
+        print(
+            f"{name:>10}: {seconds * 1000:8.1f} ms "
+            f"({len(results[name])} accessories, {STATIONS} stations, rtt {rtt_ms} ms)"
+        )
+    for name in ("concurrent", "pipelined"):
+        pd.testing.assert_frame_equal(results["sequential"], results[name])
+    for simulator in simulators:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare the vectorized edge formatting against the former iterrows loop.
+
+The former version also ran one query per relation, the round trips are not included.
+"""
+import sys
+import timeit
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ebl_coords.graph_db.data_elements.bpk_enum import Bpk
+from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
+from ebl_coords.graph_db.graph_db_api import TRACK_RELATIONS, format_edges
+
+SIZES = (1000, 5000)
+
+
+def format_edges_loop(edges: pd.DataFrame) -> List[Tuple[str, str]]:
+    """Format the result of one query per relation row by row, as before.
+
+    Args:
+        edges (pd.DataFrame): edges with EDGE_LIST_COLUMNS
+
+    Returns:
+        List[Tuple[str, str]]: (guid edge, edge string)
+    """
+    result = []
+    for relation in EdgeRelation:
+        if relation == EdgeRelation.DOUBLE_VERTEX:
+            continue
+        df = edges.loc[edges.relation == relation.name]
+        df = df.rename(
+            columns={
+                "source_bhf": "n1.bhf",
+                "source_name": "n1.name",
+                "dest_bhf": "n2.bhf",
+                "dest_name": "n2.name",
+                "edge_id": "r.edge_id",
+            }
+        )
+        df.sort_values(by=["n1.bhf", "n1.name"], inplace=True)
+        if df.size > 0:
+            for _, row in df.iterrows():
+                edge = f"{row['n1.bhf']}_{row['n1.name']}\t{relation.value}\t{row['n2.bhf']}_{row['n2.name']}"
+                result.append((row["r.edge_id"], edge))
+    return result
+
+
+def make_edges(size: int, seed: int = 0) -> pd.DataFrame:
+    """Get random edges, every (relation, source bhf, source name) is unique.
+
+    Args:
+        size (int): number of edges
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: edges with EDGE_LIST_COLUMNS
+    """
+    rng = np.random.default_rng(seed)
+    bhfs = np.array([bpk.name for bpk in Bpk])
+    sources = rng.permutation(size)
+    return pd.DataFrame(
+        {
+            "edge_id": [f"guid_{i:08x}_{i % 2}" for i in range(size)],
+            "relation": np.array(TRACK_RELATIONS)[sources % len(TRACK_RELATIONS)],
+            "source_bhf": bhfs[sources // len(TRACK_RELATIONS) % len(bhfs)],
+            "source_name": (sources // len(TRACK_RELATIONS) // len(bhfs)).astype(str),
+            "dest_bhf": bhfs[rng.integers(len(bhfs), size=size)],
+            "dest_name": rng.integers(size, size=size).astype(str),
+        }
+    )
+
+
+def main() -> None:
+    """Run the benchmark, the number of edges is optionally given as first argument."""
+    sizes = (int(sys.argv[1]),) if len(sys.argv) > 1 else SIZES
+    for size in sizes:
+        edges = make_edges(size)
+        assert format_edges(edges) == format_edges_loop(edges)
+        for name, foo in (("loop", format_edges_loop), ("vectorized", format_edges)):
+            seconds = min(timeit.repeat(lambda: foo(edges), number=1, repeat=3))
+            print(f"{size:>6} edges {name:>10}: {seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare the GtCommand record framing against the former bytes buffer."""
+import sys
+import timeit
+
+from ebl_coords.backend.framing import RecordFramer
+
+STREAM_FILE = "./tests/test_data/gtcommand_test_stream"
+CHUNK_SIZES = (1024, 16384)
+
+
+def _chunks(stream: bytes, chunk_size: int) -> list[bytes]:
+    return [stream[i : i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def frame_bytes(chunks: list[bytes]) -> int:
+    """Frame records with buffer concatenation and partition.
+
+    Args:
+        chunks (list[bytes]): received chunks
+
+    Returns:
+        int: number of records
+    """
+    n = 0
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        while b";" in buffer:
+            _, _, buffer = buffer.partition(b";")
+            n += 1
+    return n
+
+
+def frame_framer(chunks: list[bytes]) -> int:
+    """Frame records with the preallocated RecordFramer.
+
+    Args:
+        chunks (list[bytes]): received chunks
+
+    Returns:
+        int: number of records
+    """
+    n = 0
+    framer = RecordFramer(delimiter=b";")
+    for chunk in chunks:
+        framer.feed(chunk)
+        for _ in framer.records():
+            n += 1
+    return n
+
+
+def main() -> None:
+    """Run the benchmark on a recorded stream, optionally given as first argument."""
+    stream_file = sys.argv[1] if len(sys.argv) > 1 else STREAM_FILE
+    with open(stream_file, "rb") as fd:
+        stream = fd.read()
+    # a larger chunk size simulates a backlog in the socket buffer
+    for chunk_size in CHUNK_SIZES:
+        chunks = _chunks(stream * 20, chunk_size)
+        n_records = frame_framer(chunks)
+        assert n_records == frame_bytes(chunks)
+        for name, foo in (("bytes partition", frame_bytes), ("RecordFramer", frame_framer)):
+            seconds = min(timeit.repeat(lambda: foo(chunks), number=1, repeat=5))
+            print(
+                f"chunk {chunk_size:>6} {name:>16}: "
+                f"{seconds * 1e9 / n_records:8.1f} ns/record ({n_records} records)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Per sample cost of the former np.roll kernel and the streaming filters."""
+import timeit
+
+import numpy as np
+
+from ebl_coords.backend.coord_filter import MedianBatchFilter, MedianCoordFilter
+from ebl_coords.backend.gtcommand_records import get_coords, parse_records
+from ebl_coords.backend.transform_data import get_tolerance_mask
+
+STREAM_FILE = "./tests/test_data/gtcommand_test_stream"
+KERNEL_SIZE = 11
+THRESHOLD = 30
+TAGS = 32
+
+
+def roll_kernel(coords: np.ndarray) -> None:
+    """Filter with the former np.roll and np.median kernel.
+
+    Args:
+        coords (np.ndarray): raw coordinates
+    """
+    noise_buffer = np.full((3, 3), dtype=np.float32, fill_value=np.nan)
+    median_buffer = np.full((KERNEL_SIZE, 3), dtype=np.float32, fill_value=np.nan)
+    for coord in coords:
+        noise_buffer[-1] = coord
+        if get_tolerance_mask(noise_buffer, THRESHOLD)[0]:
+            median_buffer[-1] = noise_buffer[1]
+            if not np.isnan(median_buffer).any():
+                np.median(median_buffer, axis=0)
+            median_buffer = np.roll(median_buffer, shift=median_buffer.size - 3)
+        noise_buffer = np.roll(noise_buffer, shift=noise_buffer.size - 3)
+
+
+def streaming(coords: np.ndarray) -> None:
+    """Filter a single tag sample by sample with MedianCoordFilter.
+
+    Args:
+        coords (np.ndarray): raw coordinates
+    """
+    coord_filter = MedianCoordFilter(KERNEL_SIZE, THRESHOLD)
+    for timestamp, coord in enumerate(coords):
+        coord_filter.push(timestamp, coord)
+
+
+def multi_tag(coords: np.ndarray) -> None:
+    """Filter TAGS tags, one step per sample of all tags.
+
+    Args:
+        coords (np.ndarray): raw coordinates, every tag gets a shifted copy
+    """
+    coord_filter = MedianCoordFilter(KERNEL_SIZE, THRESHOLD, capacity=TAGS)
+    slots = np.arange(TAGS)
+    offsets = 1000 * slots[:, None]
+    for timestamp in range(coords.shape[0] // TAGS):
+        coord_filter.step(slots, np.full(TAGS, timestamp), coords[timestamp] + offsets)
+
+
+def batch(coords: np.ndarray) -> None:
+    """Filter with MedianBatchFilter in blocks of 4096 samples.
+
+    Args:
+        coords (np.ndarray): raw coordinates
+    """
+    batch_filter = MedianBatchFilter(KERNEL_SIZE, THRESHOLD)
+    for start in range(0, coords.shape[0], 4096):
+        batch_filter.filter(coords[start : start + 4096])
+
+
+def main() -> None:
+    """Run the benchmark on the recorded stream."""
+    with open(STREAM_FILE, "rb") as fd:
+        stream = fd.read()
+    coords = get_coords(parse_records(stream[: stream.rfind(b";") + 1]))
+    coords = np.concatenate([coords] * 10)
+    for name, foo in (
+        ("np.roll kernel", roll_kernel),
+        ("streaming", streaming),
+        ("batch", batch),
+        (f"{TAGS} tags", multi_tag),
+    ):
+        seconds = min(timeit.repeat(lambda: foo(coords), number=1, repeat=5))
+        print(f"{name:>14}: {seconds * 1e6 / coords.shape[0]:6.2f} us/sample")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,36 @@
 """Base Command. Command-Pattern."""
+import time
 from abc import ABC, abstractmethod
+from enum import IntEnum
 from queue import Queue
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Hashable, Optional
 
+from ebl_coords.backend.tracing import Tracer
 from ebl_coords.decorators import override
 
 
+class Priority(IntEnum):
+    """Priority lane of a command, lower values run first."""
+
+    # live tracking, occupancy redraw
+    REALTIME = 0
+    # editing by the operator, list refills
+    INTERACTIVE = 1
+    # ecos rescrape
+    BACKGROUND = 2
+
+
 class Command(ABC):
     """Base Command Interface.
 
+    A command with a coalesce_key replaces all older pending commands with the same key
+    in a FrameInvoker, e.g. only the newest text of a label is set.
+
+    A command created while a traced hop runs, inherits its trace.
+
+    Commands of a higher priority may overtake commands of a lower priority with another
+    key, commands with the same key keep their order whatever their priority.
+
     Args:
         ABC (_type_): Abstract class
 
@@ -16,15 +38,26 @@ class Command(ABC):
         NotImplementedError: interface
     """
 
-    def __init__(self, content: Any, context: Optional[Any] = None) -> None:
+    priority: Priority = Priority.INTERACTIVE
+
+    def __init__(
+        self, content: Any, context: Optional[Any] = None, key: Optional[Hashable] = None
+    ) -> None:
         """Initialize Command.
 
         Args:
             content (Any): New content.
             context (Optional[Any], optional): Object to be worked on. Defaults to None.
+            key (Optional[Hashable], optional): Commands with the same key run in order,
+                commands without key may run in parallel and in any order. Defaults to None.
         """
         self.context = context
         self.content = content
+        self.key = key
+        self.coalesce_key: Optional[Hashable] = None
+        # monotonic time of creation, used for the queue latency
+        self.created_s = time.monotonic()
+        self.trace = Tracer().current()
 
     @abstractmethod
     def run(self) -> None:
@@ -43,14 +76,17 @@ class WrapperCommand(Command):
         Command (_type_): interface
     """
 
-    def __init__(self, content: Command, context: Queue[Command]) -> None:
+    def __init__(
+        self, content: Command, context: Queue[Command], key: Optional[Hashable] = None
+    ) -> None:
         """Initialize this command.
 
         Args:
             content (Command): gui command
             context (Queue[Command]): gui_queue
+            key (Optional[Hashable], optional): ordering key. Defaults to None.
         """
-        super().__init__(content, context)
+        super().__init__(content, context, key)
         self.content: Command
         self.context: Queue[Command]
 
@@ -67,13 +103,14 @@ class WrapperFunctionCommand(Command):
         Command (_type_): interface
     """
 
-    def __init__(self, content: Callable[..., Any]) -> None:
+    def __init__(self, content: Callable[..., Any], key: Optional[Hashable] = None) -> None:
         """Initialize this command.
 
         Args:
             content (Callable[..., Any]): any function
+            key (Optional[Hashable], optional): ordering key. Defaults to None.
         """
-        super().__init__(content, None)
+        super().__init__(content, None, key)
         self.content: Callable[..., Any]
 
     @override
@@ -1,13 +1,13 @@
 """Command pattern Graph Db."""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Callable
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Hashable
 
 import numpy as np
 import pandas as pd
 
-from ebl_coords.backend.command.command import Command
-from ebl_coords.backend.constants import ECOS_DF_LOCK
+from ebl_coords.backend.command.command import Command, Priority
 from ebl_coords.backend.observable.gtcommand_subject import GtCommandSubject
 from ebl_coords.decorators import override
 from ebl_coords.frontend.command.combobox_cmd import AddComboBoxElementCmd, SetComboBoxCmd
@@ -27,7 +27,8 @@ from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
 from ebl_coords.graph_db.data_elements.node_dc import Node
 from ebl_coords.graph_db.data_elements.switch_item_enum import SwitchItem
 from ebl_coords.graph_db.graph_db_api import GraphDbApi
-from ebl_coords.graph_db.query_generator import generate_guid, get_double_nodes, single_edge
+from ebl_coords.graph_db.query_generator import Query, generate_guid, get_double_nodes, single_edge
+from ebl_coords.graph_db.topology import TopologyCache, TrackTopology
 
 if TYPE_CHECKING:
     from queue import Queue
@@ -91,19 +92,33 @@ class DbCommand(Command):
         Command (_type_): interface
     """
 
-    def __init__(self, content: str) -> None:
+    def __init__(
+        self,
+        content: Query,
+        key: Hashable | None = None,
+        patch: Callable[[TrackTopology], None] | None = None,
+    ) -> None:
         """Initialize command with query.
 
         Args:
-            content (str): query call
+            content (Query): statement and parameters
+            key (Hashable | None, optional): ordering key, e.g. the guid of the written
+                trainswitch. Defaults to None.
+            patch (Callable[[TrackTopology], None] | None, optional): the same write on the
+                cached topology, None invalidates the cache. Defaults to None.
         """
-        super().__init__(content)
+        super().__init__(content, key=key)
         self.context: GraphDbApi = GraphDbApi()
+        self.patch = patch
 
     @override
     def run(self) -> None:
-        """Execute query."""
-        self.context.run_query(self.content)
+        """Execute query, then patch or invalidate the cached topology."""
+        self.context.run_query(*self.content)
+        if self.patch is None:
+            TopologyCache().invalidate()
+        else:
+            TopologyCache().patch(self.patch)
 
 
 class OccupyNextEdgeGuiCommand(Command):
@@ -113,6 +128,8 @@ class OccupyNextEdgeGuiCommand(Command):
         Command (_type_): interface
     """
 
+    priority = Priority.REALTIME
+
     def __init__(self, content: tuple[str, EblCoords, QComboBox], context: Queue[Command]) -> None:
         """Initialize occupy command.
 
@@ -128,34 +145,20 @@ class OccupyNextEdgeGuiCommand(Command):
     @override
     def run(self) -> None:
         """Get next edge and update QCombobox."""
-        weiche = SwitchItem.WEICHE.name
-        double_vertex = EdgeRelation.DOUBLE_VERTEX.name
-
         relation = EdgeRelation.NEUTRAL.name
 
         # check if deflection/ straight exit will be used.
         if self.node_id[-1] == "0":
             neutral_node_id = f"{self.node_id[:-1]}0"
-            with ECOS_DF_LOCK:
-                state = self.ebl_coords.ecos_df.loc[
-                    self.ebl_coords.ecos_df.guid == neutral_node_id
-                ].state.iloc[0]
-            state = int(state)
+            state = self.ebl_coords.ecos_state.state(neutral_node_id)
             assert state in (0, 1)
             if state == 0:
                 relation = EdgeRelation.STRAIGHT.name
             else:
                 relation = EdgeRelation.DEFLECTION.name
 
-        cmd = f"""
-        MATCH(n1:{weiche}{{node_id:'{self.node_id}'}})-[dv:{double_vertex}]->(n2:{weiche})
-        MATCH(n2)-[r:{relation}]->(t)
-        RETURN r.edge_id AS edge_id
-        """
-        df = GraphDbApi().run_query(cmd)
-        assert df.shape[0] <= 1
-        if df.shape[0] == 1:
-            next_edge_id = df.edge_id.iloc[0]
+        next_edge_id = TopologyCache().get().next_edge(self.node_id, relation)
+        if next_edge_id is not None:
             self.context.put(SetComboBoxCmd(content=next_edge_id, context=self.combo_box))
 
 
@@ -223,8 +226,7 @@ class GetTsGuiCommand(Command):
     def run(self) -> None:
         """Get data for trainswitch and create gui_cmds."""
         guid, ui = self.content
-        cmd = get_double_nodes(guid)
-        df = GraphDbApi().run_query(cmd)
+        df = GraphDbApi().run_query(*get_double_nodes(guid))
 
         self.context.put(SetTextCmd(df["n1.bhf"][0], ui.weichen_bhf_txt))
         self.context.put(SetTextCmd(df["n1.ecos_id"][0], ui.weichen_dcc_txt))
@@ -342,10 +344,20 @@ class StreckenSaveGuiCmd(Command):
             target=EDGE_RELATION_TO_ENUM[relation1],
             distance=distance,
         )
-        cmd = single_edge(edge1)
-        GraphDbApi().run_query(cmd)
-        cmd = single_edge(edge2)
-        GraphDbApi().run_query(cmd)
+        cache = TopologyCache()
+        for edge in (edge1, edge2):
+            GraphDbApi().run_query(*single_edge(edge))
+            cache.patch(
+                partial(
+                    TrackTopology.add_edge,
+                    edge_id=edge.id,
+                    source_id=edge.source.id,
+                    dest_id=edge.dest.id,
+                    relation=edge.relation.name,
+                    target=edge.target.name,
+                    distance=edge.distance,
+                )
+            )
         self.context.put(StreckenResetCmd(context=self.content[0]))
 
 
@@ -356,6 +368,8 @@ class MapDrawOccupiedGuiCmd(Command):
         Command (_type_): interface
     """
 
+    priority = Priority.REALTIME
+
     def __init__(self, content: tuple[str, MapEditor, float], context: Queue[Command]) -> None:
         """Redraw map.
 
@@ -363,7 +377,7 @@ class MapDrawOccupiedGuiCmd(Command):
             content (Tuple[str, MapEditor, float]): (edge_id, map_editor, distance)
             context (Queue[Command]): gui_queue
         """
-        super().__init__(content, context)
+        super().__init__(content, context, key=content[1].net_maker)
         self.content: tuple[str, MapEditor, float]
         self.context: Queue[Command]
 
@@ -373,18 +387,9 @@ class MapDrawOccupiedGuiCmd(Command):
         edge_id, map_editor, distance = self.content
         if edge_id is not None:
             GtCommandSubject().set_next_ts(edge_id)
-            weiche = SwitchItem.WEICHE.name
-            cmd = f"""
-            MATCH(n1:{weiche})-[r]->(n2:{weiche})
-            WHERE r.edge_id = '{edge_id}'
-            RETURN r.edge_id AS edge_id, type(r) AS ts_source, r.target AS ts_dest, n1.node_id AS source_id, n2.node_id AS dest_id, r.distance AS distance
-            """
-            df = GraphDbApi().run_query(cmd)
-
-            if df.shape[0] == 1:
-                edge_info = df.iloc[0].to_dict()
-                length = float(edge_info["distance"])
-                edge_info["distance"] = length
+            edge_info = TopologyCache().get().edge(edge_id)
+            if edge_info is not None:
+                length = edge_info["distance"]
                 edge_info["occupied_percent"] = 0
                 if length > 0:
                     edge_info["occupied_percent"] = distance / length
@@ -475,17 +480,15 @@ class MapDrawConnectTopoGuiCmd(Command):
             content (Tuple[EblCoords, MapTsTopopoint, MapTsTopopoint, NetMaker]): (ebl_coords, neutral_switch, other_switch, netmaker)
             context (Queue[Command]): gui_queue
         """
-        super().__init__(content, context)
+        super().__init__(content, context, key=content[3])
         self.content: tuple[EblCoords, MapTsTopopoint, MapTsTopopoint, NetMaker]
         self.context: Queue[Command]
 
     @override
     def run(self) -> None:
-        """Draw edges in consideration with state of ecos_df."""
+        """Draw edges in consideration with state of ecos_state."""
         ebl_coords, neutral, other, netmaker = self.content
-        with ECOS_DF_LOCK:
-            state = ebl_coords.ecos_df.loc[ebl_coords.ecos_df.guid == neutral.guid].state.iloc[0]
-        state = int(state)
+        state = ebl_coords.ecos_state.state(neutral.guid)
         if other.coords is not None and neutral.coords is not None:
             u, v = neutral.coords
             ut, vt = other.coords
@@ -518,7 +521,7 @@ class MapDrawConnectTsGuiCmd(Command):
             content (Tuple[Dict[str, MapTsTopopoint], NetMaker]): (switches from map_editor.zone, netmaker)
             context (Queue[Command]): gui_queue
         """
-        super().__init__(content, context)
+        super().__init__(content, context, key=content[1])
         self.content: tuple[dict[str, MapTsTopopoint], NetMaker]
         self.context: Queue[Command]
 
@@ -526,26 +529,17 @@ class MapDrawConnectTsGuiCmd(Command):
     def run(self) -> None:
         """Draw a line between two trainswitches if edge exists."""
         switches, net_maker = self.content
-        double_vertex = EdgeRelation.DOUBLE_VERTEX.name
-        cmd = f"""
-        MATCH (n1)-[r]->(n2)\
-        WHERE NOT type(r) = '{double_vertex}'\
-        RETURN n1.node_id, n2.node_id, r.target AS target, type(r) AS relation
-        """
-        df = GraphDbApi().run_query(cmd)
-        if df.size > 0:
-            for _, row in df.iterrows():
-                if row["target"] is not None:
-                    ts1 = switches.get(f"{row['n1.node_id']}{row['relation']}")
-                    ts2 = switches.get(f"{row['n2.node_id']}{row['target']}")
-                    if (
-                        ts1 is not None
-                        and ts2 is not None
-                        and ts1.coords is not None
-                        and ts2.coords is not None
-                    ):
-                        u1, v1 = ts1.coords
-                        u2, v2 = ts2.coords
-                        self.context.put(
-                            DrawGridLineCmd(content=(u1, v1, u2, v2, False), context=net_maker)
-                        )
+        for source_id, dest_id, target, relation in TopologyCache().get().track_edges():
+            ts1 = switches.get(f"{source_id}{relation}")
+            ts2 = switches.get(f"{dest_id}{target}")
+            if (
+                ts1 is not None
+                and ts2 is not None
+                and ts1.coords is not None
+                and ts2.coords is not None
+            ):
+                u1, v1 = ts1.coords
+                u2, v2 = ts2.coords
+                self.context.put(
+                    DrawGridLineCmd(content=(u1, v1, u2, v2, False), context=net_maker)
+                )
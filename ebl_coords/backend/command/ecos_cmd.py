@@ -1,55 +1,64 @@
 """Command pattern Pandas."""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Hashable
 
-import pandas as pd
-
-from ebl_coords.backend.command.command import Command
-from ebl_coords.backend.constants import ECOS_DF_LOCK
+from ebl_coords.backend.command.command import Command, Priority
 from ebl_coords.decorators import override
 
 if TYPE_CHECKING:
+    from ebl_coords.backend.ecos_state import EcosStateTable
     from ebl_coords.main import EblCoords
 
 
 class UpdateStateCommand(Command):
-    """Update value in state column.
+    """Update the state of an accessory.
 
     Args:
         Command (_type_): interface
     """
 
-    def __init__(self, content: dict[str, int | str], context: pd.DataFrame) -> None:
-        """Initialize with ecos Dataframe.
+    priority = Priority.REALTIME
+
+    def __init__(
+        self,
+        content: dict[str, int | str],
+        context: EcosStateTable,
+        key: Hashable | None = None,
+    ) -> None:
+        """Initialize with ecos state table.
 
         Args:
             content (Dict[str, int | str]): keys = id, ip, state.
-            context (pd.DataFrame): ecos Dataframe.
+            context (EcosStateTable): ecos state table.
+            key (Hashable | None, optional): ordering key, e.g. of the redraw showing
+                the state. Defaults to None.
         """
-        super().__init__(content, context)
+        super().__init__(content, context, key)
         self.content: dict[str, int | str]
-        self.context: pd.DataFrame
+        self.context: EcosStateTable
 
     @override
     def run(self) -> None:
         """Update existing state entry."""
-        ecos_id = self.content["id"]
-        ip = self.content["ip"]
-        state = self.content["state"]
-
-        with ECOS_DF_LOCK:
-            index = self.context.loc[(self.context.id == ecos_id) & (self.context.ip == ip)].index
-            self.context.loc[index, "state"] = state
+        ecos_id = int(self.content["id"])
+        ip = str(self.content["ip"])
+        state = int(self.content["state"])
+        self.context.set_state(ip, ecos_id, state)
 
 
 class UpdateEocsDfCommand(Command):
-    """Update the EcosDataframe from sockets.
+    """Update the EcosDataframe, the sockets are crawled only if the cache is stale.
+
+    The crawl blocks for up to seconds, as a BACKGROUND command it runs on the
+    background lane of the Invoker and does not hold up any other command.
 
     Args:
         Command (_type_): interface
     """
 
+    priority = Priority.BACKGROUND
+
     def __init__(self, context: EblCoords) -> None:
         """Initialize this command.
 
@@ -61,5 +70,5 @@ class UpdateEocsDfCommand(Command):
 
     @override
     def run(self) -> None:
-        """Update and set ecos_df in ebl_coords."""
+        """Merge the refreshed ecos df into ecos_state of ebl_coords."""
         self.context.update_ecos_df()
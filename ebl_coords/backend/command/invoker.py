@@ -2,32 +2,206 @@
 from __future__ import annotations
 
 import time
-from queue import Queue
-from threading import Thread
-from typing import TYPE_CHECKING
+import warnings
+from queue import Empty
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, NamedTuple
+
+from ebl_coords.backend.command.command import Priority
+from ebl_coords.backend.command.lane_queue import CommandLanes, LaneQueue
+from ebl_coords.backend.constants import GUI_FRAME_BUDGET_MS, WORKER_THREADS
+from ebl_coords.backend.tracing import Tracer
 
 if TYPE_CHECKING:
+    from queue import Queue
+
     from ebl_coords.backend.command.command import Command
 
 
+class InvokerStats(NamedTuple):
+    """Counters of an invoker, latency is measured from command creation to completion."""
+
+    completed: int
+    failed: int
+    pending: int
+    throughput_per_s: float
+    latency_mean_ms: float
+    latency_max_ms: float
+    run_mean_ms: float
+
+
 class Invoker:
-    """A command invoker."""
+    """A command invoker with a pool of worker threads.
 
-    def start_loop(self, queue: Queue[Command], interval_s: float) -> Thread:
-        """Run all commands in a new thread from queue every interval_s.
+    A dispatcher blocks on the command queue and hands every command to a lane, each
+    lane is a worker thread. Commands without key are spread round robin over all
+    lanes, commands with the same key run in order on the same lane. Commands
+    of priority BACKGROUND, e.g. the ecos rescrape, run in order on a lane of their own,
+    so blocking I/O never holds up the other lanes. Within a lane, commands are run by
+    priority, see LaneQueue.
+    """
+
+    def __init__(self, workers: int = WORKER_THREADS) -> None:
+        """Initialize the lanes.
 
         Args:
-            queue (Queue[Command]): command queue
-            interval_s (float): time delta in seconds
+            workers (int, optional): number of worker threads. Defaults to WORKER_THREADS.
         """
+        self.workers = max(workers, 1)
+        self.lanes: list[LaneQueue] = [LaneQueue() for _ in range(self.workers)]
+        self.background = LaneQueue()
+        # lane of the last command without key
+        self._next_lane: int = 0
+        self.threads: list[Thread] = []
+        self.queue: Queue[Command] | None = None
+        self._stats_lock = Lock()
+        self._start_s = time.monotonic()
+        self._dispatched: int = 0
+        self._completed: int = 0
+        self._failed: int = 0
+        self._latency_sum_s: float = 0.0
+        self._latency_max_s: float = 0.0
+        self._run_sum_s: float = 0.0
 
-        def _timer_loop() -> None:
-            while True:
-                while not queue.empty():
-                    cmd = queue.get()
+    def _lane(self, cmd: Command) -> LaneQueue:
+        """Get the lane of a command.
+
+        Args:
+            cmd (Command): command
+
+        Returns:
+            LaneQueue: lane
+        """
+        if cmd.priority is Priority.BACKGROUND:
+            return self.background
+        if cmd.key is None:
+            self._next_lane = (self._next_lane + 1) % self.workers
+            return self.lanes[self._next_lane]
+        return self.lanes[hash(cmd.key) % self.workers]
+
+    def _dispatch(self, queue: Queue[Command]) -> None:
+        while True:
+            cmd = queue.get()
+            with self._stats_lock:
+                self._dispatched += 1
+            self._lane(cmd).put(cmd)
+
+    def _work(self, lane: LaneQueue) -> None:
+        tracer = Tracer()
+        while True:
+            cmd = lane.get()
+            start_s = time.monotonic()
+            failed = False
+            try:
+                with tracer.hop(cmd.trace, f"worker.{type(cmd).__name__}"):
                     cmd.run()
-                time.sleep(interval_s)
+            except Exception as err:  # pylint: disable=W0718
+                failed = True
+                warnings.warn(f"{type(cmd).__name__} failed: {err!r}")
+            end_s = time.monotonic()
+            latency_s = end_s - cmd.created_s
+            with self._stats_lock:
+                self._completed += 1
+                self._failed += failed
+                self._run_sum_s += end_s - start_s
+                self._latency_sum_s += latency_s
+                self._latency_max_s = max(self._latency_max_s, latency_s)
+
+    def start_loop(self, queue: Queue[Command]) -> list[Thread]:
+        """Run all commands from queue as soon as they are put.
+
+        Args:
+            queue (Queue[Command]): command queue
+
+        Returns:
+            list[Thread]: dispatcher and worker threads
+        """
+        self._start_s = time.monotonic()
+        self.queue = queue
+        self.threads = [Thread(target=self._dispatch, args=[queue], daemon=True)]
+        self.threads.extend(
+            Thread(target=self._work, args=[lane], daemon=True)
+            for lane in [*self.lanes, self.background]
+        )
+        for thread in self.threads:
+            thread.start()
+        return self.threads
+
+    def depths(self) -> dict[Priority, int]:
+        """Get the number of dispatched but not started commands per priority.
+
+        Returns:
+            dict[Priority, int]: depth per priority over all lanes
+        """
+        depths = {p: 0 for p in Priority}
+        for lane in [*self.lanes, self.background]:
+            for priority, depth in lane.depths().items():
+                depths[priority] += depth
+        return depths
+
+    @property
+    def stats(self) -> InvokerStats:
+        """Current counters, pending includes the commands not yet dispatched."""
+        queued = 0 if self.queue is None else self.queue.qsize()
+        with self._stats_lock:
+            completed = max(self._completed, 1)
+            return InvokerStats(
+                completed=self._completed,
+                failed=self._failed,
+                pending=queued + self._dispatched - self._completed,
+                throughput_per_s=self._completed / (time.monotonic() - self._start_s),
+                latency_mean_ms=self._latency_sum_s / completed * 1000,
+                latency_max_ms=self._latency_max_s * 1000,
+                run_mean_ms=self._run_sum_s / completed * 1000,
+            )
+
+
+class FrameInvoker:
+    """Run the commands of a queue within a time budget per frame, e.g. in a QTimer.
+
+    Commands, which do not fit into the budget, are kept for the next frame. Before every
+    frame only the newest pending command per coalesce_key is kept, at its position.
+    Commands are run by priority, see CommandLanes.
+    """
+
+    def __init__(self, queue: Queue[Command], budget_ms: float = GUI_FRAME_BUDGET_MS) -> None:
+        """Initialize the frame invoker.
+
+        Args:
+            queue (Queue[Command]): command queue
+            budget_ms (float, optional): time budget per frame. Defaults to GUI_FRAME_BUDGET_MS.
+        """
+        self.queue = queue
+        self.budget_s = budget_ms / 1000
+        self.backlog = CommandLanes()
+        self.executed: int = 0
+        self.coalesced: int = 0
+        self.over_budget_frames: int = 0
+
+    def run_frame(self) -> int:
+        """Run pending commands until the budget is spent, at least one.
+
+        Returns:
+            int: number of executed commands
+        """
+        start_s = time.monotonic()
+        while True:
+            try:
+                self.backlog.append(self.queue.get_nowait())
+            except Empty:
+                break
+        self.coalesced += self.backlog.coalesce()
 
-        thread = Thread(target=_timer_loop, daemon=True)
-        thread.start()
-        return thread
+        executed = 0
+        tracer = Tracer()
+        while self.backlog:
+            cmd = self.backlog.popleft()
+            with tracer.hop(cmd.trace, f"gui.{type(cmd).__name__}"):
+                cmd.run()
+            executed += 1
+            if time.monotonic() - start_s >= self.budget_s:
+                break
+        if self.backlog:
+            self.over_budget_frames += 1
+        self.executed += executed
+        return executed
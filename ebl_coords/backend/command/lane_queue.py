@@ -0,0 +1,186 @@
+"""Priority lanes for commands."""
+from __future__ import annotations
+
+import time
+from collections import deque
+from itertools import count
+from queue import Queue
+from typing import TYPE_CHECKING, Hashable
+
+from ebl_coords.backend.command.command import Priority
+from ebl_coords.backend.constants import STARVATION_MS
+
+if TYPE_CHECKING:
+    from ebl_coords.backend.command.command import Command
+
+
+class CommandLanes:
+    """One FIFO lane per priority.
+
+    The highest non empty lane is served first. If the oldest command of a lower lane
+    waited longer than max_wait_ms, it is served instead, so no lane starves.
+
+    Priorities only reorder commands of different keys. If an older command with the
+    same key waits in another lane, it is served first, so commands with the same key
+    keep their order, e.g. the clear and draw commands of one map.
+    """
+
+    def __init__(self, max_wait_ms: float = STARVATION_MS) -> None:
+        """Initialize empty lanes.
+
+        Args:
+            max_wait_ms (float, optional): maximal wait before a command of a lower lane
+                is served. Defaults to STARVATION_MS.
+        """
+        self.max_wait_s = max_wait_ms / 1000
+        # (monotonic time put, put sequence, command)
+        self.lanes: dict[Priority, deque[tuple[float, int, Command]]] = {
+            p: deque() for p in Priority
+        }
+        self._sequence = count()
+        # lanes of the pending commands per key, in the order they were put
+        self.keys: dict[Hashable, deque[Priority]] = {}
+        self.max_depths: dict[Priority, int] = {p: 0 for p in Priority}
+        self.served: dict[Priority, int] = {p: 0 for p in Priority}
+        self.promoted: int = 0
+
+    def __len__(self) -> int:
+        """Number of commands in all lanes."""
+        return sum(len(lane) for lane in self.lanes.values())
+
+    def append(self, cmd: Command) -> None:
+        """Put a command into the lane of its priority.
+
+        Args:
+            cmd (Command): command
+        """
+        lane = self.lanes[cmd.priority]
+        lane.append((time.monotonic(), next(self._sequence), cmd))
+        self.max_depths[cmd.priority] = max(self.max_depths[cmd.priority], len(lane))
+        if cmd.key is not None:
+            self.keys.setdefault(cmd.key, deque()).append(cmd.priority)
+
+    def popleft(self) -> Command:
+        """Take the next command.
+
+        Raises:
+            IndexError: all lanes are empty
+
+        Returns:
+            Command: command
+        """
+        waiting = [p for p in Priority if self.lanes[p]]
+        if not waiting:
+            raise IndexError("pop from empty lanes")
+        priority = waiting[0]
+        now = time.monotonic()
+        for lower in waiting[1:]:
+            if now - self.lanes[lower][0][0] > self.max_wait_s:
+                priority = lower
+                self.promoted += 1
+                break
+        cmd = self.lanes[priority][0][2]
+        if cmd.key is None:
+            self.served[priority] += 1
+            return self.lanes[priority].popleft()[2]
+        # the oldest command of this key, may wait in another lane
+        priority = self.keys[cmd.key][0]
+        lane = self.lanes[priority]
+        index = next(i for i, item in enumerate(lane) if item[2].key == cmd.key)
+        cmd = lane[index][2]
+        del lane[index]
+        self._pop_key(cmd.key)
+        self.served[priority] += 1
+        return cmd
+
+    def _pop_key(self, key: Hashable) -> None:
+        """Forget the oldest pending command of a key.
+
+        Args:
+            key (Hashable): ordering key
+        """
+        lanes = self.keys[key]
+        lanes.popleft()
+        if not lanes:
+            del self.keys[key]
+
+    def coalesce(self) -> int:
+        """Drop all commands, which are replaced by a newer one with the same coalesce_key.
+
+        Returns:
+            int: number of dropped commands
+        """
+        dropped = 0
+        for priority, lane in self.lanes.items():
+            seen: set[Hashable] = set()
+            kept: deque[tuple[float, int, Command]] = deque()
+            for item in reversed(lane):
+                key = item[2].coalesce_key
+                if key is not None:
+                    if key in seen:
+                        dropped += 1
+                        continue
+                    seen.add(key)
+                kept.appendleft(item)
+            self.lanes[priority] = kept
+        if dropped:
+            self._index_keys()
+        return dropped
+
+    def _index_keys(self) -> None:
+        """Rebuild the lanes per key from the lanes, in the order the commands were put."""
+        items = sorted(
+            (
+                (sequence, priority, cmd.key)
+                for priority, lane in self.lanes.items()
+                for _, sequence, cmd in lane
+                if cmd.key is not None
+            ),
+            key=lambda item: item[0],
+        )
+        self.keys = {}
+        for _, priority, key in items:
+            self.keys.setdefault(key, deque()).append(priority)
+
+    def depths(self) -> dict[Priority, int]:
+        """Get the current depth of every lane.
+
+        Returns:
+            dict[Priority, int]: number of commands per lane
+        """
+        return {p: len(lane) for p, lane in self.lanes.items()}
+
+
+class LaneQueue(Queue):  # type: ignore
+    """A Queue, which hands out commands by priority, see CommandLanes."""
+
+    def __init__(self, maxsize: int = 0, max_wait_ms: float = STARVATION_MS) -> None:
+        """Initialize the queue.
+
+        Args:
+            maxsize (int, optional): see Queue. Defaults to 0.
+            max_wait_ms (float, optional): see CommandLanes. Defaults to STARVATION_MS.
+        """
+        self.max_wait_ms = max_wait_ms
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        self.lanes = CommandLanes(self.max_wait_ms)
+
+    def _qsize(self) -> int:
+        return len(self.lanes)
+
+    def _put(self, item: Command) -> None:
+        self.lanes.append(item)
+
+    def _get(self) -> Command:
+        return self.lanes.popleft()
+
+    def depths(self) -> dict[Priority, int]:
+        """Get the current depth of every lane.
+
+        Returns:
+            dict[Priority, int]: number of commands per lane
+        """
+        with self.mutex:
+            return self.lanes.depths()
@@ -1,6 +1,6 @@
 """Constants, server config."""
+from os import environ
 from os.path import abspath
-from threading import RLock
 
 from PyQt6.QtGui import QColor
 
@@ -12,6 +12,8 @@ NEO4J_URI_LOCAL: str = "bolt://localhost:7687"
 NEO4J_URI_CONTAINER: str = "bolt://neo4j:7687"
 NEO4J_USR: str = "neo4j"
 NEO4J_PASSWD: str = "password"
+# maximal number of concurrently used neo4j sessions
+GRAPH_DB_POOL_SIZE: int = 8
 
 # gtcommand websocket serverside
 GTCOMMAND_IP: str = "192.168.128.20"
@@ -20,6 +22,25 @@ if MOCK_FLG:
     GTCOMMAND_IP = "127.0.0.1"
     GTCOMMAND_PORT = 42042
 
+# ECoS simulator, see ecos_simulator
+ECOS_MOCK_PORT: int = 42043
+ECOS_MOCK_FILE: str = str(abspath("./ecos_mock/ecos.csv"))
+
+# terminates every successful ECoS reply
+ECOS_REPLY_END: bytes = b"<END 0 (OK)>"
+
+# terminates every line of an ECoS reply
+ECOS_LINE_END: bytes = b"\r\n"
+
+# starts the last line of every ECoS reply, e.g. <END 15 (unknown object at 4)> on errors
+ECOS_END_LINE: bytes = b"<END "
+
+# timeout in s of a single receive or send of the ECoS scraper
+ECOS_TIMEOUT_S: float = 5.0
+
+# delay in s before a dropped ECoS connection is reconnected and resubscribed
+ECOS_RECONNECT_S: float = 2.0
+
 # if true, set all z-coordinates to zero.
 IGNORE_Z_AXIS: bool = True
 
@@ -29,13 +50,50 @@ MIN_DELTA_DISTANCE: float = 0.03
 # GTCommand train switch hit threshold
 TS_HIT_THRESHOLD: int = 50
 
+# search train switch hits in the whole layout instead of the next train switches only
+GLOBAL_LOCALIZATION: bool = False
+
+# coordinate filter backend, "median" or "kalman"
+COORD_FILTER_BACKEND: str = "median"
+
+# coordinate filter steps with up to this many tags run in python, larger steps with numpy
+FILTER_SCALAR_SLOTS: int = 8
+
+# kalman filter, process noise [mm^2/ms^3], measurement noise [mm^2], predict ahead [ms]
+KALMAN_PROCESS_NOISE: float = 1e-5
+KALMAN_MEASUREMENT_NOISE: float = 100.0
+KALMAN_PREDICT_MS: float = 0.0
+
+# a command of a lower priority lane is served after waiting this long in ms
+STARVATION_MS: float = 500
+
+# worker threads of the worker queue, commands without key share one of them
+WORKER_THREADS: int = 4
+
+# maximal pending notifications of an asynchronous observer
+MAILBOX_SIZE: int = 256
+
 # callback deltatime in ms, 30 Calls per Second
 CPS: int = 60
 CALLBACK_DT_MS: int = 1000 // CPS
 
+# time budget for gui commands per callback in ms
+GUI_FRAME_BUDGET_MS: float = CALLBACK_DT_MS / 2
+
+# record latency histograms from GtCommand receive to screen update, dumped to TRACE_FILE,
+# off unless the environment variable EBL_TRACING is 1
+TRACING: bool = environ.get("EBL_TRACING", "0") == "1"
+TRACE_FILE: str = str(abspath("./trace_dump.json"))
+
 # zone dump file
 ZONE_FILE: str = str(abspath("./zone_dump.json"))
 
+# ecos inventory cache file, validated against the object count of every ecos on startup
+ECOS_CACHE_FILE: str = str(abspath("./ecos_cache.json"))
+
+# layout import: rows per UNWIND statement, all statements run in one transaction
+LAYOUT_BATCH_SIZE: int = 500
+
 # config file
 CONFIG_JSON: str = str(abspath("./ebl_config.json"))
 
@@ -54,6 +112,3 @@ POINT_HEX: QColor = QColor("#FFFFFF")  # white
 LINE_HEX: QColor = QColor("#FFFFFF")  # white
 TEXT_HEX: QColor = QColor("#FFFFFF")  # white
 OCCUPIED_HEX: QColor = QColor("#FF0000")  # red
-
-# ecos df lock
-ECOS_DF_LOCK = RLock()
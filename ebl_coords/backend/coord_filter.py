@@ -0,0 +1,608 @@
+"""Streaming filters for GoT coordinates."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from math import isnan
+
+import numpy as np
+
+from ebl_coords.backend.constants import FILTER_SCALAR_SLOTS, KALMAN_MEASUREMENT_NOISE
+from ebl_coords.backend.constants import KALMAN_PREDICT_MS, KALMAN_PROCESS_NOISE
+from ebl_coords.backend.framing import RecordFramer
+from ebl_coords.backend.gtcommand_records import SAMPLE_DTYPE, get_coords, parse_records
+from ebl_coords.backend.transform_data import get_median_filtered, get_tolerance_mask
+
+
+class NoiseFilter:
+    """Compare the distance of a point to both neighbours, see get_tolerance_mask.
+
+    Only the last two points of every slot are kept, the middle point is released as
+    soon as its successor is known. push_one keeps the points of its slot as python
+    floats, push writes them back.
+    """
+
+    def __init__(self, threshold: float, capacity: int = 1) -> None:
+        """Initialize the filter with empty neighbours.
+
+        Args:
+            threshold (float): minimal distance of closer neighbour.
+            capacity (int, optional): number of slots. Defaults to 1.
+        """
+        self.threshold_sq = threshold * threshold
+        # [:, 0] second last, [:, 1] last point
+        self._points = np.full((capacity, 2, 3), dtype=np.float32, fill_value=np.nan)
+        # points of the slots pushed by push_one, newer than _points
+        self._scalar: dict[int, list[list[float]]] = {}
+
+    def resize(self, capacity: int) -> None:
+        """Add empty slots.
+
+        Args:
+            capacity (int): new number of slots
+        """
+        pad = ((0, capacity - self._points.shape[0]), (0, 0), (0, 0))
+        self._points = np.pad(self._points, pad, constant_values=np.nan)
+
+    def push(self, slots: np.ndarray, coords: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Add one point per slot and release the valid predecessors.
+
+        Args:
+            slots (np.ndarray): unique slots
+            coords (np.ndarray): new coordinates, dim = Nx3
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (mask of the slots with a valid predecessor,
+            valid predecessors as float32)
+        """
+        if self._scalar:
+            for slot in slots.tolist():
+                if slot in self._scalar:
+                    self._points[slot] = self._scalar.pop(slot)
+        points = np.concatenate([self._points[slots], coords[:, None].astype(np.float32)], axis=1)
+        d = np.square(np.diff(points.astype(np.float64), axis=1)).sum(axis=2)
+        # nan if the predecessor has no neighbour yet, same as the reduction with min
+        valid = d.min(axis=1) <= self.threshold_sq
+        self._points[slots] = points[:, 1:]
+        return valid, points[valid, 1]
+
+    def push_one(self, slot: int, coord: list[float]) -> list[float] | None:
+        """Add a point of a single slot, faster than push for a few slots.
+
+        Args:
+            slot (int): slot
+            coord (list[float]): new coordinate, values of float32
+
+        Returns:
+            list[float] | None: valid predecessor, None if not valid
+        """
+        points = self._scalar.get(slot)
+        if points is None:
+            points = self._scalar[slot] = self._points[slot].tolist()
+        (ax, ay, az), last = points
+        points[0], points[1] = last, coord
+        bx, by, bz = last
+        cx, cy, cz = coord
+        d_before = (ax - bx) * (ax - bx) + (ay - by) * (ay - by) + (az - bz) * (az - bz)
+        d_after = (bx - cx) * (bx - cx) + (by - cy) * (by - cy) + (bz - cz) * (bz - cz)
+        # nan if the predecessor has no neighbour yet, same as the reduction with min
+        if isnan(d_before) or isnan(d_after) or min(d_before, d_after) > self.threshold_sq:
+            return None
+        return last
+
+
+class _SortedWindow:
+    """Window of a single slot as python floats, with a sorted copy per axis."""
+
+    __slots__ = ("count", "ring", "axes")
+
+    def __init__(self, count: int, ring: list[list[float]]) -> None:
+        """Sort the filled part of the ring buffer.
+
+        Args:
+            count (int): number of points pushed so far
+            ring (list[list[float]]): ring buffer of the slot, kernel_size x 3
+        """
+        self.count = count
+        self.ring = ring
+        filled = ring[: min(count, len(ring))]
+        self.axes: list[list[float]] = [sorted(axis) for axis in zip(*filled)] or [[], [], []]
+
+
+class MedianFilter:
+    """Sliding window median over the last kernel_size points of every slot.
+
+    The windows are kept in ring buffers, the output is identical to np.median over the
+    window. No output is given until the window is filled.
+
+    push sorts all filled windows at once. push_one keeps the window of its slot as
+    python floats with a sorted copy per axis, which is updated incrementally. push
+    writes these windows back to the ring buffers.
+    """
+
+    def __init__(self, kernel_size: int, capacity: int = 1) -> None:
+        """Initialize empty windows.
+
+        Args:
+            kernel_size (int): window size
+            capacity (int, optional): number of slots. Defaults to 1.
+        """
+        self.kernel_size = kernel_size
+        self._ring = np.zeros((capacity, kernel_size, 3), dtype=np.float32)
+        self._count = np.zeros(capacity, dtype=np.intp)
+        # windows of the slots pushed by push_one, newer than _ring and _count
+        self._scalar: dict[int, _SortedWindow] = {}
+
+    def resize(self, capacity: int) -> None:
+        """Add empty slots.
+
+        Args:
+            capacity (int): new number of slots
+        """
+        n = capacity - self._count.size
+        self._ring = np.pad(self._ring, ((0, n), (0, 0), (0, 0)))
+        self._count = np.pad(self._count, (0, n))
+
+    def push(self, slots: np.ndarray, coords: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Add one point per slot to the windows.
+
+        Args:
+            slots (np.ndarray): unique slots
+            coords (np.ndarray): new coordinates, dim = Nx3
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (mask of the slots with a filled window,
+            medians of those windows as float32)
+        """
+        if self._scalar:
+            for slot in slots.tolist():
+                window = self._scalar.pop(slot, None)
+                if window is not None:
+                    self._ring[slot] = window.ring
+                    self._count[slot] = window.count
+        k = self.kernel_size
+        count = self._count[slots]
+        self._ring[slots, count % k] = coords
+        count += 1
+        self._count[slots] = count
+        ready = count >= k
+        # the order within the window does not matter, sort the filled windows only
+        window = np.sort(self._ring[slots[ready]], axis=1)
+        half = k // 2
+        if k % 2 == 1:
+            return ready, window[:, half]
+        return ready, (window[:, half - 1] + window[:, half]) / np.float32(2)
+
+    def push_one(self, slot: int, coord: list[float]) -> list[float] | None:
+        """Add a point of a single slot, faster than push for a few slots.
+
+        Args:
+            slot (int): slot
+            coord (list[float]): new coordinate, values of float32
+
+        Returns:
+            list[float] | None: median of the window, None while warming up
+        """
+        k = self.kernel_size
+        window = self._scalar.get(slot)
+        if window is None:
+            window = _SortedWindow(int(self._count[slot]), self._ring[slot].tolist())
+            self._scalar[slot] = window
+        i = window.count % k
+        if window.count >= k:
+            for axis, old in zip(window.axes, window.ring[i]):
+                del axis[bisect_left(axis, old)]
+        window.ring[i] = coord
+        for axis, value in zip(window.axes, coord):
+            insort(axis, value)
+        window.count += 1
+        if window.count < k:
+            return None
+        half = k // 2
+        if k % 2 == 1:
+            return [axis[half] for axis in window.axes]
+        # the float64 sum of two float32 rounds to the same float32 as a float32 sum
+        return [(axis[half - 1] + axis[half]) / 2 for axis in window.axes]
+
+
+class MedianBatchFilter:
+    """Noise and median filter for whole blocks of coordinates.
+
+    Gives the same output as NoiseFilter followed by MedianFilter for a single tag, the
+    tails needed by both filters are carried over to the next block.
+    """
+
+    def __init__(self, kernel_size: int, threshold: float) -> None:
+        """Initialize the filter with empty tails.
+
+        Args:
+            kernel_size (int): median window size
+            threshold (float): minimal distance of closer neighbour.
+        """
+        self.kernel_size = kernel_size
+        self.threshold = threshold
+        self._raw_tail = np.full((2, 3), dtype=np.float32, fill_value=np.nan)
+        self._valid_tail = np.empty((0, 3), dtype=np.float32)
+
+    def filter(self, coords: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Filter a block of raw coordinates.
+
+        Args:
+            coords (np.ndarray): raw coordinates, dim = Nx3
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (indices of the samples in coords, which
+            released a filtered coordinate, filtered coordinates as float32 dim = Mx3)
+        """
+        raw = np.concatenate([self._raw_tail, coords.astype(np.float32)])
+        mask = get_tolerance_mask(raw, self.threshold)
+        # mask[i] belongs to raw[i + 1], which is released by coords[i]
+        released = np.flatnonzero(mask)
+        valid = np.concatenate([self._valid_tail, raw[1:-1][mask]])
+
+        skip = self.kernel_size - 1 - self._valid_tail.shape[0]
+        filtered = get_median_filtered(valid, self.kernel_size)
+
+        self._raw_tail = raw[-2:]
+        self._valid_tail = valid[valid.shape[0] - min(self.kernel_size - 1, valid.shape[0]) :]
+        return released[skip:], filtered
+
+
+def filter_recording(
+    stream_file: str, kernel_size: int = 11, threshold: float = 30, block_size: int = 1 << 20
+) -> np.ndarray:
+    """Filter a recorded GtCommand stream block wise, every tag on its own.
+
+    Args:
+        stream_file (str): path to the recorded byte stream
+        kernel_size (int, optional): median window size. Defaults to 11.
+        threshold (float, optional): noise filter threshold. Defaults to 30.
+        block_size (int, optional): bytes read at once. Defaults to 1 MiB.
+
+    Returns:
+        np.ndarray: filtered samples with SAMPLE_DTYPE
+    """
+    batch_filters: dict[int, MedianBatchFilter] = {}
+    framer = RecordFramer(delimiter=b";", capacity=2 * block_size)
+    results = []
+    with open(stream_file, "rb") as fd:
+        while block := fd.read(block_size):
+            framer.feed(block)
+            batch = parse_records(framer.pop_complete())
+            for tag_id in np.unique(batch["tag_id"]).tolist():
+                tag_batch = batch[batch["tag_id"] == tag_id]
+                batch_filter = batch_filters.setdefault(
+                    tag_id, MedianBatchFilter(kernel_size, threshold)
+                )
+                released, filtered = batch_filter.filter(get_coords(tag_batch))
+                samples = np.empty(released.size, dtype=SAMPLE_DTYPE)
+                samples["timestamp"] = tag_batch["timestamp"][released]
+                samples["tag_id"] = tag_id
+                samples["x"], samples["y"], samples["z"] = filtered.T
+                samples["vx"], samples["vy"], samples["vz"] = np.nan, np.nan, np.nan
+                results.append(samples)
+    if not results:
+        return np.empty(0, dtype=SAMPLE_DTYPE)
+    samples = np.concatenate(results)
+    return samples[np.argsort(samples["timestamp"], kind="stable")]
+
+
+class CoordFilter(ABC):
+    """Filter backend for the coordinates of many tags.
+
+    The state of every tag is stored in a slot of contiguous arrays, a step updates
+    all given slots at once.
+
+    Args:
+        ABC (_type_): Abstract class
+
+    Raises:
+        NotImplementedError: interface
+    """
+
+    capacity: int
+
+    @abstractmethod
+    def resize(self, capacity: int) -> None:
+        """Add empty slots.
+
+        Args:
+            capacity (int): new number of slots
+
+        Raises:
+            NotImplementedError: interface
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def step(
+        self, slots: np.ndarray, timestamps: np.ndarray, coords: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Add one raw coordinate per slot.
+
+        Args:
+            slots (np.ndarray): unique slots
+            timestamps (np.ndarray): timestamps in ms
+            coords (np.ndarray): raw coordinates in mm, dim = Nx3
+
+        Raises:
+            NotImplementedError: interface
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (mask of the released inputs,
+            positions in mm, velocities in mm/ms or nan if not estimated) as float32
+        """
+        raise NotImplementedError
+
+    def push(
+        self, timestamp: int, coord: np.ndarray, slot: int = 0
+    ) -> tuple[np.ndarray, np.ndarray | None] | None:
+        """Add a raw coordinate of a single slot.
+
+        Args:
+            timestamp (int): timestamp in ms
+            coord (np.ndarray): raw coordinate in mm
+            slot (int, optional): slot. Defaults to 0.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray | None] | None: (position, velocity or None if
+            not estimated), None if no output is released.
+        """
+        released, positions, velocities = self.step(
+            np.array([slot]), np.array([timestamp]), coord.reshape(1, 3)
+        )
+        if not released[0]:
+            return None
+        if np.isnan(velocities[0]).any():
+            return positions[0], None
+        return positions[0], velocities[0]
+
+
+class MedianCoordFilter(CoordFilter):
+    """Noise filter followed by a median filter.
+
+    Args:
+        CoordFilter (_type_): interface
+    """
+
+    def __init__(self, kernel_size: int, threshold: float, capacity: int = 1) -> None:
+        """Initialize both filters.
+
+        Args:
+            kernel_size (int): median window size
+            threshold (float): minimal distance of closer neighbour.
+            capacity (int, optional): number of slots. Defaults to 1.
+        """
+        self.capacity = capacity
+        self.noise_filter = NoiseFilter(threshold, capacity)
+        self.median_filter = MedianFilter(kernel_size, capacity)
+
+    def resize(self, capacity: int) -> None:
+        """Add empty slots.
+
+        Args:
+            capacity (int): new number of slots
+        """
+        self.capacity = capacity
+        self.noise_filter.resize(capacity)
+        self.median_filter.resize(capacity)
+
+    def step(
+        self, slots: np.ndarray, timestamps: np.ndarray, coords: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Add one raw coordinate per slot, no velocity is estimated.
+
+        Args:
+            slots (np.ndarray): unique slots
+            timestamps (np.ndarray): timestamps in ms, not used
+            coords (np.ndarray): raw coordinates in mm, dim = Nx3
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (mask of the released inputs,
+            medians, nan velocities)
+        """
+        if slots.size <= FILTER_SCALAR_SLOTS:
+            return self._step_scalar(slots, coords)
+        valid, valid_coords = self.noise_filter.push(slots, coords)
+        valid_idx = np.flatnonzero(valid)
+        ready, medians = self.median_filter.push(slots[valid_idx], valid_coords)
+        released = np.zeros(slots.size, dtype=bool)
+        released[valid_idx[ready]] = True
+        velocities = np.full(medians.shape, np.nan, dtype=np.float32)
+        return released, medians, velocities
+
+    def _step_scalar(
+        self, slots: np.ndarray, coords: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Step slot by slot, numpy only pays off for more slots."""
+        released = np.zeros(slots.size, dtype=bool)
+        medians = []
+        for i, (slot, coord) in enumerate(zip(slots.tolist(), coords.astype(np.float32).tolist())):
+            median = self._push_one(slot, coord)
+            if median is not None:
+                released[i] = True
+                medians.append(median)
+        positions = np.array(medians, dtype=np.float32).reshape(-1, 3)
+        return released, positions, np.full(positions.shape, np.nan, dtype=np.float32)
+
+    def _push_one(self, slot: int, coord: list[float]) -> list[float] | None:
+        valid = self.noise_filter.push_one(slot, coord)
+        if valid is None:
+            return None
+        return self.median_filter.push_one(slot, valid)
+
+    def push(
+        self, timestamp: int, coord: np.ndarray, slot: int = 0
+    ) -> tuple[np.ndarray, np.ndarray | None] | None:
+        """Add a raw coordinate of a single slot, no velocity is estimated.
+
+        Args:
+            timestamp (int): timestamp in ms, not used
+            coord (np.ndarray): raw coordinate in mm
+            slot (int, optional): slot. Defaults to 0.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray | None] | None: (median, None), None if no
+            output is released.
+        """
+        median = self._push_one(slot, coord.astype(np.float32).tolist())
+        if median is None:
+            return None
+        return np.array(median, dtype=np.float32), None
+
+
+class KalmanCoordFilter(CoordFilter):
+    """Constant velocity Kalman filter.
+
+    All axes share the same model, hence the covariance of a slot is a single symmetric
+    2x2 matrix and all axes are updated at once. Outliers are rejected by an innovation
+    gate, after max_rejects consecutive rejections the slot is reset.
+
+    Args:
+        CoordFilter (_type_): interface
+    """
+
+    def __init__(
+        self,
+        process_noise: float,
+        measurement_noise: float,
+        predict_ms: float = 0,
+        gate_sigma: float = 5,
+        max_rejects: int = 5,
+        capacity: int = 1,
+    ) -> None:
+        """Initialize empty slots.
+
+        Args:
+            process_noise (float): white noise acceleration spectral density in mm^2/ms^3
+            measurement_noise (float): measurement variance in mm^2
+            predict_ms (float, optional): predict the position ahead by this latency.
+                Defaults to 0.
+            gate_sigma (float, optional): reject measurements with a larger normalized
+                innovation. Defaults to 5.
+            max_rejects (int, optional): reset after this many rejections. Defaults to 5.
+            capacity (int, optional): number of slots. Defaults to 1.
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.predict_ms = predict_ms
+        self.gate_sq = gate_sigma * gate_sigma
+        self.max_rejects = max_rejects
+        self.capacity = capacity
+        # [:, 0] position, [:, 1] velocity
+        self.state = np.zeros((capacity, 2, 3), dtype=np.float64)
+        # p00, p01, p11
+        self.cov = np.zeros((capacity, 3), dtype=np.float64)
+        self._timestamp = np.zeros(capacity, dtype=np.int64)
+        self._initialized = np.zeros(capacity, dtype=bool)
+        self._rejects = np.zeros(capacity, dtype=np.intp)
+
+    def resize(self, capacity: int) -> None:
+        """Add empty slots.
+
+        Args:
+            capacity (int): new number of slots
+        """
+        n = capacity - self.capacity
+        self.capacity = capacity
+        self.state = np.pad(self.state, ((0, n), (0, 0), (0, 0)))
+        self.cov = np.pad(self.cov, ((0, n), (0, 0)))
+        self._timestamp = np.pad(self._timestamp, (0, n))
+        self._initialized = np.pad(self._initialized, (0, n))
+        self._rejects = np.pad(self._rejects, (0, n))
+
+    def reset(self, slots: np.ndarray, timestamps: np.ndarray, coords: np.ndarray) -> None:
+        """Start at the coordinates with zero velocity.
+
+        Args:
+            slots (np.ndarray): slots
+            timestamps (np.ndarray): timestamps in ms
+            coords (np.ndarray): coordinates in mm, dim = Nx3
+        """
+        self.state[slots, 0] = coords
+        self.state[slots, 1] = 0
+        # velocity is unknown, allow 1 mm/ms
+        self.cov[slots] = (self.measurement_noise, 0, 1)
+        self._timestamp[slots] = timestamps
+        self._initialized[slots] = True
+        self._rejects[slots] = 0
+
+    def step(
+        self, slots: np.ndarray, timestamps: np.ndarray, coords: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Predict to the timestamps and update with the coordinates.
+
+        Args:
+            slots (np.ndarray): unique slots
+            timestamps (np.ndarray): timestamps in ms
+            coords (np.ndarray): raw coordinates in mm, dim = Nx3
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (mask of the released inputs,
+            positions, velocities), new and rejected inputs are not released.
+        """
+        released = self._initialized[slots].copy()
+        new = ~released
+        self.reset(slots[new], timestamps[new], coords[new])
+
+        idx = np.flatnonzero(released)
+        s, z = slots[idx], coords[idx].astype(np.float64)
+        dt = np.maximum(timestamps[idx] - self._timestamp[s], 0).astype(np.float64)
+        self._timestamp[s] = timestamps[idx]
+
+        # predict
+        q = self.process_noise
+        state = self.state[s]
+        state[:, 0] += dt[:, None] * state[:, 1]
+        p00, p01, p11 = self.cov[s].T
+        p00 = p00 + dt * (2 * p01 + dt * p11) + q * dt**3 / 3
+        p01 = p01 + dt * p11 + q * dt**2 / 2
+        p11 = p11 + q * dt
+
+        # gate
+        innovation = z - state[:, 0]
+        s_var = p00 + self.measurement_noise
+        accept = np.square(innovation).sum(axis=1) / s_var <= self.gate_sq
+
+        # update
+        k0 = np.where(accept, p00 / s_var, 0)
+        k1 = np.where(accept, p01 / s_var, 0)
+        state[:, 0] += k0[:, None] * innovation
+        state[:, 1] += k1[:, None] * innovation
+        self.state[s] = state
+        self.cov[s] = np.stack([p00 - k0 * p00, p01 - k0 * p01, p11 - k1 * p01], axis=1)
+
+        rejects = np.where(accept, 0, self._rejects[s] + 1)
+        self._rejects[s] = rejects
+        lost = rejects > self.max_rejects
+        self.reset(s[lost], timestamps[idx][lost], coords[idx][lost])
+
+        released[idx[~accept]] = False
+        state = state[accept]
+        positions = state[:, 0] + self.predict_ms * state[:, 1]
+        return released, positions.astype(np.float32), state[:, 1].astype(np.float32)
+
+
+def make_coord_filter(backend: str, median_kernel_size: int, threshold: float) -> CoordFilter:
+    """Create a coordinate filter backend.
+
+    Args:
+        backend (str): "median" or "kalman"
+        median_kernel_size (int): median window size
+        threshold (float): minimal distance of closer neighbour for the median backend.
+
+    Raises:
+        ValueError: unknown backend
+
+    Returns:
+        CoordFilter: new filter
+    """
+    if backend == "median":
+        return MedianCoordFilter(median_kernel_size, threshold)
+    if backend == "kalman":
+        return KalmanCoordFilter(
+            process_noise=KALMAN_PROCESS_NOISE,
+            measurement_noise=KALMAN_MEASUREMENT_NOISE,
+            predict_ms=KALMAN_PREDICT_MS,
+        )
+    raise ValueError(f"unknown coordinate filter backend: {backend}")
@@ -2,12 +2,16 @@
 import json
 import socket
 import warnings
-from typing import Any, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from threading import Thread
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import numpy as np
 import pandas as pd
 
-from ebl_coords.backend.constants import MOCK_FLG
+from ebl_coords.backend.constants import ECOS_END_LINE, ECOS_LINE_END, ECOS_MOCK_FILE
+from ebl_coords.backend.constants import ECOS_MOCK_PORT, ECOS_REPLY_END, ECOS_TIMEOUT_S, MOCK_FLG
+from ebl_coords.backend.framing import RecordFramer
 from ebl_coords.graph_db.graph_db_api import GraphDbApi
 
 
@@ -27,31 +31,47 @@ def load_config(config_file: str) -> Tuple[List[str], Dict[str, Any]]:
         if MOCK_FLG:
             for key in ecos_config["bpk_ip"].keys():
                 ecos_config["bpk_ip"][key] = "127.0.0.1"
-                ecos_config["port"] = 42043
+                ecos_config["port"] = ECOS_MOCK_PORT
         return bpks, ecos_config
 
 
-def get_ecos_df(config: Dict[str, Any], bpks: List[str]) -> pd.DataFrame:
-    """Scrape all ecos devices for trainswitches.
+def get_ecos_df(
+    config: Dict[str, Any], bpks: List[str], inventory: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """Select all trainswitches of the ecos devices.
 
     Args:
         config (Dict[str, Any]): ecos config with port and ips
+        bpks (List[str]): all bpks
+        inventory (Optional[pd.DataFrame], optional): accessories of all ecos devices,
+            scraped if None. Defaults to None.
 
     Returns:
         pd.DataFrame: result
     """
-    if MOCK_FLG:
-        warnings.warn("used ecos mock, only use DAB.")
-        df = get_ecos_df_mock(config, bpks)
-        df = _select_valid_bpks(df, bpks)
-    else:
-        df = get_ecos_df_live(config)
-        df = _select_valid_bpks(df, bpks)
-        df = _add_db_guid(df)
+    if inventory is None:
+        inventory = get_ecos_inventory(config)
+    df = _select_valid_bpks(inventory, bpks)
+    df = _add_db_guid(df)
     df.id = df.id.astype(int)
     return df
 
 
+def get_ecos_inventory(config: Dict[str, Any]) -> pd.DataFrame:
+    """Get all accessories of all ecos devices.
+
+    Args:
+        config (Dict[str, Any]): ecos config with port and ips
+
+    Returns:
+        pd.DataFrame: one row per accessory
+    """
+    if MOCK_FLG:
+        warnings.warn("used ecos mock, only use DAB.")
+        return get_ecos_df_mock(config)
+    return get_ecos_df_live(config)
+
+
 def _select_valid_bpks(df: pd.DataFrame, bpks: List[str]) -> pd.DataFrame:
     df = df.loc[df.protocol == "DCC"]
     return df.loc[df.name1.isin(bpks)]
@@ -59,37 +79,259 @@ def _select_valid_bpks(df: pd.DataFrame, bpks: List[str]) -> pd.DataFrame:
 
 def _add_db_guid(df: pd.DataFrame) -> pd.DataFrame:
     cmd = "MATCH (n) RETURN n.node_id AS node_id, n.ecos_id AS dcc, n.bhf AS bpk"
-    db = GraphDbApi().run_query(cmd)[::2]
-    db.bpk = '"' + db.bpk + '"'
-    df.insert(df.shape[1], column="guid", value=np.nan)
-    df.guid = df.guid.astype(object)
-    for _, row in db.iterrows():
-        dcc = int(row.dcc)
-        idx = df.guid.loc[(df["name1"] == row.bpk) & (df["addr"].astype(int) == dcc)].index
-        df.loc[idx, "guid"] = row.node_id
-    return df.dropna()
-
-
-def get_ecos_df_mock(config: Dict[str, Any], bpks: List[str]) -> pd.DataFrame:
+    return _join_guid(df, GraphDbApi().run_query(cmd))
+
+
+def _join_guid(df: pd.DataFrame, nodes: pd.DataFrame) -> pd.DataFrame:
+    """Add the guid of the neutral node of every train switch, joined on (bpk, dcc address).
+
+    Accessories without train switch are dropped. Unmatched accessories and train
+    switches as well as duplicate addresses are reported with warnings.
+
+    Args:
+        df (pd.DataFrame): ecos df
+        nodes (pd.DataFrame): graph nodes with columns node_id, dcc and bpk
+
+    Returns:
+        pd.DataFrame: ecos df with column guid
+    """
+    nodes = nodes.reindex(columns=["node_id", "dcc", "bpk"])
+    # the neutral node of a double node
+    nodes = nodes.loc[nodes.node_id.astype(str).str.endswith("_0")]
+    switches = pd.DataFrame(
+        {
+            "name1": '"' + nodes.bpk + '"',
+            "dcc": pd.to_numeric(nodes.dcc, errors="coerce"),
+            "guid": nodes.node_id,
+        }
+    ).dropna()
+    keys = ["name1", "dcc"]
+
+    duplicates = switches.duplicated(keys, keep="last")
+    if duplicates.any():
+        warnings.warn(
+            "train switches with the same dcc address, the last one is used: "
+            f"{switches.guid[duplicates].tolist()}"
+        )
+        switches = switches.loc[~duplicates]
+
+    accessories = df.assign(dcc=pd.to_numeric(df.addr, errors="coerce"))
+    duplicates = accessories.duplicated(keys, keep=False) & accessories.dcc.notna()
+    if duplicates.any():
+        warnings.warn(
+            "ecos accessories with the same dcc address: "
+            f"{accessories.loc[duplicates, ['ip', 'id', 'name1', 'addr']].values.tolist()}"
+        )
+
+    joined = accessories.merge(switches, on=keys, how="left", validate="many_to_one")
+    joined.index = df.index
+    unmatched = joined.guid.isna()
+    if unmatched.any():
+        warnings.warn(
+            "ecos accessories without train switch: "
+            f"{joined.loc[unmatched, ['name1', 'addr']].values.tolist()}"
+        )
+    unmatched = ~switches.guid.isin(joined.guid)
+    if unmatched.any():
+        warnings.warn(f"train switches without ecos accessory: {switches.guid[unmatched].tolist()}")
+    return joined.drop(columns="dcc").dropna()
+
+
+def get_ecos_df_mock(config: Dict[str, Any]) -> pd.DataFrame:
     """Get ecos df from file.
 
     Args:
-        config (Dict[str, Any]): ecos df
-        bpks (List[str]): all bpks
+        config (Dict[str, Any]): ecos config
 
     Returns:
-        pd.DataFrame: _description_
+        pd.DataFrame: ecos df
     """
-    df = pd.read_csv("./ecos_mock/ecos.csv")
-    df = df.loc[df.protocol == "DCC"]
-    df = df.loc[df.name1.isin(bpks)]
+    df = pd.read_csv(ECOS_MOCK_FILE)
     df.insert(df.shape[1], column="ip", value=config["bpk_ip"]["DAB"])
-    df = _add_db_guid(df)
     return df
 
 
+def _replies(skt: socket.socket, framer: RecordFramer, n: int) -> Iterator[List[str]]:
+    """Receive replies line by line, a reply is complete when its END line arrived.
+
+    A reply with an error, e.g. <END 15 (unknown object at 4)>, has no lines. Lines after
+    the n-th reply are left in the framer.
+
+    Args:
+        skt (socket.socket): connected socket
+        framer (RecordFramer): framer with delimiter ECOS_LINE_END
+        n (int): number of replies
+
+    Yields:
+        Iterator[List[str]]: lines of a reply, without REPLY and END line
+    """
+    lines: List[str] = []
+    while n > 0:
+        framer.recv_into(skt)
+        for line in framer.records():
+            if line[: len(ECOS_END_LINE)] == ECOS_END_LINE:
+                yield lines if line == ECOS_REPLY_END else []
+                lines = []
+                n -= 1
+                if n == 0:
+                    return
+            elif line and line[:1] != b"<":
+                lines.append(bytes(line).decode("utf-8"))
+
+
+def _query_objects(skt: socket.socket, framer: RecordFramer) -> List[str]:
+    """Get the ids of all accessories of an ECoS.
+
+    Args:
+        skt (socket.socket): connected socket
+        framer (RecordFramer): framer with delimiter ECOS_LINE_END
+
+    Returns:
+        List[str]: ecos ids
+    """
+    # hardcoded in api: ausgeben kompletter Liste Schaltartikel
+    skt.sendall(b"queryObjects(11)" + b"\n")
+    return next(_replies(skt, framer, 1))
+
+
+def _station_ids(ip: str, port: int) -> List[str]:
+    """Get the ids of all accessories of one ECoS.
+
+    Args:
+        ip (str): ip of the ECoS
+        port (int): port of the ECoS
+
+    Returns:
+        List[str]: ecos ids
+    """
+    with socket.create_connection((ip, port), timeout=ECOS_TIMEOUT_S) as skt:
+        return _query_objects(skt, RecordFramer(delimiter=ECOS_LINE_END))
+
+
+def get_ecos_ids(config: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Get the accessory ids of all ECoS concurrently, a single round trip each.
+
+    Args:
+        config (Dict[str, Any]): ecos config
+
+    Returns:
+        Dict[str, List[str]]: ip -> ecos ids, ECoS without accessories are left out.
+    """
+    port = config["port"]
+    ips = list(config["bpk_ip"].values())[1:]
+    with ThreadPoolExecutor(max_workers=max(len(ips), 1)) as executor:
+        ids = list(executor.map(_station_ids, ips, repeat(port)))
+    return {ip: ecos_ids for ip, ecos_ids in zip(ips, ids) if ecos_ids}
+
+
+def count_ecos_objects(config: Dict[str, Any]) -> Dict[str, int]:
+    """Get the number of accessories of all ECoS, see get_ecos_ids.
+
+    Args:
+        config (Dict[str, Any]): ecos config
+
+    Returns:
+        Dict[str, int]: ip -> number of accessories, ECoS without accessories are left out.
+    """
+    return {ip: len(ecos_ids) for ip, ecos_ids in get_ecos_ids(config).items()}
+
+
+def _get_objects(
+    skt: socket.socket, framer: RecordFramer, ecos_ids: List[str], attribute: str = ""
+) -> List[Dict[str, str]]:
+    """Get accessories, all get requests are written at once.
+
+    The replies are parsed while they arrive.
+
+    Args:
+        skt (socket.socket): connected socket
+        framer (RecordFramer): framer with delimiter ECOS_LINE_END
+        ecos_ids (List[str]): ecos ids
+        attribute (str, optional): only get this attribute, all if empty. Defaults to "".
+
+    Returns:
+        List[Dict[str, str]]: one dict per accessory, empty for an unknown accessory
+    """
+    option = f", {attribute}" if attribute else ""
+    # write on a thread, the ECoS blocks if its replies are not read meanwhile
+    requests = b"".join(f"get({ecos_id}{option})\n".encode() for ecos_id in ecos_ids)
+    writer = Thread(target=skt.sendall, args=[requests], daemon=True)
+    writer.start()
+
+    df_dicts = []
+    for switch_device in _replies(skt, framer, len(ecos_ids)):
+        d = {}
+        for feature in switch_device:
+            _, _, desc = feature.partition(" ")
+            name, _, val = desc.partition("[")
+            val = val[:-1]
+            d[name] = val
+        df_dicts.append(d)
+    writer.join()
+    return df_dicts
+
+
+def _scrape_station(ip: str, port: int) -> List[Dict[str, str]]:
+    """Get all accessories of one ECoS.
+
+    Args:
+        ip (str): ip of the ECoS
+        port (int): port of the ECoS
+
+    Returns:
+        List[Dict[str, str]]: one dict per accessory
+    """
+    framer = RecordFramer(delimiter=ECOS_LINE_END)
+    with socket.create_connection((ip, port), timeout=ECOS_TIMEOUT_S) as skt:
+        ecos_ids = _query_objects(skt, framer)
+        df_dicts = _get_objects(skt, framer, ecos_ids)
+    for ecos_id, d in zip(ecos_ids, df_dicts):
+        d["id"] = ecos_id
+        d["ip"] = ip
+    return df_dicts
+
+
+def _query_states(ip: str, port: int, ecos_ids: List[str]) -> List[Optional[str]]:
+    """Get the state of some accessories of one ECoS.
+
+    Args:
+        ip (str): ip of the ECoS
+        port (int): port of the ECoS
+        ecos_ids (List[str]): ecos ids
+
+    Returns:
+        List[Optional[str]]: state per ecos id, None for an unknown accessory
+    """
+    framer = RecordFramer(delimiter=ECOS_LINE_END)
+    with socket.create_connection((ip, port), timeout=ECOS_TIMEOUT_S) as skt:
+        return [d.get("state") for d in _get_objects(skt, framer, ecos_ids, "state")]
+
+
+def get_ecos_states(config: Dict[str, Any], inventory: pd.DataFrame) -> pd.Series:
+    """Get the current state of all accessories of an inventory, all ECoS concurrently.
+
+    Args:
+        config (Dict[str, Any]): ecos config
+        inventory (pd.DataFrame): accessories with columns id and ip
+
+    Returns:
+        pd.Series: state per accessory, same index as inventory, None if unknown
+    """
+    port = config["port"]
+    groups = list(inventory.groupby("ip", sort=False))
+    with ThreadPoolExecutor(max_workers=max(len(groups), 1)) as executor:
+        futures = [
+            executor.submit(_query_states, ip, port, group.id.astype(str).tolist())
+            for ip, group in groups
+        ]
+        states = pd.Series(index=inventory.index, dtype=object)
+        for (_, group), future in zip(groups, futures):
+            states.loc[group.index] = future.result()
+    return states
+
+
 def get_ecos_df_live(config: Dict[str, Any]) -> pd.DataFrame:
-    """Get ECoS df in production.
+    """Get ECoS df in production, all ECoS are scraped concurrently.
 
     Args:
         config (Dict[str, Any]): ecos config
@@ -98,38 +340,9 @@ def get_ecos_df_live(config: Dict[str, Any]) -> pd.DataFrame:
         pd.DataFrame: ecos df
     """
     port = config["port"]
-    df_dicts = []
-    for ip in list(config["bpk_ip"].values())[1:]:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as skt:
-            skt.connect((ip, port))
-
-            # hardcoded in api: ausgeben kompletter Liste Schaltartikel
-            skt.sendall(b"queryObjects(11)" + b"\n")
-
-            buffer = b""
-
-            # check delimiter
-            while b"<END 0 (OK)>" not in buffer:
-                buffer += skt.recv(1024)
-
-            data = buffer.decode("utf-8")
-            ecos_ids = data.split("\r\n")[1:-2]
-
-            for ecos_id in ecos_ids:
-                skt.sendall(f"get({ecos_id})".encode() + b"\n")
-                # TO DO clean up 10_000 recv
-                data = skt.recv(10_000).decode("utf-8")
-                switch_device = data.split("\r\n")[1:-2]
-
-                d = {}
-                for feature in switch_device:
-                    _, _, desc = feature.partition(" ")
-                    name, val = desc.split("[")
-                    val = val[:-1]
-                    d[name] = val
-                d["id"] = ecos_id
-                d["ip"] = ip
-                df_dicts.append(d)
-
-    df = pd.DataFrame(df_dicts)
+    ips = list(config["bpk_ip"].values())[1:]
+    with ThreadPoolExecutor(max_workers=max(len(ips), 1)) as executor:
+        stations = list(executor.map(_scrape_station, ips, repeat(port)))
+
+    df = pd.DataFrame([d for df_dicts in stations for d in df_dicts])
     return df
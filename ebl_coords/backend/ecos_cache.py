@@ -0,0 +1,113 @@
+"""On disk cache of the ECoS inventory."""
+from __future__ import annotations
+
+import json
+import os
+import warnings
+from os.path import exists
+from threading import Lock
+from typing import Any
+
+import pandas as pd
+
+from ebl_coords.backend.constants import ECOS_CACHE_FILE
+from ebl_coords.backend.ecos import get_ecos_ids, get_ecos_inventory, get_ecos_states
+
+
+class EcosInventoryCache:
+    """Keep the accessories of all ECoS on disk, see get_ecos_inventory.
+
+    The cache is stale, if the accessory ids of any ECoS differ from the cached
+    inventory, so a replaced accessory is detected as well as an added one. Listing the
+    ids is a single round trip per ECoS, much cheaper than a scrape.
+    """
+
+    def __init__(self, config: dict[str, Any], file: str = ECOS_CACHE_FILE) -> None:
+        """Initialize the cache, nothing is loaded yet.
+
+        Args:
+            config (dict[str, Any]): ecos config
+            file (str, optional): cache file. Defaults to ECOS_CACHE_FILE.
+        """
+        self.config = config
+        self.file = file
+        self.inventory: pd.DataFrame | None = None
+        self.lock = Lock()
+
+    def load(self) -> pd.DataFrame | None:
+        """Load the inventory from disk.
+
+        Returns:
+            pd.DataFrame | None: inventory, None if there is no readable cache.
+        """
+        if not exists(self.file):
+            return None
+        try:
+            with open(self.file, encoding="utf-8") as fd:
+                inventory = pd.DataFrame(json.load(fd))
+        except (OSError, ValueError) as err:
+            warnings.warn(f"ecos cache {self.file} not readable: {err!r}")
+            return None
+        self.inventory = inventory
+        return inventory
+
+    def save(self, inventory: pd.DataFrame) -> None:
+        """Write the inventory to disk, replace the cache file atomically.
+
+        Args:
+            inventory (pd.DataFrame): inventory
+        """
+        tmp_file = f"{self.file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as fd:
+            json.dump(inventory.to_dict("records"), fd)
+        os.replace(tmp_file, self.file)
+        self.inventory = inventory
+
+    def is_stale(self) -> bool:
+        """Compare the accessory ids per ECoS with the cached inventory.
+
+        Returns:
+            bool: True if nothing is cached or the ids of any ECoS differ, False if the
+                ECoS are not reachable.
+        """
+        if self.inventory is None:
+            return True
+        try:
+            ids = {ip: set(ecos_ids) for ip, ecos_ids in get_ecos_ids(self.config).items()}
+        except OSError as err:
+            warnings.warn(f"ecos not reachable, keep cached inventory: {err!r}")
+            return False
+        cached = {
+            ip: set(group.astype(str))
+            for ip, group in self.inventory.groupby("ip", sort=False)["id"]
+        }
+        return ids != cached
+
+    def refresh(self) -> pd.DataFrame:
+        """Scrape and save the inventory if the cache is stale, else get the current states.
+
+        Returns:
+            pd.DataFrame: current inventory
+        """
+        with self.lock:
+            if self.is_stale():
+                self.save(get_ecos_inventory(self.config))
+            else:
+                self._refresh_states()
+            assert self.inventory is not None
+            return self.inventory
+
+    def _refresh_states(self) -> None:
+        """Replace the cached states, they are outdated since the cache was written."""
+        assert self.inventory is not None
+        try:
+            states = get_ecos_states(self.config, self.inventory)
+        except OSError as err:
+            warnings.warn(f"ecos not reachable, keep cached states: {err!r}")
+            return
+        inventory = self.inventory.copy()
+        if "state" in inventory:
+            # accessories unknown meanwhile keep their cached state
+            states = states.where(states.notna(), inventory.state)
+        inventory["state"] = states
+        self.inventory = inventory
@@ -0,0 +1,273 @@
+"""ECoS stand-in for load and regression tests, run with python -m.
+
+Serves queryObjects(11), get(id[, attribute]) and request(id, view) for the
+accessories of ECOS_MOCK_FILE and emits state events of random accessories.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import socket
+import socketserver
+import time
+from threading import Event, Lock, Thread
+
+import pandas as pd
+
+from ebl_coords.backend.constants import ECOS_MOCK_FILE, ECOS_MOCK_PORT
+
+# a command line, e.g. get(20000, state)
+COMMAND_PATTERN = re.compile(r"(\w+)\((.*)\)")
+
+
+def _message(header: str, lines: list[str], end: str = "<END 0 (OK)>") -> bytes:
+    return "\r\n".join([header, *lines, end, ""]).encode("utf-8")
+
+
+def _reply(command: str, lines: list[str], end: str = "<END 0 (OK)>") -> bytes:
+    return _message(f"<REPLY {command}>", lines, end)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Answer the commands of a single client, all commands of a received chunk at once."""
+
+    server: _Server
+
+    def handle(self) -> None:
+        simulator = self.server.simulator
+        client: socket.socket = self.request
+        simulator.connect(client)
+        buffer = b""
+        try:
+            while data := client.recv(65536):
+                *lines, buffer = (buffer + data).split(b"\n")
+                if simulator.latency_s > 0:
+                    time.sleep(simulator.latency_s)
+                reply = b"".join(
+                    simulator.handle(line.decode("utf-8").strip(), client) for line in lines
+                )
+                if reply:
+                    simulator.send(client, reply)
+        except OSError:
+            pass
+        finally:
+            simulator.disconnect(client)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    simulator: EcosSimulator
+
+
+class EcosSimulator:
+    """Simulate an ECoS, a state event is emitted every 1 / rate_hz s.
+
+    Every interval is scaled by a random factor in [1 - jitter, 1 + jitter]. An event
+    toggles the state of a random accessory and is sent to all clients, which requested
+    a view of it.
+
+    The mock file merges the accessories of several ECoS, ids are unique per ECoS only.
+    The first accessory of every id is served.
+    """
+
+    def __init__(
+        self,
+        csv_file: str = ECOS_MOCK_FILE,
+        host: str = "127.0.0.1",
+        port: int = ECOS_MOCK_PORT,
+        rate_hz: float = 10.0,
+        jitter: float = 0.0,
+        seed: int | None = None,
+        latency_s: float = 0.0,
+    ) -> None:
+        """Load the accessories.
+
+        Args:
+            csv_file (str, optional): accessories, one column per attribute. Defaults to
+                ECOS_MOCK_FILE.
+            host (str, optional): listen address. Defaults to "127.0.0.1".
+            port (int, optional): listen port, 0 for any free port. Defaults to ECOS_MOCK_PORT.
+            rate_hz (float, optional): state events per second, 0 for none. Defaults to 10.0.
+            jitter (float, optional): relative jitter of the event interval in [0, 1].
+                Defaults to 0.0.
+            seed (int | None, optional): seed of the random events. Defaults to None.
+            latency_s (float, optional): delay of the replies to every received chunk,
+                a simulated round trip time. Defaults to 0.0.
+        """
+        df = pd.read_csv(csv_file, dtype=str, keep_default_na=False).drop_duplicates("id")
+        self.ids: list[str] = df.id.tolist()
+        self.objects: dict[str, dict[str, str]] = {
+            row["id"]: {name: val for name, val in row.items() if name != "id"}
+            for row in df.to_dict("records")
+        }
+        self.address = (host, port)
+        self.rate_hz = rate_hz
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.latency_s = latency_s
+        self.random = random.Random(seed)
+        self.lock = Lock()
+        # connected client -> requested ecos ids
+        self.views: dict[socket.socket, set[str]] = {}
+        self.events_emitted: int = 0
+        self._stop = Event()
+        self._server: _Server | None = None
+        self._threads: list[Thread] = []
+
+    def handle(self, line: str, client: socket.socket) -> bytes:
+        """Answer a command.
+
+        Args:
+            line (str): command line
+            client (socket.socket): client connection
+
+        Returns:
+            bytes: reply, empty for an empty line
+        """
+        if not line:
+            return b""
+        match = COMMAND_PATTERN.fullmatch(line)
+        if match is None:
+            return _reply(line, [], "<END 25 (unknown command)>")
+        name = match.group(1)
+        args = [arg.strip() for arg in match.group(2).split(",")]
+        if name == "queryObjects" and args[0] == "11":
+            return _reply(line, self.ids)
+        ecos_id = args[0]
+        if ecos_id not in self.objects:
+            return _reply(line, [], f"<END 15 (unknown object at {len(name) + 1})>")
+        if name == "get":
+            with self.lock:
+                attributes = self.objects[ecos_id]
+                names = args[1:] or list(attributes)
+                lines = [f"{ecos_id} {n}[{attributes[n]}]" for n in names if n in attributes]
+            return _reply(line, lines)
+        if name == "request" and args[1:] == ["view"]:
+            with self.lock:
+                self.views[client].add(ecos_id)
+            return _reply(line, [])
+        return _reply(line, [], "<END 25 (unknown command)>")
+
+    def send(self, client: socket.socket, data: bytes) -> None:
+        """Send to a client, replies and events are not interleaved.
+
+        Args:
+            client (socket.socket): client connection
+            data (bytes): reply or event
+        """
+        with self.lock:
+            client.sendall(data)
+
+    def connect(self, client: socket.socket) -> None:
+        """Add a client without views.
+
+        Args:
+            client (socket.socket): client connection
+        """
+        with self.lock:
+            self.views[client] = set()
+
+    def disconnect(self, client: socket.socket) -> None:
+        """Remove a client and all its views.
+
+        Args:
+            client (socket.socket): client connection
+        """
+        with self.lock:
+            self.views.pop(client, None)
+
+    def emit(self, ecos_id: str) -> int:
+        """Toggle the state of an accessory and send the event to its viewers.
+
+        Args:
+            ecos_id (str): ecos id
+
+        Returns:
+            int: number of clients the event was sent to
+        """
+        with self.lock:
+            attributes = self.objects[ecos_id]
+            attributes["state"] = "1" if attributes.get("state") == "0" else "0"
+            event = _message(f"<EVENT {ecos_id}>", [f"{ecos_id} state[{attributes['state']}]"])
+            sent = 0
+            for client, ids in list(self.views.items()):
+                if ecos_id not in ids:
+                    continue
+                try:
+                    client.sendall(event)
+                    sent += 1
+                except OSError:
+                    self.views.pop(client)
+            self.events_emitted += 1
+            return sent
+
+    def _emit_events(self) -> None:
+        interval = 1 / self.rate_hz
+        next_event = time.monotonic()
+        while True:
+            next_event += interval * (1 + self.jitter * self.random.uniform(-1, 1))
+            if self._stop.wait(max(next_event - time.monotonic(), 0)):
+                return
+            self.emit(self.random.choice(self.ids))
+
+    def start(self) -> tuple[str, int]:
+        """Start to serve and to emit events.
+
+        Returns:
+            tuple[str, int]: listen address
+        """
+        self._stop.clear()
+        self._server = _Server(self.address, _Handler)
+        self._server.simulator = self
+        self.address = self._server.server_address[:2]
+        self._threads = [Thread(target=self._server.serve_forever, daemon=True)]
+        if self.rate_hz > 0:
+            self._threads.append(Thread(target=self._emit_events, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self.address
+
+    def stop(self) -> None:
+        """Stop serving, close all client connections."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        with self.lock:
+            for client in self.views:
+                try:
+                    client.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self.views.clear()
+        for thread in self._threads:
+            thread.join()
+
+
+def main() -> None:
+    """Run the simulator until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=ECOS_MOCK_FILE, help="accessories")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=ECOS_MOCK_PORT)
+    parser.add_argument("--rate", type=float, default=10.0, help="state events per second")
+    parser.add_argument("--jitter", type=float, default=0.0, help="relative jitter in [0, 1]")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="reply delay")
+    args = parser.parse_args()
+
+    simulator = EcosSimulator(
+        args.csv, args.host, args.port, args.rate, args.jitter, args.seed, args.latency_ms / 1000
+    )
+    host, port = simulator.start()
+    print(f"ecos simulator on {host}:{port}, {len(simulator.ids)} accessories, {args.rate} Hz")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
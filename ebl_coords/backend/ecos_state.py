@@ -0,0 +1,107 @@
+"""Switch states of all ECoS accessories."""
+from __future__ import annotations
+
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+
+class EcosStateTable:
+    """States of the ecos df in a numpy array, indexed by (ip, ecos id) and by node guid.
+
+    Lookups and updates are O(1), the ecos df is only rebuilt on export. Every update
+    increments the version, a refreshed ecos df is merged in place without losing the
+    updates after a given version.
+    """
+
+    def __init__(self, ecos_df: pd.DataFrame) -> None:
+        """Build the indexes.
+
+        Args:
+            ecos_df (pd.DataFrame): ecos df with columns id, ip, guid and state
+        """
+        self.lock = Lock()
+        self.version: int = 0
+        self._build(ecos_df)
+
+    def _build(self, ecos_df: pd.DataFrame) -> None:
+        self._df = ecos_df.drop(columns="state").reset_index(drop=True)
+        self.states: np.ndarray = ecos_df.state.astype(np.int8).to_numpy(copy=True)
+        # version of the last update per row
+        self._versions: np.ndarray = np.zeros(self.states.size, dtype=np.int64)
+        self._rows: dict[tuple[str, int], int] = {
+            (ip, int(ecos_id)): row
+            for row, (ip, ecos_id) in enumerate(zip(self._df.ip, self._df.id))
+        }
+        self._guid_rows: dict[str, int] = {guid: row for row, guid in enumerate(self._df.guid)}
+
+    def __len__(self) -> int:
+        """Get the number of accessories."""
+        return self.states.size
+
+    def set_state(self, ip: str, ecos_id: int, state: int) -> bool:
+        """Update the state of an accessory.
+
+        Args:
+            ip (str): ecos ip
+            ecos_id (int): ecos id
+            state (int): new state
+
+        Returns:
+            bool: False if the accessory is unknown.
+        """
+        with self.lock:
+            row = self._rows.get((ip, ecos_id))
+            if row is None:
+                return False
+            self.version += 1
+            self.states[row] = state
+            self._versions[row] = self.version
+        return True
+
+    def merge(self, ecos_df: pd.DataFrame, since: int | None = None) -> None:
+        """Replace the accessories and states by a refreshed ecos df in place.
+
+        Args:
+            ecos_df (pd.DataFrame): refreshed ecos df with columns id, ip, guid and state
+            since (int | None, optional): version before the refresh was scraped, the
+                states of accessories updated after it are kept. Defaults to None.
+        """
+        with self.lock:
+            old_rows, old_states, old_versions = self._rows, self.states, self._versions
+            self._build(ecos_df)
+            if since is None:
+                return
+            for key, row in self._rows.items():
+                old_row = old_rows.get(key)
+                if old_row is not None and old_versions[old_row] > since:
+                    self.states[row] = old_states[old_row]
+                    self._versions[row] = old_versions[old_row]
+
+    def state(self, guid: str) -> int:
+        """Get the state of a train switch.
+
+        Args:
+            guid (str): node_id of the train switch
+
+        Raises:
+            KeyError: no accessory with this guid
+
+        Returns:
+            int: state
+        """
+        with self.lock:
+            return int(self.states[self._guid_rows[guid]])
+
+    def to_df(self) -> pd.DataFrame:
+        """Export the ecos df with the current states.
+
+        Returns:
+            pd.DataFrame: ecos df
+        """
+        with self.lock:
+            df, states = self._df, self.states.copy()
+        df = df.copy()
+        df.insert(df.shape[1], column="state", value=states)
+        return df
@@ -0,0 +1,119 @@
+"""Delimiter framing on a preallocated receive buffer."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    import socket
+
+
+class RecordFramer:
+    """Split a byte stream into delimiter terminated records without reallocating.
+
+    Data is received with recv_into into a preallocated bytearray. Complete records are
+    handed out as memoryviews into this buffer, they are only valid until the next call
+    of recv_into or feed.
+    """
+
+    def __init__(self, delimiter: bytes = b";", capacity: int = 1 << 16) -> None:
+        """Initialize the buffer.
+
+        Args:
+            delimiter (bytes, optional): record delimiter. Defaults to b";".
+            capacity (int, optional): initial buffer size in bytes. Defaults to 65536.
+        """
+        self.delimiter = delimiter
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start: int = 0
+        self._end: int = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of received bytes, which are not yet handed out as record."""
+        return self._end - self._start
+
+    def _reserve(self, min_free: int) -> None:
+        """Make sure at least min_free bytes are available at the end of the buffer.
+
+        Args:
+            min_free (int): bytes needed
+        """
+        if len(self._buffer) - self._end >= min_free:
+            return
+        pending = self.pending
+        if len(self._buffer) - pending >= min_free:
+            # compact, move the incomplete record to the front
+            self._view[:pending] = self._view[self._start : self._end]
+        else:
+            # grow, only if a single record does not fit into the buffer
+            size = len(self._buffer)
+            while size - pending < min_free:
+                size *= 2
+            buffer = bytearray(size)
+            buffer[:pending] = self._view[self._start : self._end]
+            self._buffer = buffer
+            self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = pending
+
+    def recv_into(self, skt: socket.socket, nbytes: int = 4096) -> int:
+        """Receive from socket directly into the buffer.
+
+        Args:
+            skt (socket.socket): connected socket
+            nbytes (int, optional): maximal bytes to receive. Defaults to 4096.
+
+        Raises:
+            ConnectionError: socket was closed by the peer.
+
+        Returns:
+            int: number of received bytes
+        """
+        self._reserve(nbytes)
+        n = skt.recv_into(self._view[self._end : self._end + nbytes], nbytes)
+        if n == 0:
+            raise ConnectionError("socket closed by peer.")
+        self._end += n
+        return n
+
+    def feed(self, data: bytes | memoryview) -> None:
+        """Copy data into the buffer, used for recorded streams.
+
+        Args:
+            data (bytes | memoryview): raw bytes
+        """
+        n = len(data)
+        self._reserve(n)
+        self._view[self._end : self._end + n] = data
+        self._end += n
+
+    def records(self) -> Iterator[memoryview]:
+        """Yield all complete records without delimiter.
+
+        Yields:
+            Iterator[memoryview]: view of a single record
+        """
+        delimiter = self.delimiter
+        skip = len(delimiter)
+        while True:
+            idx = self._buffer.find(delimiter, self._start, self._end)
+            if idx < 0:
+                return
+            record = self._view[self._start : idx]
+            self._start = idx + skip
+            yield record
+
+    def pop_complete(self) -> memoryview:
+        """Return all complete records at once, delimiters included.
+
+        Returns:
+            memoryview: view of all complete records, empty if there is none.
+        """
+        idx = self._buffer.rfind(self.delimiter, self._start, self._end)
+        if idx < 0:
+            return self._view[self._start : self._start]
+        stop = idx + len(self.delimiter)
+        chunk = self._view[self._start : stop]
+        self._start = stop
+        return chunk
@@ -0,0 +1,146 @@
+"""Parse GtCommand records into structured arrays."""
+from __future__ import annotations
+
+import warnings
+
+import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
+
+# timestamp,tag_id,tag_status,x,y,z;
+GTCOMMAND_FIELDS: int = 6
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("timestamp", np.int64),
+        ("tag_id", np.int32),
+        ("tag_status", np.int32),
+        ("x", np.int32),
+        ("y", np.int32),
+        ("z", np.int32),
+    ]
+)
+
+SAMPLE_DTYPE = np.dtype(
+    [
+        ("timestamp", np.int64),
+        ("tag_id", np.int32),
+        ("x", np.float32),
+        ("y", np.float32),
+        ("z", np.float32),
+        ("vx", np.float32),
+        ("vy", np.float32),
+        ("vz", np.float32),
+    ]
+)
+
+
+def get_coords(batch: np.ndarray) -> np.ndarray:
+    """Get the coordinates of a record or sample batch.
+
+    Args:
+        batch (np.ndarray): structured array with fields x, y, z
+
+    Returns:
+        np.ndarray: copy of the coordinates, dim = Nx3
+    """
+    return structured_to_unstructured(batch[["x", "y", "z"]], copy=True)
+
+
+def get_velocities(samples: np.ndarray) -> np.ndarray:
+    """Get the velocities of a sample batch.
+
+    Args:
+        samples (np.ndarray): structured array with SAMPLE_DTYPE
+
+    Returns:
+        np.ndarray: copy of the velocities in mm/ms, nan if not estimated, dim = Nx3
+    """
+    return structured_to_unstructured(samples[["vx", "vy", "vz"]], copy=True)
+
+
+def _to_batch(values: np.ndarray) -> np.ndarray:
+    """Copy the first GTCOMMAND_FIELDS columns into a record batch.
+
+    Args:
+        values (np.ndarray): parsed values, dim = NxM with M >= GTCOMMAND_FIELDS
+
+    Returns:
+        np.ndarray: structured array with RECORD_DTYPE
+    """
+    batch = np.empty(values.shape[0], dtype=RECORD_DTYPE)
+    for i, name in enumerate(RECORD_DTYPE.names):
+        batch[name] = values[:, i]
+    return batch
+
+
+def _parse_single_records(data: bytes) -> np.ndarray:
+    """Parse records one by one, skip malformed records.
+
+    Args:
+        data (bytes): complete records including delimiters
+
+    Returns:
+        np.ndarray: structured array with RECORD_DTYPE
+    """
+    rows = []
+    for record in data.split(b";")[:-1]:
+        ds = record.split(b",")
+        if len(ds) < GTCOMMAND_FIELDS:
+            continue
+        try:
+            rows.append([int(d) for d in ds[:GTCOMMAND_FIELDS]])
+        except ValueError:
+            continue
+    values = np.array(rows, dtype=np.int64).reshape(-1, GTCOMMAND_FIELDS)
+    return _to_batch(values)
+
+
+def _same_field_counts(data: bytes, n_records: int, n_fields: int) -> bool:
+    """Check if every complete record has n_fields fields.
+
+    Args:
+        data (bytes): records, each terminated by ';'
+        n_records (int): number of records
+        n_fields (int): expected number of fields per record
+
+    Returns:
+        bool: True if the separators alternate as n_fields - 1 ',' and one ';'
+    """
+    buffer = np.frombuffer(data[: data.rfind(b";") + 1], dtype=np.uint8)
+    is_end = buffer == ord(";")
+    # for every separator in order, True if it ends a record
+    ends = is_end[is_end | (buffer == ord(","))]
+    return ends.size == n_records * n_fields and bool(ends[n_fields - 1 :: n_fields].all())
+
+
+def parse_records(chunk: bytes | memoryview) -> np.ndarray:
+    """Parse all complete records of a chunk at once.
+
+    All records in the chunk are parsed in a single numpy call. Only if the records
+    have different field counts or are malformed, they are parsed one by one.
+
+    Args:
+        chunk (bytes | memoryview): complete records, each terminated by ';'
+
+    Returns:
+        np.ndarray: structured array with RECORD_DTYPE
+    """
+    data = bytes(chunk)
+    n_records = data.count(b";")
+    if n_records == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+
+    n_fields = data[: data.find(b";")].count(b",") + 1
+    if n_fields >= GTCOMMAND_FIELDS and _same_field_counts(data, n_records, n_fields):
+        try:
+            with warnings.catch_warnings():
+                # numpy < 1.23 only warns about unmatched data
+                warnings.simplefilter("error", DeprecationWarning)
+                values = np.fromstring(
+                    data[: data.rfind(b";")].replace(b";", b","), dtype=np.int64, sep=","
+                )
+        except (ValueError, DeprecationWarning):
+            values = np.empty(0, dtype=np.int64)
+        if values.size == n_records * n_fields:
+            return _to_batch(values.reshape(n_records, n_fields))
+    return _parse_single_records(data)
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 
 from ebl_coords.backend.command.command import Command
 from ebl_coords.backend.command.ecos_cmd import UpdateStateCommand
+from ebl_coords.backend.observable.mailbox import OverflowPolicy
 from ebl_coords.backend.observable.observer import Observer
 from ebl_coords.decorators import override
 from ebl_coords.frontend.command.map.redraw_cmd import RedrawCmd
@@ -42,9 +43,13 @@ class EcosObserver(Observer):
 
     @override
     def update(self) -> None:
-        """Put update and redraw command in queue."""
+        """Put update and redraw command in queue, the redraw runs after the update."""
         self.worker_queue.put(
-            UpdateStateCommand(content=self.result, context=self.map_editor.gui.ebl_coords.ecos_df)
+            UpdateStateCommand(
+                content=self.result,
+                context=self.map_editor.gui.ebl_coords.ecos_state,
+                key=self.map_editor.net_maker,
+            )
         )
 
         self.worker_queue.put(
@@ -78,6 +83,8 @@ class AttachEcosObsCommand(Command):
     def run(self) -> None:
         """Create and attach an EcosObserver."""
         gui_queue, worker_queue, map_editor = self.content
-        self.context.attach(
-            EcosObserver(gui_queue=gui_queue, worker_queue=worker_queue, map_editor=map_editor)
+        observer = EcosObserver(
+            gui_queue=gui_queue, worker_queue=worker_queue, map_editor=map_editor
         )
+        self.context.dispatch_async(observer, OverflowPolicy.BLOCK)
+        self.context.attach(observer)
@@ -1,11 +1,18 @@
 """Ecos Subject."""
 from __future__ import annotations
 
+import errno
+import os
 import re
+import selectors
 import socket
+import time
+import warnings
 from threading import Thread
 from typing import TYPE_CHECKING, Any
 
+from ebl_coords.backend.constants import ECOS_RECONNECT_S, ECOS_REPLY_END
+from ebl_coords.backend.framing import RecordFramer
 from ebl_coords.backend.observable.observer import Observer
 from ebl_coords.backend.observable.subject import Subject
 from ebl_coords.decorators import override
@@ -13,6 +20,9 @@ from ebl_coords.decorators import override
 if TYPE_CHECKING:
     import pandas as pd
 
+# id and state of an event, a message of the ecos is a single record
+EVENT_PATTERN = re.compile(rb"<EVENT (\d+)>.*?state\[(\d+)\]", re.DOTALL)
+
 
 class EcosSubject(Subject):
     """Connect to ecos devices and provide observer pattern.
@@ -21,17 +31,28 @@ class EcosSubject(Subject):
         Subject (_type_): interface
     """
 
-    def __init__(self, ecos_config: dict[str, Any], ecos_ids: pd.Series) -> None:
+    def __init__(
+        self,
+        ecos_config: dict[str, Any],
+        ecos_ids: pd.Series,
+        reconnect_s: float = ECOS_RECONNECT_S,
+    ) -> None:
         """Initialize ecos subject.
 
         Args:
             ecos_config (dict[str, Any]): ecos config
             ecos_ids (pd.Series): all ecos ids in the network
+            reconnect_s (float, optional): delay before a dropped connection is
+                reconnected. Defaults to ECOS_RECONNECT_S.
         """
         super().__init__()
         self.ecos_config = ecos_config
         self.ecos_ids = ecos_ids
+        self.reconnect_s = reconnect_s
         self.observers: list[Observer] = []
+        self.stations: list[_Station] = []
+        # ids handed over to the record thread by subscribe
+        self._pending_ids: pd.Series | None = None
 
     @override
     def attach(self, observer: Observer) -> None:
@@ -52,46 +73,200 @@ class EcosSubject(Subject):
         """
         with self.lock:
             self.observers.remove(observer)
+            self.close_mailbox(observer)
+
+    def start_record(self) -> None:
+        """Start a single thread, which multiplexes the sockets of all ecos."""
+        port = self.ecos_config["port"]
+        # an ip may be configured for several bpks
+        ips = dict.fromkeys(self.ecos_config["bpk_ip"].values())
+        self.stations = [_Station(ip, port) for ip in ips]
+        self._running = True
+        self._wake_r, self._wake_w = socket.socketpair()
+        self.thread = Thread(target=self._record, daemon=True, name="ecos")
+        self.thread.start()
+
+    def subscribe(self, ecos_ids: pd.Series) -> None:
+        """Subscribe to all ecos ids, e.g. after a rescrape added accessories.
+
+        The record thread sends the requests of the new ids on the open connections,
+        reconnected stations subscribe to all ids.
+
+        Args:
+            ecos_ids (pd.Series): all ecos ids in the network
+        """
+        with self.lock:
+            self._pending_ids = ecos_ids
+        self._wake_w.send(b"\0")
+
+    def stop_record(self) -> None:
+        """Stop the record thread and close all sockets."""
+        self._running = False
+        self._wake_w.send(b"\0")
+        self.thread.join()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def _record(self) -> None:
+        """Subscribe to all ecos, notify observers, reconnect dropped connections."""
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ, None)
+        while self._running:
+            now = time.monotonic()
+            for station in self.stations:
+                if station.skt is None and now >= station.retry_at:
+                    self._connect(selector, station)
+            retry_at = [station.retry_at for station in self.stations if station.skt is None]
+            timeout = max(min(retry_at) - now, 0) if retry_at else None
+            for key, mask in selector.select(timeout):
+                station = key.data
+                if station is None:
+                    self._wake_r.recv(64)
+                    self._add_subscriptions(selector)
+                    continue
+                try:
+                    if mask & selectors.EVENT_WRITE:
+                        self._write(selector, station)
+                    if mask & selectors.EVENT_READ:
+                        self._read(station)
+                except OSError as err:
+                    self._disconnect(selector, station, err)
+                except Exception as err:  # pylint: disable=W0718
+                    # a broken station must not stop the thread of all stations
+                    self._disconnect(selector, station, err)
+        for station in self.stations:
+            if station.skt is not None:
+                station.skt.close()
+                station.skt = None
+        selector.close()
+
+    def _connect(self, selector: selectors.BaseSelector, station: _Station) -> None:
+        """Start a non blocking connect, the subscriptions are sent once connected.
+
+        Args:
+            selector (selectors.BaseSelector): selector of the record thread
+            station (_Station): ecos
+        """
+        skt = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        skt.setblocking(False)
+        err = skt.connect_ex((station.ip, station.port))
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            skt.close()
+            self._disconnect(selector, station, OSError(err, os.strerror(err)))
+            return
+        station.skt = skt
+        station.connected = False
+        station.framer = RecordFramer(delimiter=ECOS_REPLY_END)
+        station.outgoing = b"".join(
+            f"request({ecos_id}, view)\n".encode("utf-8") for ecos_id in self.ecos_ids
+        )
+        selector.register(skt, selectors.EVENT_READ | selectors.EVENT_WRITE, station)
+
+    def _add_subscriptions(self, selector: selectors.BaseSelector) -> None:
+        """Send the requests of ids passed to subscribe, which are not subscribed yet.
+
+        Args:
+            selector (selectors.BaseSelector): selector of the record thread
+        """
+        with self.lock:
+            ecos_ids, self._pending_ids = self._pending_ids, None
+        if ecos_ids is None:
+            return
+        subscribed = set(self.ecos_ids.astype(str))
+        requests = b"".join(
+            f"request({ecos_id}, view)\n".encode("utf-8")
+            for ecos_id in ecos_ids
+            if str(ecos_id) not in subscribed
+        )
+        self.ecos_ids = ecos_ids
+        if not requests:
+            return
+        for station in self.stations:
+            if station.skt is not None:
+                station.outgoing += requests
+                selector.modify(station.skt, selectors.EVENT_READ | selectors.EVENT_WRITE, station)
 
-    def _record(self, ip: str, port: int) -> None:
-        """Open and subsribe to an ecos socket. Notify observers.
+    def _write(self, selector: selectors.BaseSelector, station: _Station) -> None:
+        """Send pending subscriptions.
+
+        Args:
+            selector (selectors.BaseSelector): selector of the record thread
+            station (_Station): ecos
+
+        Raises:
+            OSError: connect failed
+        """
+        assert station.skt is not None
+        if not station.connected:
+            err = station.skt.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err:
+                raise OSError(err, os.strerror(err))
+            station.connected = True
+        sent = station.skt.send(station.outgoing)
+        station.outgoing = station.outgoing[sent:]
+        if not station.outgoing:
+            selector.modify(station.skt, selectors.EVENT_READ, station)
+
+    def _read(self, station: _Station) -> None:
+        """Receive and notify all complete events.
+
+        An observer, which raises, is warned about and skipped, the other observers and
+        stations are notified anyway.
+
+        Args:
+            station (_Station): ecos
+        """
+        assert station.skt is not None
+        station.framer.recv_into(station.skt, 65536)
+        for record in station.framer.records():
+            match = EVENT_PATTERN.search(record)
+            if match:
+                ecos_id, state = match.groups()
+                event = {"id": int(ecos_id), "ip": station.ip, "state": int(state)}
+                with self.lock:
+                    observers = list(self.observers)
+                for observer in observers:
+                    try:
+                        self.notify([observer], event)
+                    except Exception as err:  # pylint: disable=W0718
+                        warnings.warn(f"{type(observer).__name__} failed on {event}: {err!r}")
+
+    def _disconnect(
+        self, selector: selectors.BaseSelector, station: _Station, err: Exception
+    ) -> None:
+        """Close the socket, reconnect after reconnect_s.
+
+        Args:
+            selector (selectors.BaseSelector): selector of the record thread
+            station (_Station): ecos
+            err (Exception): cause
+        """
+        if station.skt is not None:
+            selector.unregister(station.skt)
+            station.skt.close()
+            station.skt = None
+        station.retry_at = time.monotonic() + self.reconnect_s
+        station.reconnects += 1
+        warnings.warn(f"ecos {station.ip} disconnected, reconnect in {self.reconnect_s}s: {err!r}")
+
+
+class _Station:
+    """Connection of the record thread to one ecos."""
+
+    def __init__(self, ip: str, port: int) -> None:
+        """Initialize a disconnected station.
 
         Args:
             ip (str): ecos ip
             port (int): ecos port
         """
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as skt:
-            skt.connect((ip, port))
-
-            for ecos_id in self.ecos_ids:
-                cmd = f"request({ecos_id}, view)"
-                skt.sendall(cmd.encode("utf-8"))
-
-            buffer = b""
-            delimiter = b"<END 0 (OK)>"
-            state_pattern = r"state\[(\d)\]"
-            id_pattern = r"<EVENT (\d+)>"
-            while True:
-                while delimiter not in buffer:
-                    buffer += skt.recv(1024)
-
-                data, _, buffer = buffer.partition(delimiter)
-                data_string = data.decode("utf-8")
-                data_string.replace("\r\n", "")
-
-                match_state = re.search(state_pattern, data_string)
-                if match_state:
-                    state = match_state.group(1)
-                    match_id = re.search(id_pattern, data_string)
-                    if match_id:
-                        ecos_id = match_id.group(1)
-                        self.notify(
-                            self.observers,
-                            {"id": int(ecos_id), "ip": ip, "state": int(state)},
-                        )
-
-    def start_record(self) -> None:
-        """Start all ecos sockets in threads."""
-        port = self.ecos_config["port"]
-        for ip in self.ecos_config["bpk_ip"].values():
-            Thread(target=self._record, args=[ip, port], daemon=True).start()
+        self.ip = ip
+        self.port = port
+        self.skt: socket.socket | None = None
+        self.connected = False
+        self.framer = RecordFramer(delimiter=ECOS_REPLY_END)
+        # subscriptions not yet sent
+        self.outgoing = b""
+        # monotonic time of the next connect
+        self.retry_at = 0.0
+        self.reconnects: int = 0
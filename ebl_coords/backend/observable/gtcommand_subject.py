@@ -2,18 +2,25 @@
 from __future__ import annotations
 
 import socket
+from operator import itemgetter
 from threading import RLock, Thread
 from typing import TYPE_CHECKING
 
 import numpy as np
 
-from ebl_coords.backend.constants import GTCOMMAND_IP, GTCOMMAND_PORT, IGNORE_Z_AXIS
-from ebl_coords.backend.constants import TS_HIT_THRESHOLD
+from ebl_coords.backend.constants import COORD_FILTER_BACKEND, GLOBAL_LOCALIZATION, GTCOMMAND_IP
+from ebl_coords.backend.constants import GTCOMMAND_PORT, IGNORE_Z_AXIS, TS_HIT_THRESHOLD
+from ebl_coords.backend.coord_filter import make_coord_filter
+from ebl_coords.backend.framing import RecordFramer
+from ebl_coords.backend.gtcommand_records import SAMPLE_DTYPE, get_coords, get_velocities
+from ebl_coords.backend.gtcommand_records import parse_records
+from ebl_coords.backend.observable.mailbox import OverflowPolicy
 from ebl_coords.backend.observable.subject import Subject
-from ebl_coords.backend.transform_data import get_tolerance_mask, get_track_switches_hit
+from ebl_coords.backend.spatial_index import SwitchIndex
+from ebl_coords.backend.tracing import Trace, Tracer
+from ebl_coords.backend.transform_data import get_track_switches_hit
 from ebl_coords.decorators import override
-from ebl_coords.graph_db.data_elements.switch_item_enum import SwitchItem
-from ebl_coords.graph_db.graph_db_api import GraphDbApi
+from ebl_coords.graph_db.topology import TopologyCache
 
 if TYPE_CHECKING:
     from ebl_coords.backend.observable.observer import Observer
@@ -29,6 +36,7 @@ class GtCommandSubject(Subject):
         ip: str = GTCOMMAND_IP,
         port: int = GTCOMMAND_PORT,
         ts_hit_threshold: int = TS_HIT_THRESHOLD,
+        filter_backend: str = COORD_FILTER_BACKEND,
     ) -> None:
         """Initialize the buffer and the socket.
 
@@ -38,98 +46,234 @@ class GtCommandSubject(Subject):
             ip (str, optional): ip of GtCommand. Defaults to GTCOMMAND_IP.
             port (int, optional): port of GtCommand. Defaults to GTCOMMAND_PORT.
             ts_hit_threshold(int, optional): Maximal distance coord to trainswitch to be considered valid hit. Defaults to 35.
+            filter_backend (str, optional): "median" or "kalman". Defaults to COORD_FILTER_BACKEND.
         """
         super().__init__()
-        self.graph_db = GraphDbApi()
+        self.topology = TopologyCache()
         self.ts_coords: np.ndarray
         self.ts_labels: np.ndarray | None = None
         self.ip: str = ip
         self.port: int = port
         self.ts_hit_threshold = ts_hit_threshold
+        self.ts_index = SwitchIndex()
+        self.global_localization: bool = False
         self.loc_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.record_thread = Thread(
-            target=self._record,
-            daemon=True,
-            args=[noise_filter_threshold],
-        )
-        self.record_thread.start()
 
         self.all_coord_observers: list[Observer] = []
         self.changed_coord_observers: list[Observer] = []
+        self.coord_batch_observers: list[Observer] = []
         self.ts_hit_observers: list[Observer] = []
 
-        self._noise_buffer = np.full((3, 3), dtype=np.float32, fill_value=np.nan)
-        self._median_buffer = np.full((median_kernel_size, 3), dtype=np.float32, fill_value=np.nan)
+        self._coord_filter = make_coord_filter(
+            filter_backend, median_kernel_size, noise_filter_threshold
+        )
+        # tag id -> slot of the filter state
+        self._tag_slots: dict[int, int] = {}
+        self._last_coords: dict[int, np.ndarray] = {}
+        self._ts_last_hits: dict[int, np.ndarray] = {}
         self.ts_coords_lock = RLock()
         self.ts_labels_lock = RLock()
 
+        self.record_thread = Thread(target=self._record, daemon=True)
+        self.record_thread.start()
+        if GLOBAL_LOCALIZATION:
+            self.set_global_localization(True)
+
     def set_next_ts(self, edge_id: str) -> None:
         """Set coordinates and label of following node after this edge.
 
         Args:
             edge_id (str): edge_id
         """
-        weiche = SwitchItem.WEICHE.name
-        cmd = f"""
-        MATCH ({weiche})-[r]->(n:{weiche})\
-        WHERE r.edge_id='{edge_id}'\
-        RETURN n.node_id, n.x, n.y, n.z
-        """
-        df = self.graph_db.run_query(cmd)
+        labels, coords = self.topology.get().dest_nodes(edge_id)
         with self.ts_coords_lock:
-            self.ts_coords = df[["n.x", "n.y", "n.z"]].to_numpy().astype(np.float32)
+            self.ts_coords = coords
             if IGNORE_Z_AXIS:
                 self.ts_coords[:, 2] = 0
         with self.ts_labels_lock:
-            self.ts_labels = df["n.node_id"].to_numpy()
-
-    def _filter_coord(self, coord: np.ndarray, noise_filter_threshold: int) -> np.ndarray | None:
-        med_coord: np.ndarray | None = None
-        self._noise_buffer[-1] = coord
-        if get_tolerance_mask(self._noise_buffer, noise_filter_threshold)[0]:
-            self._median_buffer[-1] = self._noise_buffer[1]
-            if not np.isnan(self._median_buffer).any():
-                med_coord = np.median(self._median_buffer, axis=0)
-            self._median_buffer = np.roll(self._median_buffer, shift=self._median_buffer.size - 3)
-
-        self._noise_buffer = np.roll(self._noise_buffer, shift=self._noise_buffer.size - 3)
-        return med_coord
-
-    def _record(self, noise_filter_threshold: int) -> None:
-        buffer = b""
+            self.ts_labels = labels
+
+    def rebuild_ts_index(self) -> None:
+        """Rebuild the spatial index over all train switches, e.g. after a measurement.
+
+        Both nodes of a double node are at the same coordinates, only one is indexed.
+        """
+        labels, coords = self.topology.get().switches()
+        if labels.size == 0:
+            self.ts_index.build(np.empty(0, dtype=object), np.empty((0, 3)))
+            return
+        if IGNORE_Z_AXIS:
+            coords[:, 2] = 0
+        self.ts_index.build(labels, coords)
+
+    def set_global_localization(self, enabled: bool) -> None:
+        """Search train switch hits in the whole layout instead of the next train switches.
+
+        Used to relocalize a train, which was placed somewhere else. The index is
+        rebuilt when enabled.
+
+        Args:
+            enabled (bool): global localization mode
+        """
+        if enabled:
+            self.rebuild_ts_index()
+        self.global_localization = enabled
+
+    def _get_ts_hits(
+        self, coord: np.ndarray, heading: np.ndarray | None = None
+    ) -> np.ndarray | None:
+        """Get the train switches hit by a coordinate.
+
+        In global localization mode the entered node of every double node is chosen by
+        the heading, no switch is hit while the heading is unknown. Else the next train
+        switches are the entered nodes already.
+
+        Args:
+            coord (np.ndarray): filtered coordinate
+            heading (np.ndarray | None, optional): direction of travel. Defaults to None.
+
+        Returns:
+            np.ndarray | None: hit labels, None if there are no train switches to compare.
+        """
+        if self.global_localization:
+            labels = self.ts_index.query_radius(coord, self.ts_hit_threshold)
+            if heading is None or labels.size == 0:
+                return labels[:0]
+            topology = self.topology.get()
+            entered = [topology.entered_node(label, heading) for label in labels.tolist()]
+            return np.array([label for label in entered if label is not None], dtype=object)
+        with self.ts_labels_lock:
+            if self.ts_labels is None:
+                return None
+            with self.ts_coords_lock:
+                return get_track_switches_hit(
+                    self.ts_labels,
+                    self.ts_coords,
+                    coord.reshape(1, -1),
+                    self.ts_hit_threshold,
+                )
+
+    def _get_slots(self, tag_ids: np.ndarray) -> np.ndarray:
+        """Map tag ids to filter slots, new tags get the next free slot.
+
+        Args:
+            tag_ids (np.ndarray): tag ids
+
+        Returns:
+            np.ndarray: slots
+        """
+        unique, inverse = np.unique(tag_ids, return_inverse=True)
+        slots = np.empty(unique.size, dtype=np.intp)
+        for i, tag_id in enumerate(unique.tolist()):
+            slots[i] = self._tag_slots.setdefault(tag_id, len(self._tag_slots))
+        if len(self._tag_slots) > self._coord_filter.capacity:
+            self._coord_filter.resize(2 * len(self._tag_slots))
+        return slots[inverse.reshape(-1)]
+
+    def _filter_batch(self, batch: np.ndarray) -> np.ndarray:
+        """Filter all records of a batch, every tag on its own.
+
+        The n-th records of all tags in the batch are filtered in a single step.
+
+        Args:
+            batch (np.ndarray): records with RECORD_DTYPE
+
+        Returns:
+            np.ndarray: filtered samples with SAMPLE_DTYPE in the order of the records
+        """
+        n = batch.size
+        slots = self._get_slots(batch["tag_id"])
+        coords = get_coords(batch)
+        timestamps = batch["timestamp"]
+
+        # rank of every record within the records of its tag
+        order = np.argsort(slots, kind="stable")
+        sorted_slots = slots[order]
+        starts = np.flatnonzero(np.r_[True, sorted_slots[1:] != sorted_slots[:-1]])
+        group_start = np.repeat(starts, np.diff(np.r_[starts, n]))
+        rank = np.empty(n, dtype=np.intp)
+        rank[order] = np.arange(n) - group_start
+
+        indices, positions, velocities = [], [], []
+        for r in range(int(rank.max()) + 1 if n > 0 else 0):
+            idx = np.flatnonzero(rank == r)
+            released, position, velocity = self._coord_filter.step(
+                slots[idx], timestamps[idx], coords[idx]
+            )
+            indices.append(idx[released])
+            positions.append(position)
+            velocities.append(velocity)
+        if not indices:
+            return np.empty(0, dtype=SAMPLE_DTYPE)
+
+        released_idx = np.concatenate(indices)
+        order = np.argsort(released_idx, kind="stable")
+        released_idx = released_idx[order]
+        position = np.concatenate(positions)[order]
+        velocity = np.concatenate(velocities)[order]
+        samples = np.empty(released_idx.size, dtype=SAMPLE_DTYPE)
+        samples["timestamp"] = timestamps[released_idx]
+        samples["tag_id"] = batch["tag_id"][released_idx]
+        samples["x"], samples["y"], samples["z"] = position.T
+        samples["vx"], samples["vy"], samples["vz"] = velocity.T
+        return samples
+
+    def _notify_batch(self, samples: np.ndarray) -> None:
+        """Notify all hooks with the filtered samples of a batch.
+
+        Args:
+            samples (np.ndarray): filtered samples with SAMPLE_DTYPE
+        """
+        if samples.size == 0:
+            return
+        self.notify(self.coord_batch_observers, samples)
+        coords = get_coords(samples)
+        velocities = get_velocities(samples)
+        for time_stamp, tag_id, filtered_coord, velocity in zip(
+            samples["timestamp"].tolist(), samples["tag_id"].tolist(), coords, velocities
+        ):
+            self.notify(self.all_coord_observers, (filtered_coord.copy(), tag_id))
+            last_coord = self._last_coords.get(tag_id)
+            if not np.all(filtered_coord == last_coord):
+                if IGNORE_Z_AXIS:
+                    filtered_coord[2] = 0
+                    velocity[2] = 0
+                self._last_coords[tag_id] = filtered_coord
+                heading = None if np.isnan(velocity).any() else velocity
+                self.notify(
+                    self.changed_coord_observers,
+                    (
+                        time_stamp,
+                        filtered_coord,
+                        heading,
+                        tag_id,
+                    ),
+                )
+                if not self.ts_hit_observers:
+                    continue
+                if heading is None and last_coord is not None:
+                    # the entered side of a double node follows from the direction of travel
+                    heading = filtered_coord - last_coord
+                hit_labels = self._get_ts_hits(filtered_coord, heading)
+                if hit_labels is not None and hit_labels.size > 0:
+                    last_hit = self._ts_last_hits.get(tag_id)
+                    if last_hit is None or not np.array_equal(last_hit, hit_labels):
+                        self.notify(self.ts_hit_observers, (hit_labels, tag_id))
+                        self._ts_last_hits[tag_id] = hit_labels
+
+    def _record(self) -> None:
+        framer = RecordFramer(delimiter=b";")
+        tracer = Tracer()
         self.loc_socket.connect((self.ip, self.port))
-        last_coord: np.ndarray | None = None
-        ts_last_hit: np.ndarray | None = None
         while True:
-            while b";" not in buffer:
-                buffer += self.loc_socket.recv(1024)
-
-            line, _, buffer = buffer.partition(b";")
-            line_string = line.decode("utf-8")
-
-            ds = line_string.split(",")
-            coord = np.array([ds[3], ds[4], ds[5]], dtype=np.int32)
-            time_stamp = int(ds[0])
-            filtered_coord = self._filter_coord(coord, noise_filter_threshold)
-            if filtered_coord is not None:
-                self.notify(self.all_coord_observers, filtered_coord)
-                if not np.all(filtered_coord == last_coord):
-                    if IGNORE_Z_AXIS:
-                        filtered_coord[2] = 0
-                    self.notify(self.changed_coord_observers, (time_stamp, filtered_coord))
-                    if self.ts_labels and self.ts_hit_observers:
-                        with self.ts_labels_lock:
-                            with self.ts_coords_lock:
-                                hit_labels = get_track_switches_hit(
-                                    self.ts_labels,
-                                    self.ts_coords,
-                                    filtered_coord.reshape(1, -1),
-                                    self.ts_hit_threshold,
-                                )
-                            last_coord = filtered_coord
-                            if not np.all(ts_last_hit == hit_labels) and hit_labels.size > 0:
-                                self.notify(self.ts_hit_observers, hit_labels)
-                                ts_last_hit = hit_labels
+            framer.recv_into(self.loc_socket)
+            trace = Trace.start()
+            batch = parse_records(framer.pop_complete())
+            if batch.size > 0:
+                with tracer.span("gtcommand.filter"):
+                    samples = self._filter_batch(batch)
+                with tracer.hop(trace, "gtcommand.dispatch"):
+                    self._notify_batch(samples)
 
     @override
     def attach(self, observer: Observer) -> None:
@@ -141,34 +285,67 @@ class GtCommandSubject(Subject):
         with self.lock:
             self.changed_coord_observers.append(observer)
 
-    def attach_all_coord(self, observer: Observer) -> None:
+    def attach_all_coord(
+        self, observer: Observer, coalesce: bool = False, max_rate_hz: float | None = None
+    ) -> None:
         """Attach observer that is notified whenever a new valid coordinate is received.
 
-        observer.result contains the new coordinate as np.ndarray
+        observer.result contains Tuple[np.ndarray, int] coordinate, tag id
 
         Args:
             observer (Observer): observer
+            coalesce (bool, optional): only deliver the newest coordinate per tag.
+                Defaults to False.
+            max_rate_hz (float | None, optional): maximal updates per second if coalesced.
+                Defaults to None.
         """
         observer.subject = self
+        if coalesce:
+            self.dispatch_async(
+                observer, OverflowPolicy.LATEST_ONLY, max_rate_hz=max_rate_hz, key=itemgetter(1)
+            )
         with self.lock:
             self.all_coord_observers.append(observer)
 
-    def attach_changed_coord(self, observer: Observer) -> None:
+    def attach_changed_coord(
+        self, observer: Observer, coalesce: bool = False, max_rate_hz: float | None = None
+    ) -> None:
         """Attach observer that is notified whenever a different coordinate is received.
 
-        observer.result contains Tuple[int, np.ndarray] timestamp in ms, coordinate
+        observer.result contains Tuple[int, np.ndarray, Optional[np.ndarray], int] timestamp in ms,
+        coordinate, velocity in mm/ms if estimated by the filter backend, tag id
 
         Args:
             observer (Observer): observer
+            coalesce (bool, optional): only deliver the newest coordinate per tag.
+                Defaults to False.
+            max_rate_hz (float | None, optional): maximal updates per second if coalesced.
+                Defaults to None.
         """
         observer.subject = self
+        if coalesce:
+            self.dispatch_async(
+                observer, OverflowPolicy.LATEST_ONLY, max_rate_hz=max_rate_hz, key=itemgetter(3)
+            )
         with self.lock:
             self.changed_coord_observers.append(observer)
 
+    def attach_coord_batch(self, observer: Observer) -> None:
+        """Attach observer that is notified once for every batch of new valid coordinates.
+
+        observer.result contains the filtered samples as np.ndarray with SAMPLE_DTYPE
+
+        Args:
+            observer (Observer): observer
+        """
+        observer.subject = self
+        with self.lock:
+            self.coord_batch_observers.append(observer)
+
     def attach_ts_hit(self, observer: Observer) -> None:
         """Attach observer that is notified whenever a train switch is hit.
 
-        observer.result contains hit labels as np.ndarray
+        observer.result contains Tuple[np.ndarray, int] hit labels, tag id
 
         Args:
             observer (Observer): observer
@@ -195,6 +372,15 @@ class GtCommandSubject(Subject):
         with self.lock:
             self.changed_coord_observers.remove(observer)
 
+    def detach_coord_batch(self, observer: Observer) -> None:
+        """Detach observer from this hook.
+
+        Args:
+            observer (Observer): observer
+        """
+        with self.lock:
+            self.coord_batch_observers.remove(observer)
+
     def detach_ts_hit(self, observer: Observer) -> None:
         """Detach observer from this hook.
 
@@ -216,5 +402,8 @@ class GtCommandSubject(Subject):
                 self.all_coord_observers.remove(observer)
             if observer in self.changed_coord_observers:
                 self.changed_coord_observers.remove(observer)
+            if observer in self.coord_batch_observers:
+                self.coord_batch_observers.remove(observer)
             if observer in self.ts_hit_observers:
                 self.ts_hit_observers.remove(observer)
+            self.close_mailbox(observer)
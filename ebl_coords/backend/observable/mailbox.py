@@ -0,0 +1,200 @@
+"""Deliver notifications to an observer on its own thread."""
+from __future__ import annotations
+
+import time
+import warnings
+from collections import deque
+from enum import Enum
+from threading import Condition, Thread, current_thread
+from typing import TYPE_CHECKING, Any, Callable, Hashable, NamedTuple
+
+from ebl_coords.backend.constants import MAILBOX_SIZE
+from ebl_coords.backend.tracing import Trace, Tracer
+
+if TYPE_CHECKING:
+    from ebl_coords.backend.observable.observer import Observer
+
+
+class OverflowPolicy(Enum):
+    """What happens to a new notification if the mailbox is full."""
+
+    # wait until the observer caught up
+    BLOCK = "BLOCK"
+    # discard the oldest pending notification
+    DROP_OLDEST = "DROP_OLDEST"
+    # keep only the newest notification per coalescing key
+    LATEST_ONLY = "LATEST_ONLY"
+
+
+class MailboxStats(NamedTuple):
+    """Counters of a mailbox."""
+
+    pending: int
+    max_pending: int
+    delivered: int
+    dropped: int
+    errors: int
+    lag_s: float
+
+
+class Mailbox:
+    """Bounded mailbox with a delivery thread for a single observer.
+
+    With LATEST_ONLY the mailbox coalesces, a new notification replaces the pending one
+    with the same key. Together with max_rate_hz the observer is updated at most at
+    this rate, no matter how fast the subject notifies.
+    """
+
+    def __init__(
+        self,
+        observer: Observer,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        maxsize: int = MAILBOX_SIZE,
+        max_rate_hz: float | None = None,
+        key: Callable[[Any], Hashable] | None = None,
+    ) -> None:
+        """Initialize the mailbox and start the delivery thread.
+
+        Args:
+            observer (Observer): observer to deliver to
+            policy (OverflowPolicy, optional): overflow policy. Defaults to BLOCK.
+            maxsize (int, optional): maximal pending notifications, not used for
+                LATEST_ONLY. Defaults to MAILBOX_SIZE.
+            max_rate_hz (float | None, optional): maximal updates per second. Defaults to None.
+            key (Callable[[Any], Hashable] | None, optional): coalescing key of a result
+                for LATEST_ONLY, all results share one key if None. Defaults to None.
+        """
+        self.observer = observer
+        self.policy = policy
+        self.maxsize = maxsize
+        self.min_interval_s = 0.0 if max_rate_hz is None else 1 / max_rate_hz
+        self.key = key
+        # (monotonic time posted, result, trace)
+        self._queue: deque[tuple[float, Any, Trace | None]] = deque()
+        # coalescing key -> (monotonic time first posted, newest result, its trace)
+        self._latest: dict[Hashable, tuple[float, Any, Trace | None]] = {}
+        self._condition = Condition()
+        self._closed = False
+        self.max_pending: int = 0
+        self.delivered: int = 0
+        self.dropped: int = 0
+        self.errors: int = 0
+        self.thread = Thread(
+            target=self._deliver, daemon=True, name=f"mailbox-{type(observer).__name__}"
+        )
+        self.thread.start()
+
+    def post(self, result: Any, trace: Trace | None = None) -> None:
+        """Queue a notification, apply the overflow policy if the mailbox is full.
+
+        Args:
+            result (Any): result for the observer
+            trace (Trace | None, optional): trace of the notification. Defaults to None.
+        """
+        with self._condition:
+            if self.policy == OverflowPolicy.LATEST_ONLY:
+                self._coalesce(result, trace)
+                return
+            if len(self._queue) >= self.maxsize:
+                if self.policy == OverflowPolicy.BLOCK:
+                    self._condition.wait_for(
+                        lambda: len(self._queue) < self.maxsize or self._closed
+                    )
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+            if self._closed:
+                return
+            self._queue.append((time.monotonic(), result, trace))
+            self.max_pending = max(self.max_pending, len(self._queue))
+            self._condition.notify_all()
+
+    def _coalesce(self, result: Any, trace: Trace | None) -> None:
+        """Replace the pending result with the same key, must hold the condition.
+
+        Args:
+            result (Any): result for the observer
+            trace (Trace | None): trace of the notification
+        """
+        if self._closed:
+            return
+        key = None if self.key is None else self.key(result)
+        posted = self._latest.get(key)
+        if posted is None:
+            self._latest[key] = (time.monotonic(), result, trace)
+        else:
+            self._latest[key] = (posted[0], result, trace)
+            self.dropped += 1
+        self.max_pending = max(self.max_pending, len(self._latest))
+        self._condition.notify_all()
+
+    @property
+    def pending(self) -> int:
+        """Number of pending notifications."""
+        return len(self._queue) + len(self._latest)
+
+    def _pop(self) -> tuple[Any, Trace | None]:
+        """Take the oldest pending result, must hold the condition.
+
+        Returns:
+            tuple[Any, Trace | None]: (result, trace)
+        """
+        if self._latest:
+            key = next(iter(self._latest))
+            return self._latest.pop(key)[1:]
+        return self._queue.popleft()[1:]
+
+    def _deliver(self) -> None:
+        tracer = Tracer()
+        hop = f"mailbox.{type(self.observer).__name__}"
+        next_delivery = 0.0
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self.pending > 0 or self._closed)
+                delay = next_delivery - time.monotonic()
+                if delay > 0:
+                    # rate limited, newer results are coalesced meanwhile
+                    self._condition.wait_for(lambda: self._closed, timeout=delay)
+                if self._closed:
+                    return
+                result, trace = self._pop()
+                self._condition.notify_all()
+            next_delivery = time.monotonic() + self.min_interval_s
+            self.observer.result = result
+            try:
+                with tracer.hop(trace, hop):
+                    self.observer.update()
+            except Exception as err:  # pylint: disable=W0718
+                self.errors += 1
+                warnings.warn(f"{type(self.observer).__name__}.update failed: {err!r}")
+            self.delivered += 1
+
+    def close(self, wait: bool = False) -> None:
+        """Stop the delivery thread, pending notifications are discarded.
+
+        Args:
+            wait (bool, optional): wait for the running update to finish. Defaults to False.
+        """
+        with self._condition:
+            self._closed = True
+            self._queue.clear()
+            self._latest.clear()
+            self._condition.notify_all()
+        if wait and current_thread() is not self.thread:
+            self.thread.join()
+
+    @property
+    def stats(self) -> MailboxStats:
+        """Current counters, lag_s is the age of the oldest pending notification."""
+        with self._condition:
+            posted = [self._queue[0][0]] if self._queue else []
+            posted.extend(item[0] for item in self._latest.values())
+            lag_s = time.monotonic() - min(posted) if posted else 0.0
+            return MailboxStats(
+                pending=self.pending,
+                max_pending=self.max_pending,
+                delivered=self.delivered,
+                dropped=self.dropped,
+                errors=self.errors,
+                lag_s=lag_s,
+            )
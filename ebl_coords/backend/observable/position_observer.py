@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 import numpy as np
 
 from ebl_coords.backend.command.command import Command
-from ebl_coords.backend.constants import MIN_DELTA_DISTANCE
+from ebl_coords.backend.constants import CPS, MIN_DELTA_DISTANCE
 from ebl_coords.backend.observable.gtcommand_subject import GtCommandSubject
 from ebl_coords.backend.observable.observer import Observer
 from ebl_coords.decorators import override
@@ -30,19 +30,26 @@ class PositionObserver(Observer):
         self.map_editor = map_editor
         self.prev_coord: np.ndarray | None = None
         self.prev_timestamp: int | None = None  # in ms
+        # follow the first tag seen
+        self.tag_id: int | None = None
 
     @override
     def update(self) -> None:
         """Save the last used coordinate, until distance > MIN_TS_THRESHOLD was measured.
 
-        Update the GUI.
+        Update the GUI. Use the velocity of the filter backend if available, otherwise
+        the velocity is differenced from the last used coordinate.
         """
         assert self.result is not None
+        timestamp, coord, velocity, tag_id = self.result
+        if self.tag_id is None:
+            self.tag_id = tag_id
+        elif tag_id != self.tag_id:
+            return
         if self.prev_coord is None:
             assert self.prev_timestamp is None
-            self.prev_timestamp, self.prev_coord = self.result
+            self.prev_timestamp, self.prev_coord = timestamp, coord
             return
-        timestamp, coord = self.result
         distance = np.linalg.norm(coord - self.prev_coord) / 1000
         time_delta = (timestamp - self.prev_timestamp) / 1000
 
@@ -50,7 +57,11 @@ class PositionObserver(Observer):
             self.gui_queue.put(
                 AddFloatCmd(content=distance, context=self.map_editor.ui.map_distance_dsb)
             )
-            v = distance / time_delta
+            if velocity is None:
+                v = distance / time_delta
+            else:
+                # filtered velocity in mm/ms = m/s
+                v = float(np.linalg.norm(velocity))
             self.gui_queue.put(
                 SetTextCmd(
                     content=f"{v:.3f}",
@@ -84,4 +95,7 @@ class AttachPositionCommand(Command):
     @override
     def run(self) -> None:
         """Create and attach a PositionObserver."""
-        self.context.attach_changed_coord(PositionObserver(map_editor=self.content))
+        # distance is measured from the last used coordinate, skipping samples is fine
+        self.context.attach_changed_coord(
+            PositionObserver(map_editor=self.content), coalesce=True, max_rate_hz=CPS
+        )
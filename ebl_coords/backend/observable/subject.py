@@ -3,9 +3,12 @@ from __future__ import annotations
 
 from abc import abstractmethod
 from threading import RLock
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable, Hashable
 
+from ebl_coords.backend.constants import MAILBOX_SIZE
+from ebl_coords.backend.observable.mailbox import Mailbox, MailboxStats, OverflowPolicy
 from ebl_coords.backend.singleton_meta import SingletonMeta
+from ebl_coords.backend.tracing import Tracer
 
 if TYPE_CHECKING:
     from ebl_coords.backend.observable.observer import Observer
@@ -26,6 +29,7 @@ class Subject(metaclass=SingletonMeta):
     def __init__(self) -> None:
         """Initialize the Subject with reentry lock."""
         self.lock = RLock()
+        self.mailboxes: dict[Observer, Mailbox] = {}
 
     @abstractmethod
     def attach(self, observer: Observer) -> None:
@@ -51,14 +55,73 @@ class Subject(metaclass=SingletonMeta):
         """
         raise NotImplementedError
 
+    def dispatch_async(
+        self,
+        observer: Observer,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        maxsize: int = MAILBOX_SIZE,
+        max_rate_hz: float | None = None,
+        key: Callable[[Any], Hashable] | None = None,
+    ) -> Mailbox:
+        """Deliver all notifications of observer on its own thread.
+
+        The notifying thread only waits for the observer, if its mailbox is full and the
+        policy is BLOCK.
+
+        Args:
+            observer (Observer): observer
+            policy (OverflowPolicy, optional): overflow policy. Defaults to BLOCK.
+            maxsize (int, optional): mailbox size. Defaults to MAILBOX_SIZE.
+            max_rate_hz (float | None, optional): maximal updates per second. Defaults to None.
+            key (Callable[[Any], Hashable] | None, optional): coalescing key for LATEST_ONLY.
+                Defaults to None.
+
+        Returns:
+            Mailbox: mailbox of the observer
+        """
+        with self.lock:
+            self.close_mailbox(observer)
+            mailbox = Mailbox(observer, policy, maxsize, max_rate_hz, key)
+            self.mailboxes[observer] = mailbox
+            return mailbox
+
+    def close_mailbox(self, observer: Observer) -> None:
+        """Deliver the notifications of observer synchronously again.
+
+        Args:
+            observer (Observer): observer
+        """
+        with self.lock:
+            mailbox = self.mailboxes.pop(observer, None)
+        if mailbox is not None:
+            mailbox.close()
+
+    def mailbox_stats(self) -> dict[Observer, MailboxStats]:
+        """Get lag and drop counters of all asynchronous observers.
+
+        Returns:
+            dict[Observer, MailboxStats]: counters per observer
+        """
+        with self.lock:
+            return {observer: mailbox.stats for observer, mailbox in self.mailboxes.items()}
+
     def notify(self, observers: list[Observer], result: Any) -> None:
         """Notify observers in list and set result.
 
+        Asynchronous observers get the result posted to their mailbox.
+
         Args:
             observers (list[Observer]): list of observers
             result (Any): result
         """
         with self.lock:
-            for observer in observers:
+            deliveries = [(observer, self.mailboxes.get(observer)) for observer in observers]
+        tracer = Tracer()
+        trace = tracer.current()
+        for observer, mailbox in deliveries:
+            if mailbox is None:
                 observer.result = result
-                observer.update()
+                with tracer.hop(trace, f"observer.{type(observer).__name__}"):
+                    observer.update()
+            else:
+                mailbox.post(result, trace)
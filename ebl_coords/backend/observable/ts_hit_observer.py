@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 from ebl_coords.backend.command.command import Command
 from ebl_coords.backend.command.db_cmd import OccupyNextEdgeGuiCommand
 from ebl_coords.backend.observable.gtcommand_subject import GtCommandSubject
+from ebl_coords.backend.observable.mailbox import OverflowPolicy
 from ebl_coords.backend.observable.observer import Observer
 from ebl_coords.decorators import override
 from ebl_coords.frontend.command.d_spinbox_cmd import SetFloatCmd
@@ -38,9 +39,10 @@ class TsHitObserver(Observer):
     @override
     def update(self) -> None:
         """Update QCombobox in map editor."""
+        hit_labels, _ = self.result
         self.worker_queue.put(
             OccupyNextEdgeGuiCommand(
-                content=(self.result[0], self.ebl_coords, self.combo_box),
+                content=(hit_labels[0], self.ebl_coords, self.combo_box),
                 context=self.gui_queue,
             )
         )
@@ -64,9 +66,6 @@ class AttachTsHitObsCommand(Command):
     def run(self) -> None:
         """Create and attach a new TsHitObserver."""
         ebl_coords, combo_box = self.content
-        self.context.attach_ts_hit(
-            TsHitObserver(
-                ebl_coors=ebl_coords,
-                combo_box=combo_box,
-            )
-        )
+        observer = TsHitObserver(ebl_coors=ebl_coords, combo_box=combo_box)
+        self.context.dispatch_async(observer, OverflowPolicy.BLOCK)
+        self.context.attach_ts_hit(observer)
@@ -1,19 +1,22 @@
 """Observer in order to measure trainswitches."""
 from __future__ import annotations
 
+from functools import partial
 from typing import TYPE_CHECKING
 
 import numpy as np
 
-from ebl_coords.backend.command.command import Command, WrapperCommand
+from ebl_coords.backend.command.command import Command, WrapperCommand, WrapperFunctionCommand
 from ebl_coords.backend.command.db_cmd import DbCommand
+from ebl_coords.backend.gtcommand_records import get_coords
 from ebl_coords.backend.observable.gtcommand_subject import GtCommandSubject
+from ebl_coords.backend.observable.mailbox import OverflowPolicy
 from ebl_coords.backend.observable.observer import Observer
 from ebl_coords.decorators import override
 from ebl_coords.frontend.command.label_cmd import SetTextCmd
 from ebl_coords.frontend.command.status_bar_cmd import StatusBarCmd
-from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
-from ebl_coords.graph_db.data_elements.switch_item_enum import SwitchItem
+from ebl_coords.graph_db.query_generator import set_double_nodes_coords
+from ebl_coords.graph_db.topology import TrackTopology
 
 if TYPE_CHECKING:
     from queue import Queue
@@ -53,26 +56,29 @@ class TsMeasureObserver(Observer):
         self.points_needed = points_needed
         self.buffer = np.empty((points_needed, 3), dtype=np.float32)
         self.index: int = 0
+        # measure with the first tag seen
+        self.tag_id: int | None = None
 
     @override
     def update(self) -> None:
-        """Build buffer of coords and put command into queue."""
+        """Build buffer of coords from a sample batch and put command into queue."""
+        if self.index < self.points_needed:
+            if self.tag_id is None:
+                self.tag_id = int(self.result["tag_id"][0])
+            samples = self.result[self.result["tag_id"] == self.tag_id]
+            coords = get_coords(samples)[: self.points_needed - self.index]
+            self.buffer[self.index : self.index + coords.shape[0], :] = coords
+            self.index += coords.shape[0]
         if self.index == self.points_needed:
             self.subject.detach(self)
             ts_coord = np.median(self.buffer, axis=0)
-            double_vertex = EdgeRelation.DOUBLE_VERTEX.name
-            weiche = SwitchItem.WEICHE.name
             x, y, z = ts_coord
-            cmd = f"""
-            MATCH(n1:{weiche}{{node_id:'{self.selected_ts}'}})-[:{double_vertex}]->(n2:{weiche})\
-            SET n1.x = '{x}'\
-            SET n2.x = '{x}'\
-            SET n1.y = '{y}'\
-            SET n2.y = '{y}'\
-            SET n1.z = '{z}'\
-            SET n2.z = '{z}';
-            """
-            self.worker_queue.put(DbCommand(content=cmd))
+            cmd = set_double_nodes_coords(self.selected_ts, ts_coord)
+            patch = partial(TrackTopology.set_coords, node_id=self.selected_ts, coord=ts_coord)
+            self.worker_queue.put(DbCommand(content=cmd, key=self.selected_ts, patch=patch))
+            self.worker_queue.put(
+                WrapperFunctionCommand(content=self.subject.rebuild_ts_index, key=self.selected_ts)
+            )
 
             self.worker_queue.put(
                 WrapperCommand(
@@ -101,8 +107,6 @@ class TsMeasureObserver(Observer):
                 context=self.gui_queue,
             )
         )
-        self.buffer[self.index, :] = self.result
-        self.index += 1
 
 
 class AttachTsMeasureCommand(Command):
@@ -122,8 +126,8 @@ class AttachTsMeasureCommand(Command):
     def run(self) -> None:
         """Create and attach a TsMeasureObserver."""
         guid, worker_queue, gui_queue, ui = self.content
-        self.context.attach_all_coord(
-            TsMeasureObserver(
-                selected_ts=guid, gui_queue=gui_queue, worker_queue=worker_queue, ui=ui
-            )
+        observer = TsMeasureObserver(
+            selected_ts=guid, gui_queue=gui_queue, worker_queue=worker_queue, ui=ui
         )
+        self.context.dispatch_async(observer, OverflowPolicy.BLOCK)
+        self.context.attach_coord_batch(observer)
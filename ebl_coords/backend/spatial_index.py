@@ -0,0 +1,77 @@
+"""Spatial index over train switch coordinates."""
+from __future__ import annotations
+
+from threading import RLock
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class SwitchIndex:
+    """KD-tree over the coordinates of all train switch nodes.
+
+    The tree is replaced as a whole on rebuild, queries are answered from the tree which
+    was current when the query started.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.lock = RLock()
+        self.labels: np.ndarray = np.empty(0, dtype=object)
+        self._tree: cKDTree | None = None
+
+    @property
+    def size(self) -> int:
+        """Number of indexed nodes."""
+        return self.labels.size
+
+    def build(self, labels: np.ndarray, coords: np.ndarray) -> None:
+        """Replace the index, nodes without valid coordinates are skipped.
+
+        Args:
+            labels (np.ndarray): labels of the nodes
+            coords (np.ndarray): coordinates of the nodes, dim = Nx3
+        """
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        valid = np.isfinite(coords).all(axis=1)
+        tree = cKDTree(coords[valid]) if valid.any() else None
+        with self.lock:
+            self.labels = np.asarray(labels)[valid]
+            self._tree = tree
+
+    def query_radius(self, coord: np.ndarray, radius: float) -> np.ndarray:
+        """Get all labels within radius of a coordinate.
+
+        Args:
+            coord (np.ndarray): coordinate
+            radius (float): radius <= of sphere around coord
+
+        Returns:
+            np.ndarray: labels sorted by distance, empty if there is none.
+        """
+        with self.lock:
+            tree, labels = self._tree, self.labels
+        if tree is None:
+            return labels[:0]
+        idx = tree.query_ball_point(coord, radius)
+        if len(idx) == 0:
+            return labels[:0]
+        idx = np.asarray(idx)
+        distances = np.linalg.norm(tree.data[idx] - coord, axis=1)
+        return labels[idx[np.argsort(distances, kind="stable")]]
+
+    def nearest(self, coord: np.ndarray) -> tuple[object, float] | None:
+        """Get the closest label of a coordinate.
+
+        Args:
+            coord (np.ndarray): coordinate
+
+        Returns:
+            tuple[object, float] | None: (label, distance), None if the index is empty.
+        """
+        with self.lock:
+            tree, labels = self._tree, self.labels
+        if tree is None:
+            return None
+        distance, idx = tree.query(coord)
+        return labels[idx], float(distance)
@@ -0,0 +1,205 @@
+"""Latency tracing from GtCommand receive to screen update."""
+from __future__ import annotations
+
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock, local
+from typing import Any, Iterator, NamedTuple
+
+from ebl_coords.backend.constants import TRACE_FILE, TRACING
+from ebl_coords.backend.singleton_meta import SingletonMeta
+
+# upper bucket bounds in seconds, 10 us to 100 s
+BUCKET_BOUNDS: list[float] = [10 ** (e / 4) for e in range(-20, 9)]
+
+
+class Trace(NamedTuple):
+    """Monotonic timestamps of a traced sample."""
+
+    # receive time of the sample
+    origin_s: float
+    # time the last hop started
+    last_s: float
+
+    @classmethod
+    def start(cls) -> Trace:
+        """Start a trace now.
+
+        Returns:
+            Trace: new trace
+        """
+        now = time.monotonic()
+        return cls(now, now)
+
+
+class LatencyHistogram:
+    """Histogram with logarithmic buckets, see BUCKET_BOUNDS."""
+
+    def __init__(self) -> None:
+        """Initialize empty buckets."""
+        self.counts: list[int] = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count: int = 0
+        self.sum_s: float = 0.0
+        self.max_s: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add a latency.
+
+        Args:
+            seconds (float): latency in seconds
+        """
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum_s += seconds
+        self.max_s = max(self.max_s, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Get an upper bound of the q-th percentile.
+
+        Args:
+            q (float): percentile in [0, 100]
+
+        Returns:
+            float: upper bound of the bucket in seconds, max for the last bucket.
+        """
+        rank = q / 100 * self.count
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS, self.counts):
+            cumulative += count
+            if cumulative >= rank and cumulative > 0:
+                return min(bound, self.max_s)
+        return self.max_s
+
+    def to_dict(self) -> dict[str, Any]:
+        """Summarize the histogram in ms.
+
+        Returns:
+            dict[str, Any]: count, mean, percentiles, max and the bucket counts
+        """
+        return {
+            "count": self.count,
+            "mean_ms": self.sum_s / max(self.count, 1) * 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p90_ms": self.percentile(90) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max_s * 1000,
+            "bucket_bounds_ms": [bound * 1000 for bound in BUCKET_BOUNDS],
+            "bucket_counts": list(self.counts),
+        }
+
+
+class Tracer(metaclass=SingletonMeta):
+    """Collect the latency of every hop in histograms.
+
+    The trace of the running hop is kept per thread, commands created within a hop
+    inherit it, see Command.
+    """
+
+    def __init__(self, enabled: bool = TRACING) -> None:
+        """Initialize empty histograms.
+
+        Args:
+            enabled (bool, optional): record latencies. Defaults to TRACING.
+        """
+        self.enabled = enabled
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self._lock = Lock()
+        self._local = local()
+
+    def current(self) -> Trace | None:
+        """Get the trace of the running hop of this thread.
+
+        Returns:
+            Trace | None: trace, None if the hop is not traced.
+        """
+        return getattr(self._local, "trace", None)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a latency to a histogram.
+
+        Args:
+            name (str): histogram name
+            seconds (float): latency in seconds
+        """
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def hop(self, trace: Trace | None, name: str) -> Iterator[None]:
+        """Run a hop of a trace, record the time since the last hop started.
+
+        Args:
+            trace (Trace | None): trace of the hop, None for untraced hops
+            name (str): hop name
+
+        Yields:
+            Iterator[None]: the trace is current in this thread meanwhile
+        """
+        previous = self.current()
+        if trace is not None and self.enabled:
+            now = time.monotonic()
+            self.record(name, now - trace.last_s)
+            trace = Trace(trace.origin_s, now)
+        self._local.trace = trace
+        try:
+            yield
+        finally:
+            self._local.trace = previous
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Record the duration of a block, independent of any trace.
+
+        Args:
+            name (str): histogram name
+
+        Yields:
+            Iterator[None]: the timed block
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.record(name, time.monotonic() - start)
+
+    def finish(self, name: str) -> None:
+        """Record the last hop and the end to end latency of the current trace.
+
+        Args:
+            name (str): hop name
+        """
+        trace = self.current()
+        if trace is None or not self.enabled:
+            return
+        now = time.monotonic()
+        self.record(name, now - trace.last_s)
+        self.record("end_to_end", now - trace.origin_s)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Summarize all histograms.
+
+        Returns:
+            dict[str, dict[str, Any]]: histogram name -> summary
+        """
+        with self._lock:
+            return {name: h.to_dict() for name, h in sorted(self.histograms.items())}
+
+    def dump(self, file: str = TRACE_FILE) -> None:
+        """Write all histograms as json.
+
+        Args:
+            file (str, optional): output file. Defaults to TRACE_FILE.
+        """
+        with open(file, "w", encoding="utf-8") as fd:
+            json.dump(self.summary(), fd, indent=2)
+
+    def reset(self) -> None:
+        """Clear all histograms."""
+        with self._lock:
+            self.histograms.clear()
@@ -2,6 +2,7 @@
 import warnings
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy.spatial.distance import cdist
 
 
@@ -18,7 +19,7 @@ def get_tolerance_mask(coords: np.ndarray, tolerance: int) -> np.ndarray:
     # scatter & and reduce with minus
     d = coords[1:, :] - coords[:-1, :]
     # calculate norm
-    d = np.apply_along_axis(np.linalg.norm, axis=1, arr=d)
+    d = np.linalg.norm(d, axis=1)
 
     # scatter
     d_mask = np.c_[d[:-1], d[1:]]
@@ -27,6 +28,22 @@ def get_tolerance_mask(coords: np.ndarray, tolerance: int) -> np.ndarray:
     return d_mask
 
 
+def get_median_filtered(coords: np.ndarray, kernel_size: int) -> np.ndarray:
+    """Apply a sliding window median, only full windows are used.
+
+    Args:
+        coords (np.ndarray): coordinates, dim = Nx3
+        kernel_size (int): window size
+
+    Returns:
+        np.ndarray: median of every window, dim = (N - kernel_size + 1)x3
+    """
+    if coords.shape[0] < kernel_size:
+        return np.empty((0, coords.shape[1]), dtype=coords.dtype)
+    windows = sliding_window_view(coords, kernel_size, axis=0)
+    return np.median(windows, axis=-1)
+
+
 def get_track_switches_hit(
     labels: np.ndarray,
     label_coords: np.ndarray,
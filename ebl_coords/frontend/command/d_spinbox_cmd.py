@@ -27,6 +27,7 @@ class SetFloatCmd(Command):
         super().__init__(content, context)
         self.content: float
         self.context: QDoubleSpinBox
+        self.coalesce_key = ("set_float", id(context))
 
     @override
     def run(self) -> None:
@@ -35,7 +36,7 @@ class SetFloatCmd(Command):
 
 
 class AddFloatCmd(Command):
-    """Add float value to double spinbox.
+    """Add float value to double spinbox, never coalesced.
 
     Args:
         Command (_type_): interface
@@ -27,6 +27,7 @@ class SetTextCmd(Command):
         super().__init__(content, context)
         self.content: str
         self.context: QLabel
+        self.coalesce_key = ("set_text", id(context))
 
     @override
     def run(self) -> None:
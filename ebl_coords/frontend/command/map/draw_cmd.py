@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from ebl_coords.backend.command.command import Command
+from ebl_coords.backend.command.command import Command, Priority
 from ebl_coords.decorators import override
 
 if TYPE_CHECKING:
@@ -17,14 +17,18 @@ class DrawCmd(Command):
         Command (_type_): interface
     """
 
+    priority = Priority.REALTIME
+
     def __init__(self, context: MapEditor) -> None:
         """Initialize this command.
 
         Args:
             context (MapEditor): map_editor
         """
-        super().__init__(None, context)
+        # in order with all commands drawing on the map
+        super().__init__(None, context, key=context.net_maker)
         self.context: MapEditor
+        self.coalesce_key = ("draw_map", id(context))
 
     @override
     def run(self) -> None:
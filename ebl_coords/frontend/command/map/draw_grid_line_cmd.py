@@ -24,7 +24,8 @@ class DrawGridLineCmd(Command):
             content (Tuple[int, int, int, int, bool]): (u, v, ut, vt, snap_first)
             context (NetMaker): netmaker
         """
-        super().__init__(content, context)
+        # in order with all commands drawing on the map
+        super().__init__(content, context, key=context)
         self.content: tuple[int, int, int, int, bool]
         self.context: NetMaker
 
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
-from ebl_coords.backend.command.command import Command
+from ebl_coords.backend.command.command import Command, Priority
 from ebl_coords.backend.constants import OCCUPIED_HEX
 from ebl_coords.decorators import override
 from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
@@ -21,6 +21,8 @@ class DrawOccupiedNetCmd(Command):
         Command (_type_): interface
     """
 
+    priority = Priority.REALTIME
+
     def __init__(self, content: dict[str, Any], context: MapEditor) -> None:
         """Initialize this command.
 
@@ -28,11 +30,14 @@ class DrawOccupiedNetCmd(Command):
             content (dict[str, Any]): _description_
             context (MapEditor): map editor
         """
-        super().__init__(content, context)
+        # in order with all commands drawing on the map
+        super().__init__(content, context, key=context.net_maker)
         self.content: dict[str, Any]
         self.context: MapEditor
         self.switches = self.context.zone.switches
         self.occupied_width: int = 13
+        # clears and draws the whole net, only the newest occupied edge is shown anyway
+        self.coalesce_key = ("draw_occupied", id(context))
 
     @override
     def run(self) -> None:
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from ebl_coords.backend.command.command import Command
+from ebl_coords.backend.command.command import Command, Priority
 from ebl_coords.backend.command.db_cmd import MapDrawOccupiedGuiCmd
 from ebl_coords.decorators import override
 
@@ -20,6 +20,8 @@ class RedrawCmd(Command):
         Command (_type_): interface
     """
 
+    priority = Priority.REALTIME
+
     def __init__(self, content: tuple[MapEditor, Queue[Command]], context: Queue[Command]) -> None:
         """Initialize this command.
 
@@ -27,7 +29,8 @@ class RedrawCmd(Command):
             content (Tuple[MapEditor, Queue[Command]]): (map_editor, gui_queue)
             context (Queue[Command]): worker_queue
         """
-        super().__init__(content, context)
+        # in order with all commands drawing on the map
+        super().__init__(content, context, key=content[0].net_maker)
         self.content: tuple[MapEditor, Queue[Command]]
         self.context: Queue[Command]
 
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING, Any
 
 from PyQt6.QtWidgets import QListWidgetItem
 
-from ebl_coords.backend.command.command import Command
+from ebl_coords.backend.command.command import Command, Priority
 from ebl_coords.decorators import override
 from ebl_coords.frontend.custom_widgets import CustomBtn
 
@@ -16,10 +16,14 @@ if TYPE_CHECKING:
 class AddCustomButtonToListCmd(Command):
     """Add CustomButton to a QList command.
 
+    All buttons of a refill have the same priority, they are added in the order of the list.
+
     Args:
         Command (_type_): interface
     """
 
+    priority = Priority.INTERACTIVE
+
     def __init__(self, content: dict[str, Any], context: QListWidget) -> None:
         """Create and add Custom Button to list widget.
 
@@ -27,6 +27,7 @@ class StatusBarCmd(Command):
         super().__init__(content, context)
         self.content: str
         self.context: Ui_MainWindow
+        self.coalesce_key = ("status_bar", id(context))
 
     @override
     def run(self) -> None:
@@ -5,9 +5,12 @@ import sys
 from typing import TYPE_CHECKING
 
 from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtWidgets import QApplication, QMainWindow
 
-from ebl_coords.backend.constants import CALLBACK_DT_MS
+from ebl_coords.backend.command.invoker import FrameInvoker
+from ebl_coords.backend.constants import CALLBACK_DT_MS, TRACE_FILE
+from ebl_coords.backend.tracing import Tracer
 from ebl_coords.frontend.main_gui import Ui_MainWindow
 from ebl_coords.frontend.map_editor import MapEditor
 from ebl_coords.frontend.strecken_editor import StreckenEditor
@@ -27,7 +30,6 @@ class Gui(QMainWindow):  # type: ignore
 
         self.gui_queue = ebl_coords.gui_queue
         self.worker_queue = ebl_coords.worker_queue
-        self.ecos_df = ebl_coords.ecos_df
         self.ebl_coords = ebl_coords
 
         self.ui = Ui_MainWindow()
@@ -39,7 +41,11 @@ class Gui(QMainWindow):  # type: ignore
 
         self.map_editor.register_observers()
 
+        self.trace_shortcut = QShortcut(QKeySequence("Ctrl+Shift+T"), self)
+        self.trace_shortcut.activated.connect(self.dump_trace)
+
         self.callback_timer: QTimer
+        self.frame_invoker = FrameInvoker(self.gui_queue)
 
         self.show()
 
@@ -50,10 +56,13 @@ class Gui(QMainWindow):  # type: ignore
         self.callback_timer.start(CALLBACK_DT_MS)
 
     def _invoke(self) -> None:
-        """Execute this function every DELTA_DT ms."""
-        while not self.gui_queue.empty():
-            cmd = self.gui_queue.get()
-            cmd.run()
+        """Execute this function every DELTA_DT ms, run gui commands within the frame budget."""
+        self.frame_invoker.run_frame()
+
+    def dump_trace(self) -> None:
+        """Dump the latency histograms to TRACE_FILE."""
+        Tracer().dump(TRACE_FILE)
+        self.ui.statusbar.showMessage(f"Latenzen gespeichert: {TRACE_FILE}")
 
     def run(self) -> None:
         """Start invoker and set exit app."""
@@ -258,7 +258,9 @@ class MapEditor(Editor):
         )
         self.worker_queue.put(
             WrapperCommand(
-                content=WrapperFunctionCommand(content=self.net_maker.show), context=self.gui_queue
+                content=WrapperFunctionCommand(content=self.net_maker.show, key=self.net_maker),
+                context=self.gui_queue,
+                key=self.net_maker,
             )
         )
 
@@ -6,6 +6,7 @@ from PyQt6.QtGui import QColor, QPen, QPixmap
 
 from ebl_coords.backend.constants import BACKGROUND_HEX, BLOCK_SIZE, GRID_HEX, GRID_LINE_WIDTH
 from ebl_coords.backend.constants import LINE_HEX, POINT_HEX, TEXT_HEX
+from ebl_coords.backend.tracing import Tracer
 from ebl_coords.frontend.custom_widgets import ClickableLabel
 
 
@@ -38,6 +39,7 @@ class NetMaker:
     def show(self) -> None:
         """Show all drawn stuff."""
         self.map.setPixmap(self.map_buffer)
+        Tracer().finish("show")
 
     def draw_point(self, x: int, y: int, color: QColor, width: int) -> None:
         """Draw a point.
@@ -1,6 +1,7 @@
 """Strecken Editor."""
 from __future__ import annotations
 
+from functools import partial
 from typing import TYPE_CHECKING
 
 from ebl_coords.backend.command.command import WrapperCommand, WrapperFunctionCommand
@@ -10,7 +11,8 @@ from ebl_coords.decorators import override
 from ebl_coords.frontend.custom_widgets import CustomBtn
 from ebl_coords.frontend.editor import Editor
 from ebl_coords.graph_db.data_elements.edge_relation_enum import EDGE_RELATION_TO_ENUM
-from ebl_coords.graph_db.data_elements.switch_item_enum import SwitchItem
+from ebl_coords.graph_db.query_generator import delete_edge
+from ebl_coords.graph_db.topology import TrackTopology
 
 if TYPE_CHECKING:
     from ebl_coords.frontend.gui import Gui
@@ -80,15 +82,13 @@ class StreckenEditor(Editor):
     def delete_strecke(self) -> None:
         """Delete selected directional edge in the database."""
         if self.selected_edge is not None:
-            weiche = SwitchItem.WEICHE.name
             guid, relation = self.selected_edge
-            relation = EDGE_RELATION_TO_ENUM[relation].name
-            cmd = f"""\
-                MATCH (a:{weiche})-[r:{relation}]->(b:{weiche})\
-                WHERE r.edge_id = '{guid}'\
-                DELETE r;\
-            """
-            self.worker_queue.put(DbCommand(cmd))
+            cmd = delete_edge(guid, EDGE_RELATION_TO_ENUM[relation])
             self.worker_queue.put(
-                WrapperCommand(content=WrapperFunctionCommand(self.reset), context=self.gui_queue)
+                DbCommand(cmd, key=guid, patch=partial(TrackTopology.remove_edge, edge_id=guid))
+            )
+            self.worker_queue.put(
+                WrapperCommand(
+                    content=WrapperFunctionCommand(self.reset), context=self.gui_queue, key=guid
+                )
             )
@@ -1,22 +1,23 @@
 """Weichen Editor."""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 
 import numpy as np
 
 from ebl_coords.backend.command.command import WrapperCommand, WrapperFunctionCommand
 from ebl_coords.backend.command.db_cmd import DbCommand, FillTsListGuiCommand, GetTsGuiCommand
 from ebl_coords.backend.command.ecos_cmd import UpdateEocsDfCommand
+from ebl_coords.backend.observable.gtcommand_subject import GtCommandSubject
 from ebl_coords.backend.observable.ts_measure_observer import AttachTsMeasureCommand
 from ebl_coords.decorators import override
 from ebl_coords.frontend.custom_widgets import CustomBtn
 from ebl_coords.frontend.editor import Editor
 from ebl_coords.graph_db.data_elements.bpk_enum import Bpk
-from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
 from ebl_coords.graph_db.data_elements.node_dc import Node
 from ebl_coords.graph_db.data_elements.switch_item_enum import SwitchItem
-from ebl_coords.graph_db.query_generator import double_node, generate_guid, update_double_nodes
+from ebl_coords.graph_db.query_generator import delete_double_nodes, double_node, generate_guid
+from ebl_coords.graph_db.query_generator import update_double_nodes
 
 if TYPE_CHECKING:
     from ebl_coords.frontend.gui import Gui
@@ -85,11 +86,22 @@ class WeichenEditor(Editor):
                 # modify existing double node
                 node.id = self.selected_ts
                 cmd = update_double_nodes(node)
-            self.worker_queue.put(DbCommand(cmd))
-            self.worker_queue.put(UpdateEocsDfCommand(self.gui.ebl_coords))
-            self.gui.map_editor.fill_list()
-            self.reset()
-            self.strecken_editor.reset()
+            # all writes of a trainswitch are keyed by its guid, e.g. by a measurement
+            self.worker_queue.put(DbCommand(cmd, key=node.id))
+            # run after the write, the rescrape is queued to the background lane only then
+            self.worker_queue.put(
+                WrapperFunctionCommand(GtCommandSubject().rebuild_ts_index, key=node.id)
+            )
+            self.worker_queue.put(
+                WrapperCommand(
+                    content=UpdateEocsDfCommand(self.gui.ebl_coords),
+                    context=self.worker_queue,
+                    key=node.id,
+                )
+            )
+            self._reset_after(
+                node.id, (self.gui.map_editor.fill_list, self.reset, self.strecken_editor.reset)
+            )
 
     def select_ts(self, custom_btn: CustomBtn) -> None:
         """Select a train switch.
@@ -105,25 +117,26 @@ class WeichenEditor(Editor):
     def delete_ts(self) -> None:
         """Delete selected trainswitch and all attached edges."""
         if self.selected_ts is not None:
-            double_vertex = EdgeRelation.DOUBLE_VERTEX.name
-            weiche = SwitchItem.WEICHE.name
-            db_call = f"""
-            MATCH(n1:{weiche}{{node_id:'{self.selected_ts}'}})-[:{double_vertex}]->(n2:{weiche}) DETACH DELETE n1, n2;
-            """
-            self.worker_queue.put(DbCommand(content=db_call))
+            guid = self.selected_ts
+            self.worker_queue.put(DbCommand(content=delete_double_nodes(guid), key=guid))
             self.worker_queue.put(
-                WrapperCommand(content=WrapperFunctionCommand(self.reset), context=self.gui_queue)
+                WrapperFunctionCommand(GtCommandSubject().rebuild_ts_index, key=guid)
             )
-            self.worker_queue.put(
-                WrapperCommand(
-                    content=WrapperFunctionCommand(self.gui.map_editor.reset),
-                    context=self.gui_queue,
-                )
+            self._reset_after(
+                guid, (self.reset, self.gui.map_editor.reset, self.strecken_editor.reset)
             )
+
+    def _reset_after(self, guid: str, resets: tuple[Callable[[], None], ...]) -> None:
+        """Reset the editors on the gui, once the pending writes of a trainswitch are done.
+
+        Args:
+            guid (str): guid of the trainswitch
+            resets (tuple[Callable[[], None], ...]): reset functions of the editors
+        """
+        for reset in resets:
             self.worker_queue.put(
                 WrapperCommand(
-                    content=WrapperFunctionCommand(self.strecken_editor.reset),
-                    context=self.gui_queue,
+                    content=WrapperFunctionCommand(reset), context=self.gui_queue, key=guid
                 )
             )
 
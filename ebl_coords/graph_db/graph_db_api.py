@@ -1,48 +1,121 @@
 """Module to interact with neo4j."""
 from os import environ
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, ManagedTransaction
 
 from ebl_coords.backend.constants import NEO4J_PASSWD, NEO4J_URI_CONTAINER, NEO4J_URI_LOCAL
 from ebl_coords.backend.constants import NEO4J_USR
 from ebl_coords.backend.singleton_meta import SingletonMeta
 from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
-from ebl_coords.graph_db.query_generator import drop_db
+from ebl_coords.graph_db.query_generator import LIST_EDGES, Query, drop_db
+from ebl_coords.graph_db.session_pool import SessionPool
+
+EDGE_LIST_COLUMNS = ["edge_id", "relation", "source_bhf", "source_name", "dest_bhf", "dest_name"]
+TRACK_RELATIONS = [
+    relation.name for relation in EdgeRelation if relation != EdgeRelation.DOUBLE_VERTEX
+]
+
+
+def format_edges(edges: pd.DataFrame) -> List[Tuple[str, str]]:
+    r"""Format edges, ordered by relation as in EdgeRelation, then by source bhf and name.
+
+    Args:
+        edges (pd.DataFrame): edges with EDGE_LIST_COLUMNS, relation is the EdgeRelation name
+
+    Returns:
+        List[Tuple[str, str]]: list of: (guid edge, edge string: bpk1_number1\trelation\tbpk2_number2)
+    """
+    relation = pd.Categorical(edges.relation, categories=TRACK_RELATIONS, ordered=True)
+    edges = edges.assign(relation=relation).dropna(subset=["relation"])
+    edges = edges.sort_values(["relation", "source_bhf", "source_name"], kind="stable")
+    values = edges.relation.astype(str).map({r.name: r.value for r in EdgeRelation})
+    text = (
+        edges.source_bhf.astype(str)
+        + "_"
+        + edges.source_name.astype(str)
+        + "\t"
+        + values
+        + "\t"
+        + edges.dest_bhf.astype(str)
+        + "_"
+        + edges.dest_name.astype(str)
+    )
+    return list(zip(edges.edge_id.tolist(), text.tolist()))
 
 
 class GraphDbApi(metaclass=SingletonMeta):
     """Class to interact with neo4j."""
 
     def __init__(self) -> None:
-        """Initialize the API."""
+        """Initialize the API, every query borrows a session of the pool."""
         neo4j_uri: str
         if "DEV_CONTAINER" in environ:
             neo4j_uri = NEO4J_URI_CONTAINER
         else:
             neo4j_uri = NEO4J_URI_LOCAL
-        self.session = GraphDatabase.driver(neo4j_uri, auth=(NEO4J_USR, NEO4J_PASSWD)).session()
+        self.driver = GraphDatabase.driver(neo4j_uri, auth=(NEO4J_USR, NEO4J_PASSWD))
+        self.pool = SessionPool(self.driver)
 
     def __del__(self) -> None:
-        """Closes the session."""
-        self.session.close()
+        """Closes all sessions and the driver."""
+        self.pool.close()
+        self.driver.close()
 
-    def run_query(self, query: str) -> pd.DataFrame:
+    def run_query(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
         """Run query on graph database.
 
         Args:
-            query (str): query to execute
+            query (str): query to execute, may reference parameters as $name
+            parameters (Optional[Dict[str, Any]], optional): values of the parameters.
+                Defaults to None.
 
         Returns:
             pd.DataFrame: resulting data as a dataframe. Can be empty.
         """
-        return self.session.run(query).to_df()
+        with self.pool.session() as session:
+            return session.run(query, parameters).to_df()
+
+    def run_transaction(
+        self,
+        queries: List[Query],
+        check: Optional[Callable[[List[List[Dict[str, Any]]]], None]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Run queries in a single write transaction, nothing is written if one fails.
+
+        Args:
+            queries (List[Query]): statements and parameters
+            check (Optional[Callable[[List[List[Dict[str, Any]]]], None]], optional): called
+                with the results before the commit, the transaction is rolled back if it
+                raises. Defaults to None.
+
+        Returns:
+            List[List[Dict[str, Any]]]: records of every query
+        """
+
+        def _run_all(tx: ManagedTransaction) -> List[List[Dict[str, Any]]]:
+            results = [tx.run(query, parameters).data() for query, parameters in queries]
+            if check is not None:
+                check(results)
+            return results
+
+        with self.pool.session() as session:
+            return session.execute_write(_run_all)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get the usage of the session pool, see SessionPool.stats.
+
+        Returns:
+            Dict[str, Any]: statistic name -> value
+        """
+        return self.pool.stats()
 
     # for delete make console interactive and ask if user is a dumbass
     def drop_db(self) -> None:
         """Deletes all data on DB."""
-        self.session.run(drop_db())
+        with self.pool.session() as session:
+            session.run(drop_db()).consume()
 
     def edges_tostring(self) -> List[Tuple[str, str]]:
         r"""Return all non-doublevertex edges in db as string.
@@ -50,15 +123,12 @@ class GraphDbApi(metaclass=SingletonMeta):
         Returns:
             List[Tuple[str, str]]: list of: (guid edge, edge string: bpk1_number1\trelation\tbpk2_number2)
         """
-        edges = []
-        for relation in EdgeRelation:
-            if relation == EdgeRelation.DOUBLE_VERTEX:
-                continue
-            cmd = f"MATCH (n1)-[r:{relation.name}]->(n2) RETURN n1.bhf, n1.name, n1.node_id, n2.bhf, n2.name, r.edge_id"
-            df = self.run_query(cmd)
-            df.sort_values(by=["n1.bhf", "n1.name"], inplace=True)
-            if df.size > 0:
-                for _, row in df.iterrows():
-                    edge = f"{row['n1.bhf']}_{row['n1.name']}\t{relation.value}\t{row['n2.bhf']}_{row['n2.name']}"
-                    edges.append((row["r.edge_id"], edge))
-        return edges
+        return format_edges(self.edges())
+
+    def edges(self) -> pd.DataFrame:
+        """Get all non-doublevertex edges in a single query.
+
+        Returns:
+            pd.DataFrame: edges with EDGE_LIST_COLUMNS, relation is the EdgeRelation name
+        """
+        return self.run_query(LIST_EDGES).reindex(columns=EDGE_LIST_COLUMNS)
@@ -0,0 +1,203 @@
+"""Import and export a whole layout of train switches and track sections, run with python -m.
+
+A layout file is JSON with two lists:
+
+    switches: guid, bhf, name, ecos_id, x, y, z of every double node. The guid has no
+        _0/_1 suffix, if missing it is derived from bhf and name.
+    sections: edge_id, source, dest, relation, target, distance of every directional
+        edge. source and dest are node_ids, relation and target EdgeRelation names.
+
+The import writes a few UNWIND batches in a single transaction. Nodes and edges are
+merged by their ids, importing the same file twice changes nothing. If the source or
+dest of a section is neither in the file nor in neo4j, nothing is written.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any
+
+import pandas as pd
+
+from ebl_coords.backend.constants import LAYOUT_BATCH_SIZE
+from ebl_coords.graph_db.data_elements.bpk_enum import Bpk
+from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
+from ebl_coords.graph_db.graph_db_api import GraphDbApi
+from ebl_coords.graph_db.query_generator import EXPORT_DOUBLE_NODES, EXPORT_EDGES, Query
+from ebl_coords.graph_db.query_generator import generate_guid, import_double_nodes, import_edges
+from ebl_coords.graph_db.topology import TopologyCache
+
+SWITCH_COLUMNS = ["guid", "bhf", "name", "ecos_id", "x", "y", "z"]
+SECTION_COLUMNS = ["edge_id", "source", "dest", "relation", "target", "distance"]
+TRACK_RELATIONS = {
+    relation.name: relation for relation in EdgeRelation if relation != EdgeRelation.DOUBLE_VERTEX
+}
+
+
+def _batches(rows: list[dict[str, Any]], batch_size: int) -> list[list[dict[str, Any]]]:
+    return [rows[i : i + batch_size] for i in range(0, len(rows), batch_size)]
+
+
+def _records(df: pd.DataFrame) -> list[dict[str, Any]]:
+    """Get the rows of a df, missing values are None."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _switch_rows(switches: pd.DataFrame) -> list[dict[str, Any]]:
+    missing = {"bhf", "name", "ecos_id"} - set(switches.columns)
+    if missing:
+        raise ValueError(f"switches without {sorted(missing)}")
+    switches = switches.reindex(columns=SWITCH_COLUMNS)
+    unknown = ~switches.bhf.isin(Bpk.__members__)
+    if unknown.any():
+        raise ValueError(f"unknown bhf {sorted(switches.bhf[unknown].unique())}")
+    if switches.name.isna().any():
+        raise ValueError("switches without name")
+    guids = switches.bhf + "_" + switches.name.astype(str)
+    guids = switches.guid.where(switches.guid.notna(), guids.map(generate_guid)).tolist()
+    coords = switches[["x", "y", "z"]].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+    props = pd.concat([switches[["bhf", "name", "ecos_id"]], coords], axis=1)
+    props[["bhf", "name"]] = props[["bhf", "name"]].astype(str)
+    props["ecos_id"] = props.ecos_id.map(str, na_action="ignore")
+    return [
+        {"guid": guid, "edge_id": generate_guid(f"{guid}_dv"), "props": prop}
+        for guid, prop in zip(guids, _records(props))
+    ]
+
+
+def _section_rows(sections: pd.DataFrame) -> dict[EdgeRelation, list[dict[str, Any]]]:
+    missing = set(SECTION_COLUMNS) - set(sections.columns)
+    if missing:
+        raise ValueError(f"sections without {sorted(missing)}")
+    sections = sections[SECTION_COLUMNS]
+    unknown = ~(sections.relation.isin(TRACK_RELATIONS) & sections.target.isin(TRACK_RELATIONS))
+    if unknown.any():
+        raise ValueError(f"sections {sections.edge_id[unknown].tolist()} with unknown relation")
+    sections = sections.assign(distance=pd.to_numeric(sections.distance, errors="coerce"))
+    return {
+        TRACK_RELATIONS[relation]: group.drop(columns="relation").to_dict("records")
+        for relation, group in sections.groupby("relation", sort=True)
+    }
+
+
+def layout_queries(layout: dict[str, Any], batch_size: int = LAYOUT_BATCH_SIZE) -> list[Query]:
+    """Get the batches to import a layout, all switches are written first.
+
+    Args:
+        layout (dict[str, Any]): content of a layout file
+        batch_size (int, optional): rows per batch. Defaults to LAYOUT_BATCH_SIZE.
+
+    Raises:
+        ValueError: a switch or section is incomplete or has an unknown bhf or relation.
+
+    Returns:
+        list[Query]: statements and parameters
+    """
+    switches = pd.DataFrame(layout.get("switches", []), dtype=object)
+    sections = pd.DataFrame(layout.get("sections", []))
+    queries = []
+    if len(switches):
+        queries += [
+            import_double_nodes(rows) for rows in _batches(_switch_rows(switches), batch_size)
+        ]
+    if len(sections):
+        for relation, section_rows in _section_rows(sections).items():
+            queries += [import_edges(relation, rows) for rows in _batches(section_rows, batch_size)]
+    return queries
+
+
+def unmatched_sections(queries: list[Query], results: list[list[dict[str, Any]]]) -> list[str]:
+    """Get the sections, which were not written, because their source or dest is missing.
+
+    Args:
+        queries (list[Query]): batches of layout_queries
+        results (list[list[dict[str, Any]]]): records of every batch
+
+    Returns:
+        list[str]: edge_ids of the unmatched sections
+    """
+    unmatched = []
+    for (_, parameters), records in zip(queries, results):
+        if records and "edge_ids" in records[0]:
+            written = set(records[0]["edge_ids"])
+            unmatched += [
+                row["edge_id"] for row in parameters["rows"] if row["edge_id"] not in written
+            ]
+    return unmatched
+
+
+def import_layout(file: str, batch_size: int = LAYOUT_BATCH_SIZE) -> list[Query]:
+    """Write a layout file to neo4j in a single transaction.
+
+    Args:
+        file (str): layout file
+        batch_size (int, optional): rows per batch. Defaults to LAYOUT_BATCH_SIZE.
+
+    Raises:
+        ValueError: a switch or section is incomplete or has an unknown bhf or relation,
+            or the source or dest of a section does not exist.
+
+    Returns:
+        list[Query]: written batches
+    """
+    with open(file, encoding="utf-8") as fd:
+        queries = layout_queries(json.load(fd), batch_size)
+
+    def _check(results: list[list[dict[str, Any]]]) -> None:
+        unmatched = unmatched_sections(queries, results)
+        if unmatched:
+            raise ValueError(f"sections {unmatched} without source or dest switch")
+
+    GraphDbApi().run_transaction(queries, check=_check)
+    TopologyCache().invalidate()
+    return queries
+
+
+def export_layout(file: str) -> dict[str, list[dict[str, Any]]]:
+    """Write all train switches and track sections of neo4j to a layout file.
+
+    Args:
+        file (str): layout file
+
+    Returns:
+        dict[str, list[dict[str, Any]]]: written layout
+    """
+    graph_db = GraphDbApi()
+    switches = graph_db.run_query(EXPORT_DOUBLE_NODES).reindex(
+        columns=["node_id", *SWITCH_COLUMNS[1:]]
+    )
+    switches.insert(0, "guid", switches.pop("node_id").str[:-2])
+    coords = switches[["x", "y", "z"]].apply(pd.to_numeric, errors="coerce")
+    switches[["x", "y", "z"]] = coords.astype(float)
+    sections = graph_db.run_query(EXPORT_EDGES).reindex(columns=SECTION_COLUMNS)
+    layout = {
+        "switches": _records(switches.sort_values(["bhf", "name"])),
+        "sections": _records(sections.sort_values("edge_id")),
+    }
+    with open(file, "w", encoding="utf-8") as fd:
+        json.dump(layout, fd, indent=1)
+    return layout
+
+
+def main() -> None:
+    """Import or export a layout file."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("file", help="layout file")
+    parser.add_argument("--batch-size", type=int, default=LAYOUT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.action == "import":
+        queries = import_layout(args.file, args.batch_size)
+        rows = sum(len(parameters["rows"]) for _, parameters in queries)
+        print(f"imported {rows} rows in {len(queries)} batches from {args.file}")
+    else:
+        layout = export_layout(args.file)
+        print(
+            f"exported {len(layout['switches'])} switches and "
+            f"{len(layout['sections'])} sections to {args.file}"
+        )
+
+
+if __name__ == "__main__":
+    main()
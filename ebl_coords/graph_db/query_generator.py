@@ -1,160 +1,316 @@
-"""Get query to generate double nodes and eges in neo4j."""
+"""Get parameterized queries to generate double nodes and eges in neo4j.
+
+Every query is a statement and its parameters. The statement text does not depend on
+ids or coordinates, neo4j plans it once and reuses the plan. Labels and relation types
+can not be parameters, they are taken from the enums and give one statement each.
+"""
 from __future__ import annotations
 
-from uuid import uuid4
+from typing import Any, Dict, Tuple
+from uuid import NAMESPACE_OID, uuid4, uuid5
+
+import numpy as np
 
 from ebl_coords.graph_db.data_elements.edge_dc import Edge
 from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
 from ebl_coords.graph_db.data_elements.node_dc import Node
 from ebl_coords.graph_db.data_elements.switch_item_enum import SwitchItem
 
+# statement and parameters
+Query = Tuple[str, Dict[str, Any]]
+
+WEICHE = SwitchItem.WEICHE.name
+DOUBLE_VERTEX = EdgeRelation.DOUBLE_VERTEX.name
+
+CREATE_NODE = "CREATE (n:{label} $props)"
+CREATE_DOUBLE_NODE = """
+CREATE (n1:{label} $props1)
+CREATE (n2:{label} $props2)
+CREATE (n1)-[:{relation} {{distance: 0, target: '{relation}', edge_id: $edge_id_0}}]->(n2)
+CREATE (n2)-[:{relation} {{distance: 0, target: '{relation}', edge_id: $edge_id_1}}]->(n1)
+"""
+CREATE_EDGE = """
+MATCH (source:{source_label} {{node_id: $source_id}})
+MATCH (dest:{dest_label} {{node_id: $dest_id}})
+CREATE (source)-[:{relation} {{distance: $distance, target: $target, edge_id: $edge_id}}]->(dest)
+"""
+CREATE_BIDIRECTIONAL_EDGE = """
+MATCH (source:{source_label} {{node_id: $source_id}})
+MATCH (dest:{dest_label} {{node_id: $dest_id}})
+CREATE (source)-[:{relation} {{distance: $distance, target: $target, edge_id: $edge_id_0}}]->(dest)
+CREATE (dest)-[:{relation} {{distance: $distance, target: $target, edge_id: $edge_id_1}}]->(source)
+"""
+GET_DOUBLE_NODES = f"""
+MATCH (n1:{WEICHE} {{node_id: $node_id}})-[:{DOUBLE_VERTEX}]->(n2:{WEICHE})
+RETURN n1.name, n1.bhf, n1.ecos_id, n1.x, n1.y, n1.z
+"""
+UPDATE_DOUBLE_NODES = f"""
+MATCH (n1:{WEICHE} {{node_id: $node_id}})-[:{DOUBLE_VERTEX}]->(n2:{WEICHE})
+SET n1.bhf = $bhf, n2.bhf = $bhf
+SET n1.name = $name, n2.name = $name
+SET n1.ecos_id = $ecos_id, n2.ecos_id = $ecos_id
+"""
+SET_DOUBLE_NODES_COORDS = f"""
+MATCH (n1:{WEICHE} {{node_id: $node_id}})-[:{DOUBLE_VERTEX}]->(n2:{WEICHE})
+SET n1.x = $x, n2.x = $x
+SET n1.y = $y, n2.y = $y
+SET n1.z = $z, n2.z = $z
+"""
+DELETE_DOUBLE_NODES = f"""
+MATCH (n1:{WEICHE} {{node_id: $node_id}})-[:{DOUBLE_VERTEX}]->(n2:{WEICHE})
+DETACH DELETE n1, n2
+"""
+IMPORT_DOUBLE_NODES = """
+UNWIND $rows AS row
+MERGE (n1:{label} {{node_id: row.guid + '_0'}})
+MERGE (n2:{label} {{node_id: row.guid + '_1'}})
+SET n1 += row.props, n2 += row.props
+MERGE (n1)-[dv1:{relation}]->(n2)
+ON CREATE SET dv1.distance = 0, dv1.target = '{relation}', dv1.edge_id = row.edge_id + '_0'
+MERGE (n2)-[dv2:{relation}]->(n1)
+ON CREATE SET dv2.distance = 0, dv2.target = '{relation}', dv2.edge_id = row.edge_id + '_1'
+"""
+IMPORT_EDGES = """
+UNWIND $rows AS row
+MATCH (source:{label} {{node_id: row.source}})
+MATCH (dest:{label} {{node_id: row.dest}})
+MERGE (source)-[r:{relation} {{edge_id: row.edge_id}}]->(dest)
+SET r.distance = row.distance, r.target = row.target
+RETURN collect(r.edge_id) AS edge_ids
+"""
+EXPORT_DOUBLE_NODES = f"""
+MATCH (n1:{WEICHE})-[:{DOUBLE_VERTEX}]->(:{WEICHE})
+WHERE n1.node_id ENDS WITH '_0'
+RETURN n1.node_id AS node_id, n1.bhf AS bhf, n1.name AS name, n1.ecos_id AS ecos_id,
+n1.x AS x, n1.y AS y, n1.z AS z
+"""
+EXPORT_EDGES = f"""
+MATCH (n1:{WEICHE})-[r]->(n2:{WEICHE})
+WHERE type(r) <> '{DOUBLE_VERTEX}'
+RETURN r.edge_id AS edge_id, n1.node_id AS source, n2.node_id AS dest,
+type(r) AS relation, r.target AS target, r.distance AS distance
+"""
+LIST_EDGES = f"""
+MATCH (n1)-[r]->(n2)
+WHERE type(r) <> '{DOUBLE_VERTEX}'
+RETURN r.edge_id AS edge_id, type(r) AS relation, n1.bhf AS source_bhf,
+n1.name AS source_name, n2.bhf AS dest_bhf, n2.name AS dest_name
+"""
+DELETE_EDGE = f"""
+MATCH (:{WEICHE})-[r:{{relation}}]->(:{WEICHE})
+WHERE r.edge_id = $edge_id
+DELETE r
+"""
+
+
+def generate_guid(seed: str | None = None) -> str:
+    """Generate a random guid.
+
+    Args:
+        seed (str | None, optional): derive the guid from a seed instead, the same seed
+            gives the same guid. Defaults to None.
+
+    Returns:
+        str: guid
+    """
+    uuid = uuid4() if seed is None else uuid5(NAMESPACE_OID, seed)
+    return "guid_" + str(uuid).partition("-")[0]
+
 
-def generate_guid() -> str:
-    """Generate a random guid."""
-    return "guid_" + str(uuid4()).partition("-")[0]
+def _node_props(node: Node) -> dict[str, Any]:
+    return {
+        "node_id": node.id,
+        "name": node.ts_number,
+        "ecos_id": node.ecos_id,
+        "bhf": node.bpk.name,
+        "x": float(node.coords[0]),
+        "y": float(node.coords[1]),
+        "z": float(node.coords[2]),
+    }
 
 
-def single_node(node: Node) -> str:
+def single_node(node: Node) -> Query:
     """Create query for single node.
 
     Args:
         node (Node): node
 
     Returns:
-        str: query call
+        Query: statement and parameters
     """
-    return f"""\
-        CREATE(\
-        {node.id}:{node.switch_item.name} \
-            {{\
-                node_id: '{node.id}', \
-                name: '{node.ts_number}', \
-                ecos_id: '{node.ecos_id}', \
-                bhf: '{node.bpk.name}', \
-                x: {node.coords[0]}, \
-                y: {node.coords[1]}, \
-                z: {node.coords[2]} \
-            }}\
-        )
-    """.replace(
-        " ", ""
-    )
+    return CREATE_NODE.format(label=node.switch_item.name), {"props": _node_props(node)}
 
 
-def double_node(template_node: Node) -> tuple[str, tuple[Node, Node]]:
+def double_node(template_node: Node) -> tuple[Query, tuple[Node, Node]]:
     """Create query for bidirectional double node.
 
     Args:
         template_node (Node): template for both nodes.
 
     Returns:
-        str: query call, new nodes
+        tuple[Query, tuple[Node, Node]]: query, new nodes
     """
     node1 = Node(**template_node.__dict__)
     node1.id = node1.id + "_0"
     node2 = Node(**template_node.__dict__)
     node2.id = node2.id + "_1"
-    edge = Edge(
-        id=generate_guid(),
-        source=node1,
-        dest=node2,
-        relation=EdgeRelation.DOUBLE_VERTEX,
-        distance=0,
+    edge_id = generate_guid()
+    parameters = {
+        "props1": _node_props(node1),
+        "props2": _node_props(node2),
+        "edge_id_0": f"{edge_id}_0",
+        "edge_id_1": f"{edge_id}_1",
+    }
+    statement = CREATE_DOUBLE_NODE.format(label=node1.switch_item.name, relation=DOUBLE_VERTEX)
+    return (statement, parameters), (node1, node2)
+
+
+def single_edge(edge: Edge) -> Query:
+    """Create query for directional edge.
+
+    Args:
+        edge (Edge): edge
+
+    Returns:
+        Query: statement and parameters
+    """
+    statement = CREATE_EDGE.format(
+        source_label=edge.source.switch_item.name,
+        dest_label=edge.dest.switch_item.name,
+        relation=edge.relation.name,
     )
+    parameters = {
+        "source_id": edge.source.id,
+        "dest_id": edge.dest.id,
+        "distance": edge.distance,
+        "target": edge.target.name,
+        "edge_id": edge.id,
+    }
+    return statement, parameters
 
-    node1_cmd = single_node(node1)
-    node2_cmd = single_node(node2)
-    edge_cmd = bidirectional_edge(edge)
 
-    with_statement = f"WITH {node1.id}, {node2.id}\n"
+def bidirectional_edge(template_edge: Edge) -> Query:
+    """Create query for bidirectional edge.
 
-    cmd = node1_cmd + node2_cmd + with_statement + edge_cmd
+    Args:
+        template_edge (Edge): template for both edges.
 
-    return cmd, (node1, node2)
+    Returns:
+        Query: statement and parameters
+    """
+    statement = CREATE_BIDIRECTIONAL_EDGE.format(
+        source_label=template_edge.source.switch_item.name,
+        dest_label=template_edge.dest.switch_item.name,
+        relation=template_edge.relation.name,
+    )
+    parameters = {
+        "source_id": template_edge.source.id,
+        "dest_id": template_edge.dest.id,
+        "distance": template_edge.distance,
+        "target": template_edge.relation.name,
+        "edge_id_0": f"{template_edge.id}_0",
+        "edge_id_1": f"{template_edge.id}_1",
+    }
+    return statement, parameters
+
+
+def get_double_nodes(guid: str) -> Query:
+    """Create query to get both nodes in a double vertex.
 
+    Args:
+        guid (str): node_id of one of the nodes.
 
-def single_edge(edge: Edge) -> str:
-    """Create query for directional edge.
+    Returns:
+        Query: statement and parameters
+    """
+    return GET_DOUBLE_NODES, {"node_id": guid}
+
+
+def update_double_nodes(node: Node) -> Query:
+    """Update a double node.
 
     Args:
-        edge (Edge): edge
+        node (Node): new node values, with one existing id.
 
     Returns:
-        str: query call
+        Query: statement and parameters
     """
-    cmd = f"""\
-        MATCH(source:{edge.source.switch_item.name}{{node_id: '{edge.source.id}'}})\
-        MATCH(dest:{edge.dest.switch_item.name}{{node_id: '{edge.dest.id}'}})\
-        CREATE(source)-[:{edge.relation.name}{{distance: {edge.distance}, target: '{edge.target.name}', edge_id: '{edge.id}'}}]->(dest);\
-    """.replace(
-        " ", ""
-    )
-    return cmd
+    parameters = {
+        "node_id": node.id,
+        "bhf": node.bpk.name,
+        "name": node.ts_number,
+        "ecos_id": node.ecos_id,
+    }
+    return UPDATE_DOUBLE_NODES, parameters
 
 
-def bidirectional_edge(template_edge: Edge) -> str:
-    """Create query for bidirectional edge.
+def set_double_nodes_coords(guid: str, coord: np.ndarray) -> Query:
+    """Set the coordinates of a double node.
 
     Args:
-        template_edge (Edge): template for both edges.
+        guid (str): node_id of one of the nodes.
+        coord (np.ndarray): x, y, z
 
     Returns:
-        str : query call
+        Query: statement and parameters
     """
-    edge_id = template_edge.id
-    source = template_edge.source
-    dest = template_edge.dest
-    distance = template_edge.distance
-    relation = template_edge.relation.name
-
-    cmd = f"""\
-        MATCH(source:{source.switch_item.name}{{node_id: '{source.id}'}})
-        MATCH(dest:{dest.switch_item.name}{{node_id: '{dest.id}'}})
-        CREATE(source)-[:{relation}{{distance: {distance}, target: '{relation}', edge_id: '{edge_id}_0'}}]->(dest)
-        CREATE(dest)-[:{relation}{{distance: {distance}, target: '{relation}', edge_id: '{edge_id}_1'}}]->(source)
-    """.replace(
-        " ", ""
-    )
-    return cmd
+    x, y, z = (float(c) for c in coord)
+    return SET_DOUBLE_NODES_COORDS, {"node_id": guid, "x": x, "y": y, "z": z}
 
 
-def get_double_nodes(guid: str) -> str:
-    """Create query to get both nodes in a double vertex.
+def delete_double_nodes(guid: str) -> Query:
+    """Delete a double node and all attached edges.
 
     Args:
         guid (str): node_id of one of the nodes.
 
     Returns:
-        str: query call
+        Query: statement and parameters
     """
-    double_vertex = EdgeRelation.DOUBLE_VERTEX.name
-    weiche = SwitchItem.WEICHE.name
-    vals = "n1.name, n1.bhf, n1.ecos_id, n1.x, n1.y, n1.z"
-    return f"""
-    MATCH(n1:{weiche}{{node_id:'{guid}'}})-[:{double_vertex}]->(n2:{weiche}) RETURN {vals};
+    return DELETE_DOUBLE_NODES, {"node_id": guid}
+
+
+def delete_edge(edge_id: str, relation: EdgeRelation) -> Query:
+    """Delete a directional edge.
+
+    Args:
+        edge_id (str): edge_id
+        relation (EdgeRelation): relation of the edge
+
+    Returns:
+        Query: statement and parameters
     """
+    return DELETE_EDGE.format(relation=relation.name), {"edge_id": edge_id}
 
 
-def update_double_nodes(node: Node) -> str:
-    """Update a double node.
+def import_double_nodes(rows: list[dict[str, Any]]) -> Query:
+    """Create or update a batch of double nodes.
 
     Args:
-        node (Node): new node values, with one existing id.
+        rows (list[dict[str, Any]]): guid without suffix, edge_id of the DOUBLE_VERTEX
+            edges without suffix and props, the node properties but node_id.
 
     Returns:
-        str: query call
+        Query: statement and parameters
     """
-    double_vertex = EdgeRelation.DOUBLE_VERTEX.name
-    weiche = SwitchItem.WEICHE.name
-    return f"""
-    MATCH(n1:{weiche}{{node_id:'{node.id}'}})-[:{double_vertex}]->(n2:{weiche})\
-    SET n1.bhf = '{node.bpk.name}'\
-    SET n2.bhf = '{node.bpk.name}'\
-    SET n1.name = '{node.ts_number}'\
-    SET n2.name = '{node.ts_number}'\
-    SET n1.ecos_id = '{node.ecos_id}'\
-    SET n2.ecos_id = '{node.ecos_id}';
+    statement = IMPORT_DOUBLE_NODES.format(label=WEICHE, relation=DOUBLE_VERTEX)
+    return statement, {"rows": rows}
+
+
+def import_edges(relation: EdgeRelation, rows: list[dict[str, Any]]) -> Query:
+    """Create or update a batch of directional edges with the same relation.
+
+    Returns the ids of the written edges as edge_ids, a row without source or dest node
+    is not written.
+
+    Args:
+        relation (EdgeRelation): relation of all edges
+        rows (list[dict[str, Any]]): edge_id, source, dest, target and distance
+
+    Returns:
+        Query: statement and parameters
     """
+    return IMPORT_EDGES.format(label=WEICHE, relation=relation.name), {"rows": rows}
 
 
 def drop_db() -> str:
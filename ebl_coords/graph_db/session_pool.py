@@ -0,0 +1,117 @@
+"""Pool of neo4j sessions, shared by all threads."""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from threading import BoundedSemaphore, Lock
+from typing import TYPE_CHECKING, Any, Iterator
+
+from ebl_coords.backend.constants import GRAPH_DB_POOL_SIZE
+
+if TYPE_CHECKING:
+    from neo4j import Driver, Session
+
+
+class SessionPool:
+    """Lend neo4j sessions to threads, a session is used by one thread at a time.
+
+    Sessions are not thread safe, the connections of the driver are. Up to max_size
+    sessions are opened on demand and kept idle between queries, further threads wait
+    for a session to be returned.
+    """
+
+    def __init__(self, driver: Driver, max_size: int = GRAPH_DB_POOL_SIZE) -> None:
+        """Initialize the pool, no session is opened yet.
+
+        Args:
+            driver (Driver): neo4j driver
+            max_size (int, optional): maximal number of sessions. Defaults to GRAPH_DB_POOL_SIZE.
+        """
+        self.driver = driver
+        self.max_size = max_size
+        self._lock = Lock()
+        self._slots = BoundedSemaphore(max_size)
+        self._idle: list[Session] = []
+        self._opened: int = 0
+        self._in_use: int = 0
+        self._peak_in_use: int = 0
+        self._acquired: int = 0
+        self._waited: int = 0
+        self._wait_s: float = 0.0
+        self._discarded: int = 0
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        """Lend a session, wait if all sessions are in use.
+
+        A session, which raised, is closed instead of returned to the pool.
+
+        Yields:
+            Iterator[Session]: session of this thread meanwhile
+        """
+        if not self._slots.acquire(blocking=False):
+            start = time.monotonic()
+            self._slots.acquire()
+            with self._lock:
+                self._waited += 1
+                self._wait_s += time.monotonic() - start
+        with self._lock:
+            session = self._idle.pop() if self._idle else None
+            self._acquired += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        try:
+            if session is None:
+                session = self.driver.session()
+                with self._lock:
+                    self._opened += 1
+            yield session
+        except BaseException:
+            if session is not None:
+                self._discard(session)
+            raise
+        else:
+            with self._lock:
+                self._idle.append(session)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def _discard(self, session: Session) -> None:
+        with self._lock:
+            self._opened -= 1
+            self._discarded += 1
+        try:
+            session.close()
+        except Exception:  # pylint: disable=W0718
+            pass
+
+    def close(self) -> None:
+        """Close all idle sessions."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+        for session in idle:
+            session.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Get the usage of the pool.
+
+        Returns:
+            dict[str, Any]: max_size, opened, idle and in_use sessions, peak_in_use,
+                acquired sessions in total, acquisitions which waited, their wait_s in
+                total and discarded sessions.
+        """
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "opened": self._opened,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "acquired": self._acquired,
+                "waited": self._waited,
+                "wait_s": self._wait_s,
+                "discarded": self._discarded,
+            }
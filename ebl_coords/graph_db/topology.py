@@ -0,0 +1,336 @@
+"""Process local model of the track graph, read by the tracking loop instead of neo4j."""
+from __future__ import annotations
+
+from threading import Lock, RLock
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from ebl_coords.backend.singleton_meta import SingletonMeta
+from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
+from ebl_coords.graph_db.data_elements.switch_item_enum import SwitchItem
+from ebl_coords.graph_db.graph_db_api import GraphDbApi
+
+NODE_COLUMNS = ["node_id", "x", "y", "z"]
+EDGE_COLUMNS = ["edge_id", "source", "dest", "relation", "target", "distance"]
+
+
+def load_topology() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Get all train switch nodes and all edges between them from neo4j.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: (nodes with NODE_COLUMNS, edges with EDGE_COLUMNS)
+    """
+    weiche = SwitchItem.WEICHE.name
+    graph_db = GraphDbApi()
+    nodes = graph_db.run_query(
+        f"MATCH (n:{weiche}) RETURN n.node_id AS node_id, n.x AS x, n.y AS y, n.z AS z"
+    )
+    edges = graph_db.run_query(
+        f"""
+        MATCH (n1:{weiche})-[r]->(n2:{weiche})
+        RETURN r.edge_id AS edge_id, n1.node_id AS source, n2.node_id AS dest,
+        type(r) AS relation, r.target AS target, r.distance AS distance
+        """
+    )
+    return nodes, edges
+
+
+class TrackTopology:
+    """Nodes, edges and the exits of every node in arrays and dicts.
+
+    Nodes and edges are rows of numpy arrays, dicts map node_id and edge_id to their
+    row and (node row, relation) to the row of the leaving edge. Every double node
+    knows its twin of the DOUBLE_VERTEX edge.
+    """
+
+    def __init__(self, nodes: pd.DataFrame, edges: pd.DataFrame) -> None:
+        """Build the arrays and indexes.
+
+        Args:
+            nodes (pd.DataFrame): nodes with NODE_COLUMNS, coordinates may be strings
+            edges (pd.DataFrame): edges with EDGE_COLUMNS, relation is the name of the
+                EdgeRelation, target as well or None.
+        """
+        self.lock = Lock()
+        nodes = nodes.reindex(columns=NODE_COLUMNS)
+        edges = edges.reindex(columns=EDGE_COLUMNS)
+        self.node_ids: np.ndarray = nodes.node_id.to_numpy(dtype=object)
+        self.coords: np.ndarray = (
+            nodes[["x", "y", "z"]].apply(pd.to_numeric, errors="coerce").to_numpy(np.float32)
+        )
+        self._node_rows: dict[str, int] = {
+            node_id: row for row, node_id in enumerate(self.node_ids)
+        }
+
+        known = edges.source.isin(self._node_rows) & edges.dest.isin(self._node_rows)
+        edges = edges.loc[known]
+        self.twins = np.full(self.node_ids.size, -1, dtype=np.intp)
+        double_vertex = edges.relation == EdgeRelation.DOUBLE_VERTEX.name
+        for source, dest in zip(edges.source[double_vertex], edges.dest[double_vertex]):
+            self.twins[self._node_rows[source]] = self._node_rows[dest]
+
+        edges = edges.loc[~double_vertex]
+        self.edge_ids: np.ndarray = edges.edge_id.to_numpy(dtype=object)
+        self.sources: np.ndarray = edges.source.map(self._node_rows).to_numpy(np.intp)
+        self.dests: np.ndarray = edges.dest.map(self._node_rows).to_numpy(np.intp)
+        self.relations: np.ndarray = edges.relation.to_numpy(dtype=object)
+        self.targets: np.ndarray = edges.target.to_numpy(dtype=object)
+        self.distances: np.ndarray = pd.to_numeric(edges.distance, errors="coerce").to_numpy(
+            np.float64
+        )
+        self._index_edges()
+
+    def _index_edges(self) -> None:
+        self._edge_rows: dict[str, int] = {
+            edge_id: row for row, edge_id in enumerate(self.edge_ids)
+        }
+        self._exits: dict[tuple[int, str], int] = {
+            (source, relation): row
+            for row, (source, relation) in enumerate(
+                zip(self.sources.tolist(), self.relations.tolist())
+            )
+        }
+
+    def next_edge(self, node_id: str, relation: str) -> str | None:
+        """Get the edge, which leaves the twin of a node through an exit.
+
+        Args:
+            node_id (str): node_id of the entered node
+            relation (str): name of the EdgeRelation of the exit
+
+        Returns:
+            str | None: edge_id, None if the node or the exit is unknown.
+        """
+        with self.lock:
+            row = self._node_rows.get(node_id)
+            if row is None or self.twins[row] < 0:
+                return None
+            edge_row = self._exits.get((int(self.twins[row]), relation))
+            return None if edge_row is None else self.edge_ids[edge_row]
+
+    def edge(self, edge_id: str) -> dict[str, Any] | None:
+        """Get an edge.
+
+        Args:
+            edge_id (str): edge_id
+
+        Returns:
+            dict[str, Any] | None: edge_id, ts_source, ts_dest, source_id, dest_id and
+                distance, None if the edge is unknown.
+        """
+        with self.lock:
+            row = self._edge_rows.get(edge_id)
+            if row is None:
+                return None
+            return {
+                "edge_id": edge_id,
+                "ts_source": self.relations[row],
+                "ts_dest": self.targets[row],
+                "source_id": self.node_ids[self.sources[row]],
+                "dest_id": self.node_ids[self.dests[row]],
+                "distance": float(self.distances[row]),
+            }
+
+    def dest_nodes(self, edge_id: str) -> tuple[np.ndarray, np.ndarray]:
+        """Get the node an edge leads to.
+
+        Args:
+            edge_id (str): edge_id
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (node_ids, coordinates), empty if the edge is unknown.
+        """
+        with self.lock:
+            row = self._edge_rows.get(edge_id)
+            rows = self.dests[row : row + 1] if row is not None else self.dests[:0]
+            return self.node_ids[rows], self.coords[rows]
+
+    def nodes(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get all nodes.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (node_ids, coordinates)
+        """
+        with self.lock:
+            return self.node_ids.copy(), self.coords.copy()
+
+    def switches(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get one node per double node, both are at the same coordinates.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (node_ids, coordinates)
+        """
+        with self.lock:
+            rows = np.arange(self.node_ids.size)
+            mask = (self.twins < 0) | (rows < self.twins)
+            return self.node_ids[mask], self.coords[mask]
+
+    def entered_node(self, node_id: str, heading: np.ndarray) -> str | None:
+        """Get the node of a double node, which is entered by a train with this heading.
+
+        Every edge into a node and every edge out of its twin is a direction of travel
+        through the node. The entered node has the direction closest to the heading.
+
+        Args:
+            node_id (str): node_id of one of the nodes
+            heading (np.ndarray): direction of travel, e.g. the velocity
+
+        Returns:
+            str | None: node_id, the node itself if it has no twin, None if the node is
+                unknown or no edge has valid coordinates.
+        """
+        with self.lock:
+            row = self._node_rows.get(node_id)
+            if row is None:
+                return None
+            if self.twins[row] < 0:
+                return node_id
+            best, best_score = None, -np.inf
+            for side in (row, int(self.twins[row])):
+                directions = np.concatenate(
+                    [
+                        self.coords[side] - self.coords[self.sources[self.dests == side]],
+                        self.coords[self.dests[self.sources == self.twins[side]]]
+                        - self.coords[side],
+                    ]
+                ).astype(np.float64)
+                norms = np.linalg.norm(directions, axis=1)
+                valid = norms > 0
+                if not valid.any():
+                    continue
+                score = (directions[valid] @ heading / norms[valid]).max()
+                if score > best_score:
+                    best, best_score = side, score
+            return None if best is None else self.node_ids[best]
+
+    def track_edges(self) -> list[tuple[str, str, str, str]]:
+        """Get all edges with a target exit.
+
+        Returns:
+            list[tuple[str, str, str, str]]: (source node_id, dest node_id, target, relation)
+        """
+        with self.lock:
+            mask = pd.notna(self.targets)
+            return list(
+                zip(
+                    self.node_ids[self.sources[mask]].tolist(),
+                    self.node_ids[self.dests[mask]].tolist(),
+                    self.targets[mask].tolist(),
+                    self.relations[mask].tolist(),
+                )
+            )
+
+    def set_coords(self, node_id: str, coord: np.ndarray) -> None:
+        """Set the coordinates of a double node.
+
+        Args:
+            node_id (str): node_id of one of the nodes
+            coord (np.ndarray): x, y, z
+        """
+        with self.lock:
+            row = self._node_rows.get(node_id)
+            if row is None:
+                return
+            self.coords[row] = coord
+            if self.twins[row] >= 0:
+                self.coords[self.twins[row]] = coord
+
+    def add_edge(
+        self,
+        edge_id: str,
+        source_id: str,
+        dest_id: str,
+        relation: str,
+        target: str,
+        distance: float,
+    ) -> None:
+        """Add a directional edge between two known nodes.
+
+        Args:
+            edge_id (str): edge_id
+            source_id (str): node_id of the source
+            dest_id (str): node_id of the destination
+            relation (str): name of the EdgeRelation of the source exit
+            target (str): name of the EdgeRelation of the destination exit
+            distance (float): length
+        """
+        with self.lock:
+            source = self._node_rows.get(source_id)
+            dest = self._node_rows.get(dest_id)
+            if source is None or dest is None:
+                return
+            self.edge_ids = np.append(self.edge_ids, np.array([edge_id], dtype=object))
+            self.sources = np.append(self.sources, source)
+            self.dests = np.append(self.dests, dest)
+            self.relations = np.append(self.relations, np.array([relation], dtype=object))
+            self.targets = np.append(self.targets, np.array([target], dtype=object))
+            self.distances = np.append(self.distances, float(distance))
+            self._index_edges()
+
+    def remove_edge(self, edge_id: str) -> None:
+        """Remove a directional edge.
+
+        Args:
+            edge_id (str): edge_id
+        """
+        with self.lock:
+            row = self._edge_rows.get(edge_id)
+            if row is None:
+                return
+            self.edge_ids = np.delete(self.edge_ids, row)
+            self.sources = np.delete(self.sources, row)
+            self.dests = np.delete(self.dests, row)
+            self.relations = np.delete(self.relations, row)
+            self.targets = np.delete(self.targets, row)
+            self.distances = np.delete(self.distances, row)
+            self._index_edges()
+
+
+class TopologyCache(metaclass=SingletonMeta):
+    """Load the track topology once, until a write to neo4j invalidates it.
+
+    Writes, which are cheap to replay, patch the loaded topology instead.
+    """
+
+    def __init__(
+        self, loader: Callable[[], tuple[pd.DataFrame, pd.DataFrame]] = load_topology
+    ) -> None:
+        """Initialize the cache, nothing is loaded yet.
+
+        Args:
+            loader (Callable[[], tuple[pd.DataFrame, pd.DataFrame]], optional): gets
+                (nodes, edges), see load_topology. Defaults to load_topology.
+        """
+        self.loader = loader
+        self.lock = RLock()
+        self.loads: int = 0
+        self._topology: TrackTopology | None = None
+
+    def get(self) -> TrackTopology:
+        """Get the topology, load it if necessary.
+
+        Returns:
+            TrackTopology: topology
+        """
+        with self.lock:
+            if self._topology is None:
+                self._topology = TrackTopology(*self.loader())
+                self.loads += 1
+            return self._topology
+
+    def invalidate(self) -> None:
+        """Drop the topology, the next access loads it again."""
+        with self.lock:
+            self._topology = None
+
+    def patch(self, foo: Callable[[TrackTopology], None]) -> None:
+        """Apply a write to the loaded topology, nothing to do if it is not loaded.
+
+        Args:
+            foo (Callable[[TrackTopology], None]): write, e.g. TrackTopology.remove_edge
+        """
+        with self.lock:
+            if self._topology is not None:
+                foo(self._topology)
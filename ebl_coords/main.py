@@ -6,9 +6,13 @@ from typing import TYPE_CHECKING
 
 import pandas as pd
 
+from ebl_coords.backend.command.ecos_cmd import UpdateEocsDfCommand
 from ebl_coords.backend.command.invoker import Invoker
-from ebl_coords.backend.constants import CALLBACK_DT_MS, CONFIG_JSON, ECOS_DF_LOCK, MOCK_FLG
-from ebl_coords.backend.ecos import get_ecos_df, get_ecos_df_live, get_ecos_df_mock, load_config
+from ebl_coords.backend.command.lane_queue import LaneQueue
+from ebl_coords.backend.constants import CONFIG_JSON
+from ebl_coords.backend.ecos import get_ecos_df, get_ecos_inventory, load_config
+from ebl_coords.backend.ecos_cache import EcosInventoryCache
+from ebl_coords.backend.ecos_state import EcosStateTable
 from ebl_coords.backend.observable.ecos_subject import EcosSubject
 from ebl_coords.frontend.gui import Gui
 from ebl_coords.graph_db.graph_db_api import GraphDbApi
@@ -24,21 +28,26 @@ class EblCoords:
         """Initialize and show the gui."""
         super().__init__()
 
-        self.worker_queue: Queue[Command] = Queue()
+        self.worker_queue: Queue[Command] = LaneQueue()
         self.invoker = Invoker()
-        self.invoker.start_loop(self.worker_queue, CALLBACK_DT_MS / 1000)
+        self.invoker.start_loop(self.worker_queue)
 
         self.bpks, self.ecos_config = load_config(config_file=CONFIG_JSON)
-        self.ecos_df: pd.DataFrame
 
-        if MOCK_FLG:
-            ecos_ids = get_ecos_df_mock(self.ecos_config, self.bpks)["id"]
-        else:
-            ecos_ids = get_ecos_df_live(self.ecos_config)["id"]
-        self.ecos = EcosSubject(ecos_config=self.ecos_config, ecos_ids=ecos_ids)
+        # start from the cached inventory, validate it in the background
+        self.ecos_cache = EcosInventoryCache(self.ecos_config)
+        inventory = self.ecos_cache.load()
+        cached = inventory is not None
+        if inventory is None:
+            inventory = get_ecos_inventory(self.ecos_config)
+            self.ecos_cache.save(inventory)
+        self.ecos = EcosSubject(ecos_config=self.ecos_config, ecos_ids=inventory["id"])
         self.ecos.start_record()
 
-        self.update_ecos_df()
+        df = get_ecos_df(config=self.ecos_config, bpks=self.bpks, inventory=inventory)
+        self.ecos_state = EcosStateTable(df)
+        if cached:
+            self.worker_queue.put(UpdateEocsDfCommand(self))
 
         self.graphdb = GraphDbApi()
 
@@ -47,10 +56,21 @@ class EblCoords:
         self.gui.run()
 
     def update_ecos_df(self) -> None:
-        """Crawl all ecos sockets, rebuild ecos_df."""
-        df = get_ecos_df(config=self.ecos_config, bpks=self.bpks)
-        with ECOS_DF_LOCK:
-            self.ecos_df = df
+        """Merge a refreshed ecos df into ecos_state, crawl sockets only if the cache is stale.
+
+        The table is updated in place, state updates during the refresh are kept. The ecos
+        subject subscribes to accessories, which were not in the cached inventory.
+        """
+        since = self.ecos_state.version
+        inventory = self.ecos_cache.refresh()
+        self.ecos.subscribe(inventory["id"])
+        df = get_ecos_df(config=self.ecos_config, bpks=self.bpks, inventory=inventory)
+        self.ecos_state.merge(df, since)
+
+    @property
+    def ecos_df(self) -> pd.DataFrame:
+        """Export the ecos df with the current states, see EcosStateTable."""
+        return self.ecos_state.to_df()
 
 
 def main() -> None:
@@ -0,0 +1,148 @@
+"""Test the streaming coordinate filters."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from ebl_coords.backend.coord_filter import KalmanCoordFilter, MedianBatchFilter, MedianCoordFilter
+from ebl_coords.backend.coord_filter import filter_recording
+from ebl_coords.backend.transform_data import get_tolerance_mask
+
+
+def _reference_kernel(
+    coords: np.ndarray, kernel_size: int, threshold: int
+) -> list[np.ndarray | None]:
+    """Former GtCommandSubject._filter_coord with np.roll and np.median."""
+    noise_buffer = np.full((3, 3), dtype=np.float32, fill_value=np.nan)
+    median_buffer = np.full((kernel_size, 3), dtype=np.float32, fill_value=np.nan)
+    results: list[np.ndarray | None] = []
+    for coord in coords:
+        med_coord = None
+        noise_buffer[-1] = coord
+        if get_tolerance_mask(noise_buffer, threshold)[0]:
+            median_buffer[-1] = noise_buffer[1]
+            if not np.isnan(median_buffer).any():
+                med_coord = np.median(median_buffer, axis=0)
+            median_buffer = np.roll(median_buffer, shift=median_buffer.size - 3)
+        noise_buffer = np.roll(noise_buffer, shift=noise_buffer.size - 3)
+        results.append(med_coord)
+    return results
+
+
+def _random_walk(n: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    coords = np.cumsum(rng.integers(-15, 16, size=(n, 3)), axis=0)
+    outliers = rng.random(n) < 0.05
+    coords[outliers] += rng.integers(100, 500, size=(outliers.sum(), 3))
+    return coords.astype(np.int32)
+
+
+@pytest.mark.timeout(5)  # type: ignore
+@pytest.mark.parametrize("kernel_size", [1, 4, 11])  # type: ignore
+def test_streaming_filter_matches_reference(kernel_size: int) -> None:
+    """Noise and median filter give identical outputs as the former kernel."""
+    coords = _random_walk(1000)
+    coord_filter = MedianCoordFilter(kernel_size, 30)
+    for coord, expected in zip(coords, _reference_kernel(coords, kernel_size, 30)):
+        result = coord_filter.push(0, coord)
+        if expected is None:
+            assert result is None
+        else:
+            assert result is not None
+            position, velocity = result
+            assert velocity is None
+            assert position.dtype == expected.dtype
+            np.testing.assert_array_equal(position, expected)
+
+
+@pytest.mark.timeout(5)  # type: ignore
+@pytest.mark.parametrize("kernel_size", [4, 11])  # type: ignore
+def test_tags_are_filtered_independently(kernel_size: int) -> None:
+    """Interleaved tags in one step give the same output as filtering each tag alone."""
+    n_tags = 24
+    coords = np.stack([_random_walk(200) + 1000 * tag for tag in range(n_tags)], axis=1)
+    coord_filter = MedianCoordFilter(kernel_size, 30, capacity=8)
+    coord_filter.resize(n_tags)
+    slots = np.arange(n_tags)
+    results: list[list[np.ndarray]] = [[] for _ in range(n_tags)]
+    for i in range(coords.shape[0]):
+        released, positions, _ = coord_filter.step(slots, np.full(n_tags, i), coords[i])
+        for slot, position in zip(slots[released], positions):
+            results[slot].append(position)
+    for tag in range(n_tags):
+        expected = _reference_kernel(coords[:, tag], kernel_size, 30)
+        expected = [result for result in expected if result is not None]
+        np.testing.assert_array_equal(results[tag], expected)
+
+
+@pytest.mark.timeout(5)  # type: ignore
+@pytest.mark.parametrize("kernel_size", [4, 11])  # type: ignore
+def test_small_and_large_steps_share_state(kernel_size: int) -> None:
+    """Steps with few tags, filtered in python, and with many tags alternate per tag."""
+    n_tags = 12
+    coords = np.stack([_random_walk(300) + 1000 * tag for tag in range(n_tags)], axis=1)
+    coord_filter = MedianCoordFilter(kernel_size, 30, capacity=n_tags)
+    rng = np.random.default_rng(1)
+    consumed = np.zeros(n_tags, dtype=int)
+    results: list[list[np.ndarray]] = [[] for _ in range(n_tags)]
+    while consumed.min() < 200:
+        size = n_tags if rng.random() < 0.5 else int(rng.integers(1, 4))
+        slots = np.sort(rng.choice(n_tags, size=size, replace=False))
+        step_coords = coords[consumed[slots], slots]
+        consumed[slots] += 1
+        released, positions, _ = coord_filter.step(slots, consumed[slots], step_coords)
+        for slot, position in zip(slots[released], positions):
+            results[slot].append(position)
+    for tag in range(n_tags):
+        expected = _reference_kernel(coords[: consumed[tag], tag], kernel_size, 30)
+        expected = [result for result in expected if result is not None]
+        np.testing.assert_array_equal(results[tag], expected)
+
+
+@pytest.mark.timeout(5)  # type: ignore
+@pytest.mark.parametrize("kernel_size", [1, 4, 11])  # type: ignore
+def test_batch_filter_matches_reference(kernel_size: int) -> None:
+    """The block wise filter releases the same coordinates at the same samples."""
+    coords = _random_walk(1000)
+    expected = _reference_kernel(coords, kernel_size, 30)
+    expected_idx = [i for i, result in enumerate(expected) if result is not None]
+
+    batch_filter = MedianBatchFilter(kernel_size, 30)
+    indices, results = [], []
+    for start in range(0, coords.shape[0], 37):
+        released, filtered = batch_filter.filter(coords[start : start + 37])
+        indices.extend((released + start).tolist())
+        results.append(filtered)
+    assert indices == expected_idx
+    np.testing.assert_array_equal(np.concatenate(results), [expected[i] for i in expected_idx])
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_filter_recording() -> None:
+    """Filter a recorded stream in small blocks."""
+    samples = filter_recording("./tests/test_data/gtcommand_test_stream", block_size=1000)
+    assert samples.size > 0
+    assert np.all(np.diff(samples["timestamp"]) > 0)
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_kalman_tracks_constant_velocity() -> None:
+    """The kalman filter estimates the velocity and rejects an outlier."""
+    kalman = KalmanCoordFilter(process_noise=1e-5, measurement_noise=100, predict_ms=20)
+    rng = np.random.default_rng(1)
+    velocity = np.array([0.5, -0.25, 0])  # mm/ms
+    result = None
+    for i in range(300):
+        timestamp = i * 10
+        coord = velocity * timestamp + rng.normal(0, 10, 3)
+        if i == 200:
+            coord += 500
+            assert kalman.push(timestamp, coord) is None
+            continue
+        result = kalman.push(timestamp, coord)
+    assert result is not None
+    position, estimated = result
+    assert estimated is not None
+    np.testing.assert_allclose(estimated, velocity, atol=0.06)
+    # predicted 20 ms ahead of the last timestamp
+    np.testing.assert_allclose(position, velocity * (2990 + 20), atol=15)
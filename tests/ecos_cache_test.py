@@ -0,0 +1,52 @@
+"""Test the ECoS inventory cache."""
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+
+from ebl_coords.backend import ecos_cache
+from ebl_coords.backend.ecos_cache import EcosInventoryCache
+
+CONFIG: Dict[str, Any] = {"port": 15471, "bpk_ip": {"A": "10.0.0.1", "B": "10.0.0.2"}}
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_cache_is_validated_by_object_ids(tmp_path: Any, monkeypatch: Any) -> None:
+    """A cached inventory is only scraped again if an ECoS reports other ids.
+
+    Else only the states are updated.
+    """
+    inventory = pd.DataFrame(
+        {"id": ["20000", "20001"], "name1": ['"A"', '"A"'], "ip": ["10.0.0.2"] * 2}
+    )
+    scraped = inventory.iloc[:1]
+    ids = {"10.0.0.2": ["20000", "20001"]}
+    monkeypatch.setattr(ecos_cache, "get_ecos_ids", lambda config: ids)
+    monkeypatch.setattr(ecos_cache, "get_ecos_inventory", lambda config: scraped)
+    monkeypatch.setattr(ecos_cache, "get_ecos_states", lambda config, df: df.id.str[-1])
+
+    cache = EcosInventoryCache(CONFIG, file=str(tmp_path / "ecos_cache.json"))
+    assert cache.load() is None
+    cache.save(inventory)
+    cache = EcosInventoryCache(CONFIG, file=cache.file)
+    pd.testing.assert_frame_equal(cache.load(), inventory)
+    assert cache.refresh().state.tolist() == ["0", "1"]
+
+    # same count, but an accessory was replaced
+    ids["10.0.0.2"] = ["20000", "20002"]
+    assert cache.refresh() is scraped
+    pd.testing.assert_frame_equal(EcosInventoryCache(CONFIG, file=cache.file).load(), scraped)
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_unreachable_ecos_keeps_cache(tmp_path: Any, monkeypatch: Any) -> None:
+    """The cached inventory is kept if the ECoS can not be counted."""
+
+    def _unreachable(config: Dict[str, Any]) -> Dict[str, List[str]]:
+        raise ConnectionRefusedError("offline")
+
+    monkeypatch.setattr(ecos_cache, "get_ecos_ids", _unreachable)
+    cache = EcosInventoryCache(CONFIG, file=str(tmp_path / "ecos_cache.json"))
+    cache.save(pd.DataFrame({"id": ["20000"], "ip": ["10.0.0.2"]}))
+    with pytest.warns(UserWarning, match="not reachable"):
+        assert not cache.is_stale()
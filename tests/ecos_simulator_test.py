@@ -0,0 +1,74 @@
+"""Test the ECoS simulator."""
+import socket
+import time
+
+import pandas as pd
+import pytest
+
+from ebl_coords.backend.constants import ECOS_MOCK_FILE, ECOS_REPLY_END
+from ebl_coords.backend.ecos import _query_states, count_ecos_objects, get_ecos_df_live
+from ebl_coords.backend.ecos_simulator import EcosSimulator
+from ebl_coords.backend.framing import RecordFramer
+from ebl_coords.backend.observable.ecos_subject import EVENT_PATTERN
+
+
+@pytest.mark.timeout(2)  # type: ignore
+def test_scrape_simulator() -> None:
+    """The scraper gets every accessory of the mock file from the simulator."""
+    simulator = EcosSimulator(port=0, rate_hz=0)
+    host, port = simulator.start()
+    config = {"port": port, "bpk_ip": {"LOK": "10.0.0.1", "DAB": host}}
+    try:
+        assert count_ecos_objects(config) == {host: len(simulator.ids)}
+        df = get_ecos_df_live(config)
+    finally:
+        simulator.stop()
+    mock = pd.read_csv(ECOS_MOCK_FILE, dtype=str, keep_default_na=False).drop_duplicates("id")
+    pd.testing.assert_frame_equal(df.drop(columns="ip")[mock.columns], mock.reset_index(drop=True))
+
+
+@pytest.mark.timeout(2)  # type: ignore
+def test_states_with_unknown_objects() -> None:
+    """Error replies give no state and do not shift the states of the other accessories."""
+    simulator = EcosSimulator(port=0, rate_hz=0)
+    host, port = simulator.start()
+    known = simulator.ids[:3]
+    try:
+        states = _query_states(host, port, [known[0], "99998", *known[1:], "99999"])
+    finally:
+        simulator.stop()
+    expected = [simulator.objects[ecos_id]["state"] for ecos_id in known]
+    assert states == [expected[0], None, *expected[1:], None]
+
+
+@pytest.mark.timeout(3)  # type: ignore
+def test_simulator_events() -> None:
+    """Requested views receive the emitted state events, which are rate limited."""
+    simulator = EcosSimulator(port=0, rate_hz=500, jitter=0.5, seed=0)
+    framer = RecordFramer(delimiter=ECOS_REPLY_END)
+    events = []
+    with socket.create_connection(simulator.start()) as skt:
+        skt.sendall("".join(f"request({i}, view)\n" for i in simulator.ids).encode())
+        while len(events) < 100:
+            framer.recv_into(skt)
+            for record in framer.records():
+                match = EVENT_PATTERN.search(record)
+                if match:
+                    events.append(match.groups())
+    simulator.stop()
+    # all views were requested before the first event was received
+    assert simulator.events_emitted >= len(events)
+    ecos_id, state = events[-1]
+    assert simulator.objects[ecos_id.decode()]["state"] in ("0", "1")
+    assert state in (b"0", b"1")
+
+
+@pytest.mark.timeout(3)  # type: ignore
+def test_simulator_rate() -> None:
+    """Events are emitted at the configured rate, not as fast as possible."""
+    simulator = EcosSimulator(port=0, rate_hz=50, seed=0)
+    simulator.start()
+    time.sleep(0.2)
+    simulator.stop()
+    # about 10 events, far less than without a rate limit
+    assert 1 <= simulator.events_emitted <= 100
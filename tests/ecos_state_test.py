@@ -0,0 +1,59 @@
+"""Test the ECoS state table."""
+import pandas as pd
+import pytest
+
+from ebl_coords.backend.ecos_state import EcosStateTable
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_state_updates_by_ip_and_id() -> None:
+    """Updates are looked up by (ip, id), states by guid, the export has the new states."""
+    ecos_df = pd.DataFrame(
+        {
+            "id": [20000, 20000, 20001],
+            "ip": ["10.0.0.1", "10.0.0.2", "10.0.0.2"],
+            "state": ["0", "0", "1"],
+            "guid": ["a0", "b0", "c0"],
+        },
+        index=[4, 7, 9],
+    )
+    table = EcosStateTable(ecos_df)
+    assert len(table) == 3
+    assert table.set_state("10.0.0.2", 20000, 1)
+    assert not table.set_state("10.0.0.3", 20000, 1)
+    assert [table.state(guid) for guid in ("a0", "b0", "c0")] == [0, 1, 1]
+    with pytest.raises(KeyError):
+        table.state("d0")
+
+    df = table.to_df()
+    assert df.state.tolist() == [0, 1, 1]
+    assert df.guid.tolist() == ["a0", "b0", "c0"]
+    assert ecos_df.state.tolist() == ["0", "0", "1"]
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_merge_keeps_updates_during_refresh() -> None:
+    """A refresh is merged in place, states updated after its version are kept."""
+    table = EcosStateTable(
+        pd.DataFrame(
+            {"id": [20000, 20001], "ip": ["10.0.0.1"] * 2, "state": [0, 0], "guid": ["a0", "b0"]}
+        )
+    )
+    assert table.set_state("10.0.0.1", 20000, 1)
+    since = table.version
+    assert table.set_state("10.0.0.1", 20001, 1)
+
+    refreshed = pd.DataFrame(
+        {
+            "id": [20000, 20001, 20002],
+            "ip": ["10.0.0.1"] * 3,
+            "state": [0, 0, 1],
+            "guid": ["a0", "b0", "c0"],
+        }
+    )
+    table.merge(refreshed, since)
+    assert len(table) == 3
+    # a0 was updated before the refresh, b0 meanwhile
+    assert [table.state(guid) for guid in ("a0", "b0", "c0")] == [0, 1, 1]
+    assert table.set_state("10.0.0.1", 20002, 0)
+    assert table.state("c0") == 0
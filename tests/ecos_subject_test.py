@@ -0,0 +1,144 @@
+"""Test the ECoS subscriptions."""
+import socket
+import threading
+import time
+import warnings
+from typing import Any, List
+
+import pandas as pd
+import pytest
+
+from ebl_coords.backend.observable.ecos_subject import EcosSubject
+from ebl_coords.backend.observable.observer import Observer
+from ebl_coords.backend.singleton_meta import SingletonMeta
+
+
+class _Observer(Observer):
+    def __init__(self) -> None:
+        self.results: List[Any] = []
+
+    def update(self) -> None:
+        self.results.append(self.result)
+
+
+@pytest.mark.timeout(3)  # type: ignore
+def test_resubscribe_after_connection_drop() -> None:
+    """A dropped connection is reconnected and resubscribed on the same thread."""
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    subscriptions: List[bytes] = []
+
+    def _ecos() -> None:
+        for state in (0, 1):
+            skt, _ = server.accept()
+            with skt:
+                buffer = b""
+                while buffer.count(b"\n") < 2:
+                    buffer += skt.recv(1024)
+                subscriptions.append(buffer)
+                reply = b"<REPLY request(20000, view)>\r\n<END 0 (OK)>\r\n"
+                event = f"<EVENT 20000>\r\n20000 state[{state}]\r\n<END 0 (OK)>\r\n".encode()
+                # split an event over two sends
+                skt.sendall(reply + event[:9])
+                time.sleep(0.01)
+                skt.sendall(event[9:])
+                time.sleep(0.05)
+
+    ecos = threading.Thread(target=_ecos, daemon=True)
+    ecos.start()
+    config = {"port": port, "bpk_ip": {"A": "127.0.0.1", "B": "127.0.0.1"}}
+    subject = EcosSubject(config, pd.Series([20000, 20001]), reconnect_s=0.05)
+    observer = _Observer()
+    subject.attach(observer)
+    threads = threading.active_count()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        subject.start_record()
+        assert threading.active_count() == threads + 1
+        ecos.join()
+        while len(observer.results) < 2:
+            time.sleep(0.01)
+        subject.stop_record()
+    server.close()
+
+    assert subject.stations[0].reconnects >= 1
+    assert subscriptions == [b"request(20000, view)\nrequest(20001, view)\n"] * 2
+    assert observer.results == [
+        {"id": 20000, "ip": "127.0.0.1", "state": 0},
+        {"id": 20000, "ip": "127.0.0.1", "state": 1},
+    ]
+
+
+@pytest.mark.timeout(3)  # type: ignore
+def test_subscribe_new_ids_on_open_connection(monkeypatch: Any) -> None:
+    """Ids added by a rescrape are requested on the open connection, once."""
+    # a fresh subject, not the singleton of an earlier test
+    monkeypatch.delitem(SingletonMeta._instances, EcosSubject, raising=False)
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    received = [b""]
+    connected = threading.Event()
+
+    def _ecos() -> None:
+        skt, _ = server.accept()
+        with skt:
+            connected.set()
+            while received[0].count(b"\n") < 2:
+                received[0] += skt.recv(1024)
+
+    ecos = threading.Thread(target=_ecos, daemon=True)
+    ecos.start()
+    config = {"port": port, "bpk_ip": {"A": "127.0.0.1", "B": "127.0.0.1"}}
+    subject = EcosSubject(config, pd.Series(["20000"]))
+    subject.start_record()
+    assert connected.wait(1)
+    subject.subscribe(pd.Series(["20000", "20001"]))
+    ecos.join()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        subject.stop_record()
+    server.close()
+
+    assert received[0] == b"request(20000, view)\nrequest(20001, view)\n"
+    assert subject.ecos_ids.tolist() == ["20000", "20001"]
+
+
+class _FailingObserver(Observer):
+    def update(self) -> None:
+        raise ValueError("observer bug")
+
+
+@pytest.mark.timeout(3)  # type: ignore
+def test_failing_observer_does_not_stop_record(monkeypatch: Any) -> None:
+    """An observer raising is warned about, the other observers get every event."""
+    monkeypatch.delitem(SingletonMeta._instances, EcosSubject, raising=False)
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+
+    def _ecos() -> None:
+        skt, _ = server.accept()
+        with skt:
+            for state in (0, 1):
+                skt.sendall(f"<EVENT 20000>\r\n20000 state[{state}]\r\n<END 0 (OK)>\r\n".encode())
+                time.sleep(0.01)
+            time.sleep(0.1)
+
+    ecos = threading.Thread(target=_ecos, daemon=True)
+    ecos.start()
+    config = {"port": port, "bpk_ip": {"A": "127.0.0.1", "B": "127.0.0.1"}}
+    subject = EcosSubject(config, pd.Series([20000]))
+    observer = _Observer()
+    subject.attach(_FailingObserver())
+    subject.attach(observer)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        subject.start_record()
+        while len(observer.results) < 2:
+            time.sleep(0.01)
+        assert subject.thread.is_alive()
+        subject.stop_record()
+    ecos.join()
+    server.close()
+
+    assert [result["state"] for result in observer.results] == [0, 1]
+    assert sum("observer bug" in str(warning.message) for warning in caught) == 2
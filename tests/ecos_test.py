@@ -0,0 +1,59 @@
+"""Test the ECoS scraper."""
+import socket
+import warnings
+
+import pandas as pd
+import pytest
+
+from ebl_coords.backend.constants import ECOS_LINE_END
+from ebl_coords.backend.ecos import _join_guid, _replies
+from ebl_coords.backend.framing import RecordFramer
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_replies_split_over_chunks() -> None:
+    """Pipelined replies are parsed while arriving, also if larger than a recv."""
+    features = [f"20000 name{i}[{i}]" for i in range(2000)]
+    stream = (
+        "<REPLY get(20000)>\r\n" + "\r\n".join(features) + "\r\n<END 0 (OK)>\r\n"
+        "<REPLY get(20001)>\r\n20001 state[1]\r\n<END 0 (OK)>\r\n"
+    ).encode()
+    ecos, client = socket.socketpair()
+    with ecos, client:
+        replies = _replies(client, RecordFramer(delimiter=ECOS_LINE_END), 2)
+        ecos.sendall(stream[:1000])
+        ecos.sendall(stream[1000:])
+        assert next(replies) == features
+        assert next(replies) == ["20001 state[1]"]
+        with pytest.raises(StopIteration):
+            next(replies)
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_join_guid_reports_unmatched_and_duplicates() -> None:
+    """Accessories are joined with the neutral node on bpk and dcc address."""
+    df = pd.DataFrame(
+        {
+            "id": ["20000", "20001", "20002", "20003"],
+            "ip": ["10.0.0.1"] * 4,
+            "name1": ['"DAB"', '"DAB"', '"DAB"', '"MA"'],
+            "addr": ["5", "17", "17", "5"],
+        },
+        index=[3, 1, 2, 0],
+    )
+    nodes = pd.DataFrame(
+        {
+            "node_id": ["a_0", "a_1", "b_0", "b_1", "c_0", "c_1", "d_0", "d_1"],
+            "dcc": ["5", "5", "5", "5", "17", "17", "99", "99"],
+            "bpk": ["MA", "MA", "DAB", "DAB", "DAB", "DAB", "DAB", "DAB"],
+        }
+    )
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        joined = _join_guid(df, nodes)
+    assert joined.index.tolist() == [3, 1, 2, 0]
+    assert joined.guid.tolist() == ["b_0", "c_0", "c_0", "a_0"]
+    messages = [str(warning.message) for warning in caught]
+    assert len(messages) == 2
+    assert messages[0].startswith("ecos accessories with the same dcc address")
+    assert messages[1] == "train switches without ecos accessory: ['d_0']"
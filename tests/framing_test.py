@@ -0,0 +1,33 @@
+"""Test the delimiter framing."""
+import pytest
+
+from ebl_coords.backend.framing import RecordFramer
+
+STREAM_FILE = "./tests/test_data/gtcommand_test_stream"
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_records_split_over_chunks() -> None:
+    """Records split over several chunks are handed out complete."""
+    with open(STREAM_FILE, "rb") as fd:
+        stream = fd.read()
+    expected = stream.split(b";")[:-1]
+
+    framer = RecordFramer(delimiter=b";", capacity=64)
+    records = []
+    for i in range(0, len(stream), 7):
+        framer.feed(stream[i : i + 7])
+        records.extend(bytes(record) for record in framer.records())
+    assert records == expected
+    assert framer.pending == 1  # trailing newline
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_pop_complete_multibyte_delimiter() -> None:
+    """Pop all complete records with a multi byte delimiter, keep the incomplete rest."""
+    framer = RecordFramer(delimiter=b"<END>")
+    framer.feed(b"a<END>bb<END>c")
+    assert bytes(framer.pop_complete()) == b"a<END>bb<END>"
+    assert bytes(framer.pop_complete()) == b""
+    framer.feed(b"c<END>")
+    assert [bytes(record) for record in framer.records()] == [b"cc"]
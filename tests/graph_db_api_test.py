@@ -0,0 +1,26 @@
+"""Test the edge listing."""
+import pandas as pd
+import pytest
+
+from ebl_coords.graph_db.graph_db_api import EDGE_LIST_COLUMNS, format_edges
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_edges_are_ordered_by_relation_then_source() -> None:
+    """Edges are grouped in EdgeRelation order and named by their relation value."""
+    edges = pd.DataFrame(
+        [
+            ["e0", "STRAIGHT", "DAB", "2", "ENS", "1"],
+            ["e1", "NEUTRAL", "ENS", "1", "DAB", "2"],
+            ["e2", "STRAIGHT", "DAB", "1", "ENS", "3"],
+            ["e3", "DEFLECTION", "CHA", "7", "DAB", "1"],
+        ],
+        columns=EDGE_LIST_COLUMNS,
+    )
+    assert format_edges(edges) == [
+        ("e1", "ENS_1\tAnfang\tDAB_2"),
+        ("e3", "CHA_7\tAblenkung\tDAB_1"),
+        ("e2", "DAB_1\tGerade\tENS_3"),
+        ("e0", "DAB_2\tGerade\tENS_1"),
+    ]
+    assert not format_edges(pd.DataFrame(columns=EDGE_LIST_COLUMNS))
@@ -0,0 +1,42 @@
+"""Test the batched GtCommand record parser."""
+import numpy as np
+import pytest
+
+from ebl_coords.backend.gtcommand_records import get_coords, parse_records
+
+STREAM_FILE = "./tests/test_data/gtcommand_test_stream"
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_parse_stream() -> None:
+    """The batch parser matches a record by record parse."""
+    with open(STREAM_FILE, "rb") as fd:
+        stream = fd.read()
+    stream = stream[: stream.rfind(b";") + 1]
+    batch = parse_records(memoryview(stream))
+
+    expected = np.array(
+        [[int(d) for d in record.split(b",")] for record in stream.split(b";")[:-1]]
+    )
+    assert batch.size == expected.shape[0]
+    np.testing.assert_array_equal(batch["timestamp"], expected[:, 0])
+    np.testing.assert_array_equal(batch["tag_id"], expected[:, 1])
+    np.testing.assert_array_equal(get_coords(batch), expected[:, 3:6])
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_parse_mixed_records() -> None:
+    """Records with additional fields or malformed records fall back to single parsing."""
+    batch = parse_records(b"10,1,0,1,2,3,99;20,2,0,4,5,6;30,x,0,7,8,9;40,1,0")
+    assert batch["timestamp"].tolist() == [10, 20]
+    assert get_coords(batch).tolist() == [[1, 2, 3], [4, 5, 6]]
+    assert parse_records(b"").size == 0
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_parse_records_with_other_field_counts() -> None:
+    """Field counts, which only add up to a multiple of the first one, are not reshaped."""
+    batch = parse_records(b"10,1,0,1,2,3,99;20,2,0,4,5,6,99;30,3,0,7,8,9;40,4,0,1,2,3,4,5;")
+    assert batch["timestamp"].tolist() == [10, 20, 30, 40]
+    assert batch["tag_id"].tolist() == [1, 2, 3, 4]
+    assert get_coords(batch).tolist() == [[1, 2, 3], [4, 5, 6], [7, 8, 9], [1, 2, 3]]
@@ -0,0 +1,111 @@
+"""Test the worker pool invoker."""
+from __future__ import annotations
+
+import time
+from queue import Queue
+from threading import Barrier, Event, Lock
+from types import SimpleNamespace
+
+import pytest
+
+from ebl_coords.backend.command.command import Command, Priority, WrapperFunctionCommand
+from ebl_coords.backend.command.ecos_cmd import UpdateEocsDfCommand
+from ebl_coords.backend.command.invoker import FrameInvoker, Invoker
+
+
+@pytest.mark.timeout(5)  # type: ignore
+def test_order_per_key_and_parallel_lanes() -> None:
+    """Commands with the same key keep their order, keys run in parallel."""
+    queue: Queue[Command] = Queue()
+    invoker = Invoker(workers=4)
+    invoker.start_loop(queue)
+    lock = Lock()
+    runs: dict[object, list[int]] = {}
+    running = [0, 0]
+
+    def _append(key: object, i: int) -> None:
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.002)
+        with lock:
+            running[0] -= 1
+            runs.setdefault(key, []).append(i)
+
+    for i in range(50):
+        for key in ("a", "b", "c"):
+            queue.put(WrapperFunctionCommand(content=lambda k=key, i=i: _append(k, i), key=key))
+    while invoker.stats.completed < 150:
+        time.sleep(0.001)
+
+    assert all(order == list(range(50)) for order in runs.values())
+    # commands of different keys ran at the same time
+    assert running[1] > 1
+    stats = invoker.stats
+    assert stats.failed == 0
+    assert stats.pending == 0
+    assert stats.latency_max_ms >= stats.run_mean_ms >= 2
+
+
+@pytest.mark.timeout(2)  # type: ignore
+def test_commands_without_key_run_in_parallel() -> None:
+    """Commands without key are spread over all lanes."""
+    queue: Queue[Command] = Queue()
+    invoker = Invoker(workers=4)
+    invoker.start_loop(queue)
+    # every command waits until all of them run at the same time
+    barrier = Barrier(4, timeout=1)
+    for _ in range(4):
+        queue.put(WrapperFunctionCommand(content=barrier.wait))
+    while invoker.stats.completed < 4:
+        time.sleep(0.001)
+    assert invoker.stats.failed == 0
+
+
+@pytest.mark.timeout(2)  # type: ignore
+def test_ecos_refresh_does_not_block_other_lanes() -> None:
+    """A hanging ecos rescrape runs on the background lane, all other lanes go on."""
+    queue: Queue[Command] = Queue()
+    invoker = Invoker(workers=4)
+    invoker.start_loop(queue)
+    release = Event()
+    queue.put(UpdateEocsDfCommand(SimpleNamespace(update_ecos_df=release.wait)))  # type: ignore
+    done = [Event() for _ in range(20)]
+    # without key and with enough keys to hit every worker lane
+    for key, event in zip([None, *range(19)], done):
+        queue.put(WrapperFunctionCommand(content=event.set, key=key))
+    assert all(event.wait(1) for event in done)
+    assert invoker.depths()[Priority.BACKGROUND] == 0
+    release.set()
+
+
+class _RecordCmd(Command):
+    def __init__(self, content: str, context: list[str], sleep_s: float = 0) -> None:
+        super().__init__(content, context)
+        self.content: str
+        self.context: list[str]
+        self.sleep_s = sleep_s
+
+    def run(self) -> None:
+        time.sleep(self.sleep_s)
+        self.context.append(self.content)
+
+
+@pytest.mark.timeout(2)  # type: ignore
+def test_frame_invoker_budget_and_coalescing() -> None:
+    """Commands are spread over frames and only the newest command per key runs."""
+    queue: Queue[Command] = Queue()
+    frame_invoker = FrameInvoker(queue, budget_ms=10)
+    runs: list[str] = []
+    for i in range(20):
+        queue.put(_RecordCmd(f"button{i}", runs, sleep_s=0.002))
+        label = _RecordCmd(f"label{i}", runs)
+        label.coalesce_key = "label"
+        queue.put(label)
+
+    executed = frame_invoker.run_frame()
+    assert 1 <= executed < 21
+    while frame_invoker.backlog:
+        frame_invoker.run_frame()
+    assert runs == [f"button{i}" for i in range(20)] + ["label19"]
+    assert frame_invoker.coalesced == 19
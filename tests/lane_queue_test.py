@@ -0,0 +1,82 @@
+"""Test the priority lanes."""
+from __future__ import annotations
+
+import time
+from typing import Hashable
+
+import pytest
+
+from ebl_coords.backend.command.command import Priority, WrapperFunctionCommand
+from ebl_coords.backend.command.lane_queue import CommandLanes, LaneQueue
+
+
+def _cmd(name: str, priority: Priority, key: Hashable = None) -> WrapperFunctionCommand:
+    cmd = WrapperFunctionCommand(content=lambda: None, key=key)
+    cmd.priority = priority
+    cmd.content = name  # type: ignore
+    return cmd
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_priority_order_and_depths() -> None:
+    """Higher lanes are served first, FIFO within a lane."""
+    queue = LaneQueue()
+    for i in range(3):
+        for priority in reversed(Priority):
+            queue.put(_cmd(f"{priority.name}{i}", priority))
+    assert queue.depths() == {p: 3 for p in Priority}
+
+    names = [queue.get().content for _ in range(9)]
+    assert names == [f"{p.name}{i}" for p in Priority for i in range(3)]
+    assert queue.lanes.max_depths == {p: 3 for p in Priority}
+    assert queue.lanes.served == {p: 3 for p in Priority}
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_starvation_protection() -> None:
+    """A waiting background command overtakes a steady stream of realtime commands."""
+    queue = LaneQueue(max_wait_ms=20)
+    queue.put(_cmd("background", Priority.BACKGROUND))
+    served = []
+    for i in range(100):
+        queue.put(_cmd(f"realtime{i}", Priority.REALTIME))
+        served.append(queue.get().content)
+        time.sleep(0.001)
+    assert "background" in served
+    assert served.index("background") < 50
+    assert queue.lanes.promoted == 1
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_same_key_keeps_order_over_priorities() -> None:
+    """Priorities reorder commands of different keys only."""
+    lanes = CommandLanes()
+    lanes.append(_cmd("grid_line", Priority.INTERACTIVE, key="map"))
+    lanes.append(_cmd("label", Priority.INTERACTIVE))
+    lanes.append(_cmd("clear", Priority.REALTIME, key="map"))
+    lanes.append(_cmd("draw", Priority.REALTIME, key="map"))
+    lanes.append(_cmd("state", Priority.REALTIME, key="ts"))
+    lanes.append(_cmd("db_write", Priority.BACKGROUND, key="ts2"))
+    lanes.append(_cmd("state2", Priority.REALTIME, key="ts2"))
+
+    names = [lanes.popleft().content for _ in range(len(lanes))]
+    assert names == ["grid_line", "clear", "draw", "state", "db_write", "state2", "label"]
+    assert not lanes.keys
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_coalesce_keeps_key_order() -> None:
+    """Dropped commands are not waited for, the newest of a coalesce_key keeps its place."""
+    lanes = CommandLanes()
+    for name, priority in (("draw0", Priority.REALTIME), ("line", Priority.INTERACTIVE)):
+        cmd = _cmd(name, priority, key="map")
+        if name == "draw0":
+            cmd.coalesce_key = "draw"
+        lanes.append(cmd)
+    draw = _cmd("draw1", Priority.REALTIME, key="map")
+    draw.coalesce_key = "draw"
+    lanes.append(draw)
+    assert lanes.coalesce() == 1
+
+    assert [lanes.popleft().content for _ in range(2)] == ["line", "draw1"]
+    assert not lanes.keys
@@ -0,0 +1,90 @@
+"""Test the layout import batches."""
+import pytest
+
+from ebl_coords.graph_db.layout_io import layout_queries, unmatched_sections
+
+
+def _layout(switches: int) -> dict:
+    """Switches s0, s1, ... connected in a line by straight exits."""
+    return {
+        "switches": [
+            {"guid": f"s{i}", "bhf": "DAB", "name": str(i), "ecos_id": str(20000 + i), "x": i}
+            for i in range(switches)
+        ],
+        "sections": [
+            {
+                "edge_id": f"e{i}_{side}",
+                "source": f"s{i + side}_{1 - side}",
+                "dest": f"s{i + 1 - side}_{side}",
+                "relation": "STRAIGHT" if side == 0 else "NEUTRAL",
+                "target": "NEUTRAL" if side == 0 else "STRAIGHT",
+                "distance": 100,
+            }
+            for i in range(switches - 1)
+            for side in (0, 1)
+        ],
+    }
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_layout_is_written_in_batches() -> None:
+    """Switches come first, sections are batched per relation."""
+    queries = layout_queries(_layout(5), batch_size=3)
+    assert [len(parameters["rows"]) for _, parameters in queries] == [3, 2, 3, 1, 3, 1]
+    assert all("UNWIND $rows" in statement for statement, _ in queries)
+    assert ":NEUTRAL" in queries[2][0] and ":STRAIGHT" in queries[4][0]
+    switch = queries[0][1]["rows"][1]
+    assert switch["guid"] == "s1"
+    assert switch["props"] == {
+        "bhf": "DAB",
+        "name": "1",
+        "ecos_id": "20001",
+        "x": 1.0,
+        "y": 0.0,
+        "z": 0.0,
+    }
+    assert queries[4][1]["rows"][0] == {
+        "edge_id": "e0_0",
+        "source": "s0_1",
+        "dest": "s1_0",
+        "target": "NEUTRAL",
+        "distance": 100,
+    }
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_invalid_layout_is_rejected() -> None:
+    """Nothing is written for unknown bhfs or relations."""
+    layout = _layout(2)
+    layout["switches"][0]["bhf"] = "XXX"
+    with pytest.raises(ValueError):
+        layout_queries(layout)
+    layout = _layout(2)
+    layout["sections"][0]["relation"] = "DOUBLE_VERTEX"
+    with pytest.raises(ValueError):
+        layout_queries(layout)
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_import_without_guid_is_repeatable() -> None:
+    """A missing guid is derived from bhf and name, a missing ecos_id stays null."""
+    layout = _layout(2)
+    for switch in layout["switches"]:
+        del switch["guid"]
+    layout["switches"][0]["ecos_id"] = None
+    queries = layout_queries(layout)
+    assert queries == layout_queries(layout)
+    rows = queries[0][1]["rows"]
+    assert rows[0]["guid"] != rows[1]["guid"]
+    assert rows[0]["props"]["ecos_id"] is None
+    assert rows[1]["props"]["ecos_id"] == "20001"
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_unmatched_sections_are_found() -> None:
+    """Sections, which the edge batches did not return, miss their source or dest."""
+    queries = layout_queries(_layout(3), batch_size=3)
+    results: list = [[], [{"edge_ids": ["e0_1", "e1_1"]}], [{"edge_ids": ["e1_0"]}]]
+    assert unmatched_sections(queries, results) == ["e0_0"]
+    results[2] = [{"edge_ids": ["e0_0", "e1_0"]}]
+    assert unmatched_sections(queries, results) == []
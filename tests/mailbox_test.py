@@ -0,0 +1,100 @@
+"""Test the asynchronous observer dispatch."""
+from __future__ import annotations
+
+import time
+from threading import Event
+from typing import Callable
+
+import pytest
+
+from ebl_coords.backend.observable.mailbox import OverflowPolicy
+from ebl_coords.backend.observable.observer import Observer
+from ebl_coords.backend.observable.subject import Subject
+
+
+class _Subject(Subject):
+    def __init__(self) -> None:
+        super().__init__()
+        self.observers: list[Observer] = []
+
+    def attach(self, observer: Observer) -> None:
+        with self.lock:
+            self.observers.append(observer)
+
+    def detach(self, observer: Observer) -> None:
+        with self.lock:
+            self.observers.remove(observer)
+            self.close_mailbox(observer)
+
+
+class _SlowObserver(Observer):
+    def __init__(self) -> None:
+        self.release = Event()
+        self.results: list[object] = []
+
+    def update(self) -> None:
+        self.release.wait()
+        self.results.append(self.result)
+
+
+def _wait_for(condition: Callable[[], bool]) -> None:
+    while not condition():
+        time.sleep(0.001)
+
+
+@pytest.mark.timeout(2)  # type: ignore
+@pytest.mark.parametrize(  # type: ignore
+    "policy, expected",
+    [
+        (OverflowPolicy.BLOCK, list(range(20))),
+        (OverflowPolicy.DROP_OLDEST, [0] + list(range(16, 20))),
+        (OverflowPolicy.LATEST_ONLY, [0, 19]),
+    ],
+)
+def test_overflow_policy(policy: OverflowPolicy, expected: list[int]) -> None:
+    """A slow observer gets its notifications according to the policy."""
+    subject = _Subject()
+    observer = _SlowObserver()
+    subject.attach(observer)
+    mailbox = subject.dispatch_async(observer, policy, maxsize=4)
+
+    subject.notify(subject.observers, 0)
+    _wait_for(lambda: mailbox.stats.pending == 0)
+    if policy == OverflowPolicy.BLOCK:
+        observer.release.set()
+    for i in range(1, 20):
+        subject.notify(subject.observers, i)
+    if policy != OverflowPolicy.BLOCK:
+        # the notifying thread did not wait for the still blocked observer, a wait
+        # would not return before the test timeout
+        assert subject.mailbox_stats()[observer].dropped == 20 - len(expected)
+        observer.release.set()
+
+    _wait_for(lambda: mailbox.stats.delivered == len(expected))
+    assert observer.results == expected
+    subject.detach(observer)
+    assert not subject.mailboxes
+
+
+@pytest.mark.timeout(2)  # type: ignore
+def test_coalesce_per_key_with_max_rate() -> None:
+    """Only the newest result per key is delivered, at most at max_rate_hz."""
+    subject = _Subject()
+    observer = _SlowObserver()
+    observer.release.set()
+    subject.attach(observer)
+    mailbox = subject.dispatch_async(
+        observer, OverflowPolicy.LATEST_ONLY, max_rate_hz=20, key=lambda result: result[0]
+    )
+
+    start = time.perf_counter()
+    for i in range(1000):
+        subject.notify(subject.observers, (i % 2, i))
+    _wait_for(lambda: mailbox.stats.pending == 0)
+    elapsed = time.perf_counter() - start
+
+    # the first update runs immediately, every further update waits 50 ms
+    assert len(observer.results) <= 1 + elapsed * 20 + 1
+    assert observer.results[-2:] in ([(0, 998), (1, 999)], [(1, 999), (0, 998)])
+    assert mailbox.stats.dropped == 1000 - len(observer.results)
+    subject.detach(observer)
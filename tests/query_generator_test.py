@@ -0,0 +1,46 @@
+"""Test the parameterized queries."""
+import numpy as np
+import pytest
+
+from ebl_coords.graph_db.data_elements.bpk_enum import Bpk
+from ebl_coords.graph_db.data_elements.edge_dc import Edge
+from ebl_coords.graph_db.data_elements.edge_relation_enum import EdgeRelation
+from ebl_coords.graph_db.data_elements.node_dc import Node
+from ebl_coords.graph_db.data_elements.switch_item_enum import SwitchItem
+from ebl_coords.graph_db.query_generator import double_node, get_double_nodes, single_edge
+
+
+def _node(guid: str) -> Node:
+    return Node(
+        id=guid,
+        ecos_id="20000",
+        switch_item=SwitchItem.WEICHE,
+        ts_number="1",
+        bpk=next(iter(Bpk)),
+        coords=np.array([1, 2, 3]),
+    )
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_statements_do_not_depend_on_ids() -> None:
+    """Ids and values are parameters, the statement text is the same for every node."""
+    (statement_a, parameters_a), _ = double_node(_node("guid_a"))
+    (statement_b, parameters_b), _ = double_node(_node("guid_b"))
+    assert statement_a == statement_b
+    assert "guid_" not in statement_a
+    assert parameters_a["props1"]["node_id"] == "guid_a_0"
+    assert parameters_b["props2"] == {
+        "node_id": "guid_b_1",
+        "name": "1",
+        "ecos_id": "20000",
+        "bhf": next(iter(Bpk)).name,
+        "x": 1.0,
+        "y": 2.0,
+        "z": 3.0,
+    }
+    assert get_double_nodes("guid_a_0")[0] == get_double_nodes("guid_b_0")[0]
+
+    edge = Edge("e_0", _node("a_1"), _node("b_0"), EdgeRelation.STRAIGHT, 120, EdgeRelation.NEUTRAL)
+    statement, parameters = single_edge(edge)
+    assert ":STRAIGHT" in statement and "e_0" not in statement
+    assert parameters["edge_id"] == "e_0" and parameters["target"] == "NEUTRAL"
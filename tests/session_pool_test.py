@@ -0,0 +1,65 @@
+"""Test the neo4j session pool."""
+import threading
+import time
+from typing import List
+
+import pytest
+
+from ebl_coords.graph_db.session_pool import SessionPool
+
+
+class _Session:
+    """Fails if it is used by two threads at once."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def run(self) -> None:
+        assert self.lock.acquire(blocking=False), "session used concurrently"
+        time.sleep(0.02)
+        self.lock.release()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _Driver:
+    def __init__(self) -> None:
+        self.sessions: List[_Session] = []
+
+    def session(self) -> _Session:
+        self.sessions.append(_Session())
+        return self.sessions[-1]
+
+
+@pytest.mark.timeout(3)  # type: ignore
+def test_threads_never_share_a_session() -> None:
+    """Queries run in parallel up to the pool size, sessions are reused."""
+    driver = _Driver()
+    pool = SessionPool(driver, max_size=3)  # type: ignore
+
+    def _query() -> None:
+        for _ in range(5):
+            with pool.session() as session:
+                session.run()
+
+    threads = [threading.Thread(target=_query) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert len(driver.sessions) == stats["opened"] == 3
+    assert stats["idle"] == 3 and stats["in_use"] == 0
+    # 6 threads ran their queries on 3 sessions in parallel
+    assert stats["peak_in_use"] == 3 and stats["acquired"] == 30
+    assert stats["waited"] > 0
+
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            raise RuntimeError("query failed")
+    assert pool.stats()["discarded"] == 1 and pool.stats()["opened"] == 2
+    pool.close()
+    assert all(session.closed for session in driver.sessions)
@@ -0,0 +1,47 @@
+"""Test the train switch spatial index."""
+import time
+import warnings
+
+import numpy as np
+import pytest
+
+from ebl_coords.backend.spatial_index import SwitchIndex
+from ebl_coords.backend.transform_data import get_track_switches_hit
+
+
+@pytest.mark.timeout(2)  # type: ignore
+def test_query_radius_matches_cdist() -> None:
+    """Radius queries give the same labels as get_track_switches_hit."""
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(0, 20000, size=(2000, 3)).astype(np.float32)
+    coords[:, 2] = 0
+    labels = np.array([f"ts{i}" for i in range(coords.shape[0])], dtype=object)
+    index = SwitchIndex()
+    index.build(labels, coords)
+
+    for waypoint in coords[:50] + rng.uniform(-40, 40, size=(50, 3)).astype(np.float32):
+        with warnings.catch_warnings():
+            # double hits are expected with this radius
+            warnings.simplefilter("ignore", UserWarning)
+            expected = get_track_switches_hit(labels, coords, waypoint.reshape(1, -1), 300)
+        assert set(index.query_radius(waypoint, 300)) == set(expected)
+
+    start = time.perf_counter()
+    for waypoint in coords[:100]:
+        index.query_radius(waypoint, 50)
+    # generous bound, a scan over all switches in python takes far longer
+    assert (time.perf_counter() - start) / 100 < 1e-2
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_rebuild_skips_unmeasured_nodes() -> None:
+    """Nodes without coordinates are not indexed and a rebuild replaces the index."""
+    index = SwitchIndex()
+    assert index.nearest(np.zeros(3)) is None
+    assert index.query_radius(np.zeros(3), 10).size == 0
+
+    index.build(np.array(["a", "b"]), np.array([[0, 0, 0], [np.nan, np.nan, np.nan]]))
+    assert index.size == 1
+    index.build(np.array(["a", "b"]), np.array([[0, 0, 0], [5, 0, 0]]))
+    assert list(index.query_radius(np.array([4, 0, 0]), 10)) == ["b", "a"]
+    assert index.nearest(np.array([1, 0, 0])) == ("a", 1.0)
@@ -0,0 +1,110 @@
+"""Test the cached track topology."""
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ebl_coords.graph_db.topology import TopologyCache, TrackTopology
+
+
+def _layout() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Two double nodes a and b, a straight exit of a leads to the neutral exit of b."""
+    nodes = pd.DataFrame(
+        {
+            "node_id": ["a_0", "a_1", "b_0", "b_1"],
+            "x": ["1.0", "1.0", "5.0", "5.0"],
+            "y": [2, 2, 6, 6],
+            "z": [3, 3, 7, 7],
+        }
+    )
+    edges = pd.DataFrame(
+        {
+            "edge_id": ["dv_a_0", "dv_a_1", "dv_b_0", "dv_b_1", "e_0", "e_1"],
+            "source": ["a_0", "a_1", "b_0", "b_1", "a_1", "b_0"],
+            "dest": ["a_1", "a_0", "b_1", "b_0", "b_0", "a_1"],
+            "relation": ["DOUBLE_VERTEX"] * 4 + ["STRAIGHT", "NEUTRAL"],
+            "target": ["DOUBLE_VERTEX"] * 4 + ["NEUTRAL", "STRAIGHT"],
+            "distance": [0, 0, 0, 0, 120, 120],
+        }
+    )
+    return nodes, edges
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_lookups_without_database() -> None:
+    """Next edge, edge and destination node are answered from the loaded layout."""
+    topology = TrackTopology(*_layout())
+    assert topology.next_edge("a_0", "STRAIGHT") == "e_0"
+    assert topology.next_edge("a_0", "DEFLECTION") is None
+    assert topology.next_edge("b_1", "NEUTRAL") == "e_1"
+    assert topology.edge("e_0") == {
+        "edge_id": "e_0",
+        "ts_source": "STRAIGHT",
+        "ts_dest": "NEUTRAL",
+        "source_id": "a_1",
+        "dest_id": "b_0",
+        "distance": 120.0,
+    }
+    labels, coords = topology.dest_nodes("e_0")
+    assert labels.tolist() == ["b_0"]
+    np.testing.assert_array_equal(coords, [[5, 6, 7]])
+    assert topology.dest_nodes("unknown")[1].shape == (0, 3)
+    assert sorted(topology.track_edges()) == [
+        ("a_1", "b_0", "NEUTRAL", "STRAIGHT"),
+        ("b_0", "a_1", "STRAIGHT", "NEUTRAL"),
+    ]
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_patches_and_invalidation() -> None:
+    """Patches change the loaded topology, an invalidated topology is loaded again."""
+    cache = TopologyCache.__new__(TopologyCache)
+    cache.__init__(_layout)  # type: ignore
+    cache.patch(partial(TrackTopology.remove_edge, edge_id="e_0"))
+    assert cache.loads == 0
+
+    topology = cache.get()
+    assert cache.get() is topology and cache.loads == 1
+    cache.patch(partial(TrackTopology.remove_edge, edge_id="e_0"))
+    cache.patch(partial(TrackTopology.set_coords, node_id="b_1", coord=np.array([8, 9, 0])))
+    assert topology.next_edge("a_0", "STRAIGHT") is None
+    assert topology.edge("e_1")["dest_id"] == "a_1"  # type: ignore
+    np.testing.assert_array_equal(topology.dest_nodes("e_1")[1], [[1, 2, 3]])
+    np.testing.assert_array_equal(topology.nodes()[1][2:], [[8, 9, 0], [8, 9, 0]])
+
+    cache.patch(
+        partial(
+            TrackTopology.add_edge,
+            edge_id="f_0",
+            source_id="a_1",
+            dest_id="b_0",
+            relation="DEFLECTION",
+            target="NEUTRAL",
+            distance=80,
+        )
+    )
+    assert topology.next_edge("a_0", "DEFLECTION") == "f_0"
+
+    cache.invalidate()
+    assert cache.get().next_edge("a_0", "STRAIGHT") == "e_0"
+    assert cache.loads == 2
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_switches_and_entered_node() -> None:
+    """One node per double node is indexed, the entered node follows from the heading."""
+    topology = TrackTopology(*_layout())
+    node_ids, coords = topology.switches()
+    assert node_ids.tolist() == ["a_0", "b_0"]
+    np.testing.assert_array_equal(coords, [[1, 2, 3], [5, 6, 7]])
+
+    towards_b, towards_a = np.array([1.0, 1.0, 0.0]), np.array([-1.0, -1.0, 0.0])
+    # a train towards b enters a from its neutral side and leaves through e_0
+    assert topology.entered_node("a_1", towards_b) == "a_0"
+    assert topology.next_edge("a_0", "STRAIGHT") == "e_0"
+    assert topology.entered_node("b_0", towards_b) == "b_0"
+    assert topology.entered_node("a_0", towards_a) == "a_1"
+    assert topology.entered_node("b_0", towards_a) == "b_1"
+    assert topology.next_edge("b_1", "NEUTRAL") == "e_1"
+    assert topology.entered_node("unknown", towards_a) is None
@@ -0,0 +1,96 @@
+"""Test the latency tracing."""
+from __future__ import annotations
+
+import time
+from queue import Queue
+from typing import Any
+
+import pytest
+
+from ebl_coords.backend.command.command import Command, WrapperFunctionCommand
+from ebl_coords.backend.command.invoker import FrameInvoker, Invoker
+from ebl_coords.backend.observable.mailbox import OverflowPolicy
+from ebl_coords.backend.observable.observer import Observer
+from ebl_coords.backend.observable.subject import Subject
+from ebl_coords.backend.tracing import LatencyHistogram, Trace, Tracer
+
+
+class _Subject(Subject):
+    def __init__(self) -> None:
+        super().__init__()
+        self.observers: list[Observer] = []
+
+    def attach(self, observer: Observer) -> None:
+        self.observers.append(observer)
+
+    def detach(self, observer: Observer) -> None:
+        self.observers.remove(observer)
+        self.close_mailbox(observer)
+
+
+class _Observer(Observer):
+    def __init__(self, worker_queue: Queue[Command], gui_queue: Queue[Command]) -> None:
+        self.worker_queue = worker_queue
+        self.gui_queue = gui_queue
+
+    def update(self) -> None:
+        def _to_gui() -> None:
+            time.sleep(0.005)
+            self.gui_queue.put(WrapperFunctionCommand(content=lambda: Tracer().finish("show")))
+
+        self.worker_queue.put(WrapperFunctionCommand(content=_to_gui))
+
+
+@pytest.mark.timeout(2)  # type: ignore
+def test_trace_from_receive_to_show(monkeypatch: Any) -> None:
+    """A trace is carried through the observer, a worker and a gui command."""
+    tracer = Tracer()
+    # tracing is off by default
+    monkeypatch.setattr(tracer, "enabled", True)
+    tracer.reset()
+    worker_queue: Queue[Command] = Queue()
+    gui_queue: Queue[Command] = Queue()
+    Invoker(workers=2).start_loop(worker_queue)
+    frame_invoker = FrameInvoker(gui_queue)
+    subject = _Subject()
+    observer = _Observer(worker_queue, gui_queue)
+    subject.attach(observer)
+    subject.dispatch_async(observer, OverflowPolicy.BLOCK)
+
+    # an untraced command does not record anything
+    worker_queue.put(WrapperFunctionCommand(content=lambda: None))
+    with tracer.span("gtcommand.filter"):
+        time.sleep(0.002)
+    with tracer.hop(Trace.start(), "gtcommand.dispatch"):
+        subject.notify(subject.observers, None)
+    while "end_to_end" not in tracer.histograms:
+        frame_invoker.run_frame()
+        time.sleep(0.001)
+    subject.detach(observer)
+
+    summary = tracer.summary()
+    assert set(summary) == {
+        "gtcommand.filter",
+        "gtcommand.dispatch",
+        "mailbox._Observer",
+        "worker.WrapperFunctionCommand",
+        "gui.WrapperFunctionCommand",
+        "show",
+        "end_to_end",
+    }
+    assert all(hop["count"] == 1 for hop in summary.values())
+    assert summary["gtcommand.filter"]["max_ms"] >= 2
+    assert summary["end_to_end"]["max_ms"] >= 5
+    assert summary["gui.WrapperFunctionCommand"]["max_ms"] >= 5
+
+
+@pytest.mark.timeout(1)  # type: ignore
+def test_histogram_percentiles() -> None:
+    """Percentiles are bounded by the bucket bounds and the maximum."""
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    assert histogram.count == 100
+    assert 0.05 <= histogram.percentile(50) <= 0.1
+    assert histogram.percentile(100) == pytest.approx(0.1)
+    assert histogram.to_dict()["mean_ms"] == pytest.approx(50.5)